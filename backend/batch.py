@@ -0,0 +1,61 @@
+"""ABOUTME: Batch execution of many council queries with shared scheduling.
+ABOUTME: Caps per-publisher concurrency across the batch and yields results as they finish."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, AsyncIterator, Callable, List, Optional
+
+from backend.config import settings
+from backend.council import CouncilService
+from backend.models import CouncilQuery
+from backend.resilience import PublisherLimiter
+from backend.x402_client import PaymentRequiredError
+
+
+async def run_batch(
+    queries: List[CouncilQuery],
+    caller_wallet: str,
+    *,
+    publisher_concurrency: Optional[int] = None,
+    max_concurrent_councils: Optional[int] = None,
+    service_factory: Callable[..., CouncilService] = CouncilService,
+) -> AsyncIterator[dict[str, Any]]:
+    """Run ``queries`` concurrently, yielding one result dict per query as it finishes.
+
+    Councils share a :class:`PublisherLimiter`, so each publisher's cap is
+    respected across the whole batch. Several councils are kept in progress
+    at once, so while one query waits on its chairman, other queries'
+    stage 1 and stage 2 calls keep the remaining publishers busy. Each
+    result is ``{"index": i, "response": {...}}`` or
+    ``{"index": i, "error": {"status": ..., "detail": ...}}``.
+    """
+    limiter = PublisherLimiter(publisher_concurrency or settings.batch_publisher_concurrency)
+    councils = asyncio.Semaphore(
+        max_concurrent_councils or settings.batch_max_concurrent_councils
+    )
+
+    async def _run_one(index: int, query: CouncilQuery) -> dict[str, Any]:
+        async with councils:
+            service = service_factory(caller_wallet=caller_wallet, limiter=limiter)
+            try:
+                response = await service.run_council(
+                    query.query,
+                    chairman=query.chairman,
+                    deadline_seconds=query.deadline_seconds,
+                    include_timings=query.include_timings,
+                    mode=query.mode,
+                )
+            except PaymentRequiredError as exc:
+                return {"index": index, "error": {"status": 402, "detail": str(exc)}}
+            except RuntimeError as exc:
+                return {"index": index, "error": {"status": 400, "detail": str(exc)}}
+            return {"index": index, "response": response.model_dump()}
+
+    tasks = [asyncio.ensure_future(_run_one(index, query)) for index, query in enumerate(queries)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,206 @@
+"""ABOUTME: Load-generation benchmark for the council API against the mock gateway.
+ABOUTME: Reports throughput, stage latency percentiles, memory, and event-loop lag."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import platform
+import subprocess
+import sys
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+
+from backend.mock_gateway import MockGatewayConfig, load_config
+
+STAGES = ("stage1", "stage2", "stage3")
+
+
+def percentile(samples: Sequence[float], quantile: float) -> Optional[float]:
+    """Nearest-rank percentile, or ``None`` for no samples."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = min(len(ordered), max(1, math.ceil(quantile * len(ordered))))
+    return ordered[rank - 1]
+
+
+def summarize(samples: Sequence[float]) -> Dict[str, Optional[float]]:
+    return {
+        "count": len(samples),
+        "p50": percentile(samples, 0.50),
+        "p95": percentile(samples, 0.95),
+        "p99": percentile(samples, 0.99),
+        "max": max(samples) if samples else None,
+    }
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes a task that sleeps ``interval``."""
+
+    def __init__(self, interval: float = 0.01) -> None:
+        self.interval = interval
+        self.lags_ms: List[float] = []
+        self._task: Optional[asyncio.Task[None]] = None
+
+    async def _run(self) -> None:
+        while True:
+            started = perf_counter()
+            await asyncio.sleep(self.interval)
+            late = perf_counter() - started - self.interval
+            self.lags_ms.append(max(0.0, late) * 1000)
+
+    def start(self) -> None:
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+
+def max_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process, where the platform reports it."""
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            timeout=5,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+async def run_benchmark(
+    councils: int,
+    concurrency: int,
+    mock_config: Optional[MockGatewayConfig] = None,
+    endpoint: str = "/v1/council/query",
+) -> Dict[str, Any]:
+    """Drive ``backend.main:app`` in-process against the mock gateway.
+
+    Every council uses a distinct query so coalescing and caches do not
+    short-circuit the work being measured.
+    """
+    from backend import x402_client
+    from backend.main import app
+    from backend.mock_gateway import create_mock_gateway
+
+    gateway = create_mock_gateway(mock_config or MockGatewayConfig())
+    upstream = httpx.AsyncClient(transport=httpx.ASGITransport(app=gateway))
+    x402_client.use_shared_client(x402_client.X402Client(http_client=upstream))
+
+    totals_ms: List[float] = []
+    stages_ms: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+    statuses: Dict[str, int] = {}
+    next_index = 0
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        nonlocal next_index
+        while next_index < councils:
+            index = next_index
+            next_index += 1
+            started = perf_counter()
+            response = await client.post(
+                endpoint,
+                json={"query": f"Benchmark council {index}", "include_timings": True},
+                headers={"X-AGENT-WALLET": "0xbenchmark"},
+            )
+            elapsed_ms = round((perf_counter() - started) * 1000, 3)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+            if response.status_code != 200:
+                continue
+            totals_ms.append(elapsed_ms)
+            timings = response.json()["metadata"].get("timings") or {}
+            for stage, timing in timings.get("stages", {}).items():
+                stages_ms.setdefault(stage, []).append(timing["duration_ms"])
+
+    monitor = LoopLagMonitor()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        monitor.start()
+        started = perf_counter()
+        try:
+            await asyncio.gather(*(worker(client) for _ in range(max(1, concurrency))))
+        finally:
+            duration = perf_counter() - started
+            await monitor.stop()
+            await x402_client.close_shared_client()
+
+    return {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "councils": councils,
+        "concurrency": concurrency,
+        "succeeded": len(totals_ms),
+        "statuses": statuses,
+        "duration_seconds": round(duration, 3),
+        "councils_per_second": round(len(totals_ms) / duration, 3) if duration > 0 else None,
+        "latency_ms": {
+            "total": summarize(totals_ms),
+            **{stage: summarize(samples) for stage, samples in stages_ms.items()},
+        },
+        "event_loop_lag_ms": summarize(monitor.lags_ms),
+        "max_rss_mb": max_rss_mb(),
+    }
+
+
+def _format_report(result: Dict[str, Any]) -> str:
+    lines = [
+        f"councils: {result['succeeded']}/{result['councils']}"
+        f" at concurrency {result['concurrency']} in {result['duration_seconds']}s",
+        f"throughput: {result['councils_per_second']} councils/sec",
+    ]
+    for name, summary in result["latency_ms"].items():
+        if summary["count"]:
+            lines.append(
+                f"{name:>7} ms  p50={summary['p50']:.1f}"
+                f" p95={summary['p95']:.1f} p99={summary['p99']:.1f}"
+            )
+    lag = result["event_loop_lag_ms"]
+    if lag["count"]:
+        lines.append(f"loop lag ms  p99={lag['p99']:.2f} max={lag['max']:.2f}")
+    lines.append(f"max rss: {result['max_rss_mb']} MB")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the council API in-process against the mock gateway."
+    )
+    parser.add_argument("--councils", type=int, default=100, help="Total councils to run")
+    parser.add_argument("--concurrency", type=int, default=10, help="Councils in flight")
+    parser.add_argument("--mock-config", help="JSON file of mock gateway publisher profiles")
+    parser.add_argument("--output", help="Write the JSON result to this path")
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(
+        run_benchmark(args.councils, args.concurrency, load_config(args.mock_config))
+    )
+    print(_format_report(result))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(result, handle, indent=2)
+            handle.write("\n")
+
+
+if __name__ == "__main__":
+    main()
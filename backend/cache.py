@@ -0,0 +1,175 @@
+"""ABOUTME: Tiered cache for stage-1 council opinions.
+ABOUTME: Combines an in-memory LRU with an optional shared SQLite tier."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import sqlite3
+from collections import OrderedDict
+from contextlib import contextmanager
+from time import time
+from typing import Callable, Iterator, Optional
+
+from backend.config import settings
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query used for keys."""
+    return " ".join(query.lower().split())
+
+
+class OpinionCache:
+    """Two-tier TTL cache mapping a stage-1 prompt to a member's opinion.
+
+    Lookups check the in-process LRU first, then the SQLite file (if
+    configured), promoting disk hits into memory. The SQLite tier uses WAL
+    mode so several uvicorn workers can share one file. Expiry uses the wall
+    clock because entries outlive any single process.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        sqlite_path: Optional[str] = None,
+        sqlite_max_entries: int = 10_000,
+        clock: Callable[[], float] = time,
+    ) -> None:
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.sqlite_path = sqlite_path
+        self.sqlite_max_entries = max(1, sqlite_max_entries)
+        self._clock = clock
+        self._memory: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        if sqlite_path:
+            self._init_sqlite()
+
+    @staticmethod
+    def make_key(model: str, system_prompt: Optional[str], query: str) -> str:
+        material = json.dumps([model, system_prompt or "", normalize_query(query)])
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "memory_entries": len(self._memory),
+        }
+
+    async def get(self, key: str) -> Optional[str]:
+        now = self._clock()
+        entry = self._memory.get(key)
+        if entry is not None:
+            expires_at, content = entry
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return content
+            del self._memory[key]
+
+        if self.sqlite_path:
+            row = await asyncio.to_thread(self._sqlite_get, key, now)
+            if row is not None:
+                expires_at, content = row
+                self._remember(key, content, expires_at)
+                self.hits += 1
+                self.disk_hits += 1
+                return content
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, content: str) -> None:
+        expires_at = self._clock() + self.ttl_seconds
+        self._remember(key, content, expires_at)
+        if self.sqlite_path:
+            await asyncio.to_thread(self._sqlite_set, key, content, expires_at)
+
+    def clear(self) -> None:
+        self._memory.clear()
+        if self.sqlite_path:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM opinions")
+
+    def _remember(self, key: str, content: str, expires_at: float) -> None:
+        self._memory[key] = (expires_at, content)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        # A short-lived connection per operation keeps worker threads from
+        # sharing a connection object.
+        conn = sqlite3.connect(self.sqlite_path, timeout=5.0)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _init_sqlite(self) -> None:
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS opinions ("
+                " key TEXT PRIMARY KEY,"
+                " content TEXT NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS opinions_accessed ON opinions (accessed_at)"
+            )
+
+    def _sqlite_get(self, key: str, now: float) -> Optional[tuple[float, str]]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT expires_at, content FROM opinions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[0] <= now:
+                conn.execute("DELETE FROM opinions WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE opinions SET accessed_at = ? WHERE key = ?", (now, key))
+            return row[0], row[1]
+
+    def _sqlite_set(self, key: str, content: str, expires_at: float) -> None:
+        now = self._clock()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO opinions (key, content, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, content, expires_at, now),
+            )
+            conn.execute("DELETE FROM opinions WHERE expires_at <= ?", (now,))
+            conn.execute(
+                "DELETE FROM opinions WHERE key IN ("
+                " SELECT key FROM opinions ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.sqlite_max_entries,),
+            )
+
+
+_opinion_cache: Optional[OpinionCache] = None
+
+
+def get_opinion_cache() -> Optional[OpinionCache]:
+    """Return the process-wide opinion cache, or ``None`` when disabled."""
+    global _opinion_cache
+    if not settings.opinion_cache_enabled:
+        return None
+    if _opinion_cache is None:
+        _opinion_cache = OpinionCache(
+            max_entries=settings.opinion_cache_max_entries,
+            ttl_seconds=settings.opinion_cache_ttl_seconds,
+            sqlite_path=settings.opinion_cache_sqlite_path,
+            sqlite_max_entries=settings.opinion_cache_sqlite_max_entries,
+        )
+    return _opinion_cache
@@ -0,0 +1,150 @@
+"""ABOUTME: Record/replay cassettes for gateway traffic.
+ABOUTME: An httpx transport that captures responses to disk and serves them back."""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import hashlib
+import json
+from time import perf_counter
+from typing import IO, Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+RECORD = "record"
+REPLAY = "replay"
+
+# Envelope fields that vary per caller but do not change the upstream answer.
+_IGNORED_FIELDS = ("agentWallet",)
+
+
+class CassetteMissError(httpx.TransportError):
+    """Raised in replay mode when the cassette has no matching request."""
+
+
+def _envelope(content: bytes) -> Any:
+    """The request envelope without caller-specific fields, or ``None`` if not JSON."""
+    try:
+        envelope = json.loads(content)
+    except ValueError:
+        return None
+    if isinstance(envelope, dict):
+        for field in _IGNORED_FIELDS:
+            envelope.pop(field, None)
+    return envelope
+
+
+def request_key(content: bytes) -> str:
+    """Stable key for a gateway request envelope, ignoring the caller wallet."""
+    envelope = _envelope(content)
+    if envelope is None:
+        canonical = content
+    else:
+        canonical = json.dumps(envelope, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.sha256(canonical).hexdigest()[:32]
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def load_cassette(path: str) -> Dict[str, List[Dict[str, Any]]]:
+    """Read a cassette into ``{key: [interaction, ...]}`` in recorded order."""
+    interactions: Dict[str, List[Dict[str, Any]]] = {}
+    with _open(path, "r") as handle:
+        for line in handle:
+            if line.strip():
+                entry = json.loads(line)
+                interactions.setdefault(entry["key"], []).append(entry)
+    return interactions
+
+
+class CassetteTransport(httpx.AsyncBaseTransport):
+    """Records gateway responses to a JSON-lines cassette, or replays them.
+
+    In record mode every request goes to ``inner`` and the request envelope
+    (minus the caller wallet) plus the response body, status, content type
+    and latency are appended to ``path`` (gzipped when
+    the path ends in ``.gz``). In replay mode responses come from the
+    cassette, after the recorded latency or immediately when
+    ``replay_latency`` is ``"zero"``. Repeated requests with the same key
+    cycle through the recorded answers in order.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        mode: str,
+        *,
+        inner: Optional[httpx.AsyncBaseTransport] = None,
+        replay_latency: str = "original",
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.replay_latency = replay_latency
+        self._sleep = sleep
+        self._inner = inner
+        self._interactions: Dict[str, List[Dict[str, Any]]] = {}
+        self._cursors: Dict[str, int] = {}
+        if mode == REPLAY:
+            self._interactions = load_cassette(path)
+        elif self._inner is None:
+            self._inner = httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = request_key(request.content)
+        if self.mode == REPLAY:
+            return await self._replay(key, request)
+        return await self._record(key, request)
+
+    async def _record(self, key: str, request: httpx.Request) -> httpx.Response:
+        assert self._inner is not None
+        started = perf_counter()
+        response = await self._inner.handle_async_request(request)
+        try:
+            body = await response.aread()
+        finally:
+            await response.aclose()
+        elapsed = perf_counter() - started
+        entry = {
+            "key": key,
+            "request": _envelope(request.content),
+            "status": response.status_code,
+            "content_type": response.headers.get("content-type", ""),
+            "body": body.decode("utf-8", errors="replace"),
+            "elapsed": round(elapsed, 4),
+        }
+        with _open(self.path, "a") as handle:
+            handle.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        return self._response(entry, request)
+
+    async def _replay(self, key: str, request: httpx.Request) -> httpx.Response:
+        recorded = self._interactions.get(key)
+        if not recorded:
+            raise CassetteMissError(f"No cassette entry for request {key}", request=request)
+        cursor = self._cursors.get(key, 0)
+        self._cursors[key] = cursor + 1
+        entry = recorded[cursor % len(recorded)]
+        if self.replay_latency == "original" and entry["elapsed"] > 0:
+            await self._sleep(entry["elapsed"])
+        return self._response(entry, request)
+
+    @staticmethod
+    def _response(entry: Dict[str, Any], request: httpx.Request) -> httpx.Response:
+        headers = {"content-type": entry["content_type"]} if entry["content_type"] else {}
+        return httpx.Response(
+            entry["status"],
+            headers=headers,
+            content=entry["body"].encode("utf-8"),
+            request=request,
+        )
+
+    async def aclose(self) -> None:
+        if self._inner is not None:
+            await self._inner.aclose()
@@ -1,27 +1,16 @@
 """ABOUTME: Configuration helpers for Seren LLM Council backend.
-ABOUTME: Loads council roster and runtime settings from environment."""
-
-from pydantic import Field
-from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+ABOUTME: Loads runtime settings from environment and serves the council roster."""
 
+import math
+from statistics import median
 
-class CouncilMember:
-    """Represents a single council model configuration."""
+from pydantic import Field, PrivateAttr
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Any, Literal, Optional
 
-    def __init__(
-        self,
-        name: str,
-        publisher_id: str,
-        model: str,
-        endpoint_path: str = "/chat/completions",
-        api_format: str = "openai",
-    ):
-        self.name = name
-        self.publisher_id = publisher_id
-        self.model = model
-        self.endpoint_path = endpoint_path
-        self.api_format = api_format  # "openai" or "anthropic"
+from backend.resilience import OPEN, BreakerRegistry
+from backend.roster import DEFAULT_ROSTER, CouncilMember, Roster, RosterSource, build_roster
+from backend.stats import StatsRegistry
 
 
 class Settings(BaseSettings):
@@ -41,29 +30,229 @@ class Settings(BaseSettings):
     request_timeout_seconds: int = 120
     flat_fee_usd: float = 0.75
 
+    # End-to-end deadline budget. Each stage receives its weight's share of
+    # whatever budget remains when it starts; retries that cannot get at least
+    # min_attempt_seconds of budget are skipped.
+    default_deadline_seconds: float = 240.0
+    deadline_stage1_weight: float = 0.45
+    deadline_stage2_weight: float = 0.30
+    deadline_stage3_weight: float = 0.25
+    min_attempt_seconds: float = 2.0
+
+    # Per-publisher circuit breaker and retry policy
+    breaker_failure_threshold: int = 5
+    breaker_reset_seconds: float = 30.0
+    retry_backoff_base_seconds: float = 0.5
+    retry_backoff_max_seconds: float = 8.0
+    retry_budget_ratio: float = 0.2
+    retry_budget_min_tokens: float = 10.0
+    retry_budget_max_tokens: float = 100.0
+
+    # Hedged stage-1 requests. A member slower than its publisher's recent
+    # hedge_percentile latency gets a duplicate call, to itself or to its
+    # hedge_backup_members entry; hedges are capped at hedge_max_rate of
+    # requests. A backup is a model id (routed like a chairman model) or a
+    # roster member name; members already seated are never used, so roster
+    # backups only take effect in fast mode.
+    hedging_enabled: bool = False
+    hedge_percentile: float = 0.9
+    hedge_min_samples: int = 20
+    hedge_max_rate: float = 0.1
+    hedge_budget_min_tokens: float = 2.0
+    hedge_budget_max_tokens: float = 20.0
+    hedge_backup_members: dict[str, str] = Field(default_factory=dict)
+    stats_window: int = 200
+    stats_ewma_alpha: float = 0.2
+
+    # Council modes. "fast" asks only the fast_mode_members members with the
+    # lowest recent EWMA latency / success rate; "lite" skips stage 2.
+    fast_mode_members: int = 3
+
+    # Consensus short-circuit: when the mean pairwise TF-IDF agreement of the
+    # stage-1 opinions reaches consensus_threshold, stage 2 is skipped and the
+    # answer is either the medoid opinion as-is ("medoid") or a chairman
+    # synthesis without critiques ("chairman").
+    consensus_enabled: bool = False
+    consensus_threshold: float = 0.8
+    consensus_short_answer_words: int = 12
+    consensus_synthesis: Literal["medoid", "chairman"] = "medoid"
+
+    # Stage-2 critique topology: "all" shows every critic every response;
+    # "round_robin" and "bibd" show each critic critique_peers responses
+    # (never its own) and give every response at least critique_min_reviews
+    # critics.
+    critique_topology: Literal["all", "round_robin", "bibd"] = "all"
+    critique_peers: int = 3
+    critique_min_reviews: int = 2
+
+    # Stage-2 rank aggregation. ranking_method orders the opinions; with
+    # chairman_top_k > 0 the chairman only sees the top-k opinions and the
+    # critiques written by their authors.
+    ranking_method: Literal["borda", "copeland", "kemeny"] = "borda"
+    chairman_top_k: int = 0
+
+    # Generation budgets (max output tokens) per stage; calls made outside a
+    # council use default_max_tokens. member_max_tokens overrides them per
+    # member name ("chairman" for the chairman), e.g. {"gpt5": {"stage2": 4096}}.
+    # Roster members marked as reasoning models count hidden reasoning tokens
+    # against the budget, so their stage budgets get reasoning_token_allowance
+    # added unless member_max_tokens sets one explicitly.
+    default_max_tokens: int = 4096
+    stage1_max_tokens: int = 4096
+    stage2_max_tokens: int = 1024
+    stage3_max_tokens: int = 4096
+    member_max_tokens: dict[str, dict[str, int]] = Field(default_factory=dict)
+    reasoning_token_allowance: int = 8192
+
+    # Ask stage-2 critics for schema-conforming JSON via response_format, for
+    # OpenAI-format members whose roster entry allows structured output.
+    stage2_structured_output: bool = True
+
+    # Provider prompt caching. Stage-2/3 prompts put the question and the
+    # anonymized stage-1 responses first; Anthropic-format calls mark that
+    # shared prefix with a cache_control breakpoint when the same model sends
+    # it more than once in a council (caches are per model).
+    prompt_caching_enabled: bool = True
+
+    # Token accounting. token_prices_usd maps a model id to USD per million
+    # "input", "output" and (optionally) "cached_input" tokens; unpriced
+    # models report tokens without a cost. The per-publisher usage ledger
+    # covers the last usage_ledger_window_seconds.
+    token_prices_usd: dict[str, dict[str, float]] = Field(default_factory=dict)
+    usage_ledger_window_seconds: float = 300.0
+
+    # Coalesce concurrent identical councils onto one in-flight deliberation.
+    # By default only requests from the same wallet are shared, so upstream
+    # calls stay billed to the wallet that asked.
+    coalesce_enabled: bool = True
+    coalesce_across_wallets: bool = False
+
+    # Stage-1 opinion cache: in-memory LRU plus an optional SQLite file that
+    # several workers can share.
+    opinion_cache_enabled: bool = True
+    opinion_cache_ttl_seconds: float = 3600.0
+    opinion_cache_max_entries: int = 1024
+    opinion_cache_sqlite_path: Optional[str] = None
+    opinion_cache_sqlite_max_entries: int = 10_000
+
+    # Near-duplicate reuse: a new query whose MinHash similarity to a past one
+    # reaches the threshold reuses its final response ("response") or only its
+    # stage-1 opinions ("opinions").
+    near_duplicate_enabled: bool = False
+    near_duplicate_threshold: float = 0.85
+    near_duplicate_reuse: Literal["response", "opinions"] = "response"
+    near_duplicate_max_entries: int = 2048
+    near_duplicate_num_perm: int = 64
+    near_duplicate_bands: int = 16
+
+    # Asynchronous council jobs. Without job_store_path jobs live in memory;
+    # with it they are kept in a SQLite file. Finished jobs are evicted after
+    # job_retention_seconds, or oldest first beyond job_max_finished.
+    job_max_concurrency: int = 4
+    job_store_path: Optional[str] = None
+    job_retention_seconds: float = 86_400.0
+    job_max_finished: int = 10_000
+    webhook_timeout_seconds: float = 10.0
+
+    # Batch councils: per-publisher in-flight cap shared by the whole batch,
+    # and how many councils from one batch may be in progress at once.
+    batch_max_queries: int = 1000
+    batch_publisher_concurrency: int = 8
+    batch_max_concurrent_councils: int = 16
+
+    # Tracing: finished council traces go to the collector URL if set,
+    # otherwise to a JSON-lines file if a path is set.
+    trace_export_path: Optional[str] = None
+    trace_collector_url: Optional[str] = None
+
+    # Optional TOML/JSON roster of members and chairman routes; the file is
+    # re-read when its mtime changes, checked at most every interval.
+    roster_path: Optional[str] = None
+    roster_reload_interval_seconds: float = 2.0
+
+    # Gateway cassettes: "record" captures responses to cassette_path,
+    # "replay" serves them back (with original or zero latency) offline.
+    cassette_mode: Literal["off", "record", "replay"] = "off"
+    cassette_path: Optional[str] = None
+    cassette_replay_latency: Literal["original", "zero"] = "original"
+
+    # Early quorum: once min_responses_required members succeed, wait at most
+    # quorum_grace_seconds for the rest of a stage before cutting them off.
+    quorum_enabled: bool = False
+    quorum_grace_seconds: float = 2.0
+
+    # Shared gateway connection pool (one per worker process)
+    http2_enabled: bool = True
+    pool_max_connections: int = 100
+    pool_max_keepalive_connections: int = 20
+    pool_keepalive_expiry_seconds: float = 30.0
+
     model_config = SettingsConfigDict(
         env_file=".env",
         env_file_encoding="utf-8",
     )
 
-    def get_council_members(self) -> list[CouncilMember]:
-        members = [
-            CouncilMember(
-                "claude",
-                self.claude_publisher_id,
-                "claude-sonnet-4-5",
-                endpoint_path="/messages",
-                api_format="anthropic",
-            ),
-            CouncilMember("gpt5", self.openai_publisher_id, "gpt-5.2"),
-            CouncilMember("kimi", self.moonshot_publisher_id, "kimi-k2-0711-preview"),
-            CouncilMember("gemini", self.gemini_publisher_id, "google/gemini-3-pro-preview"),
-            CouncilMember("sonar", self.perplexity_publisher_id, "sonar"),
-        ]
-        self._validate_member_models(members)
-        return members
-
-    def _validate_member_models(self, members: list[CouncilMember]) -> None:
+    _roster_source: Optional[RosterSource] = PrivateAttr(default=None)
+
+    def roster(self) -> Roster:
+        """The current immutable roster, built once and reloaded on file change."""
+        if self._roster_source is None:
+            self._roster_source = RosterSource(
+                self._build_roster,
+                self.roster_path,
+                self.roster_reload_interval_seconds,
+            )
+        return self._roster_source.current()
+
+    def _build_roster(self, spec: Optional[dict[str, Any]]) -> Roster:
+        if spec is not None:
+            return build_roster(spec, self)
+        roster = build_roster(DEFAULT_ROSTER, self)
+        self._validate_member_models(roster.members)
+        return roster
+
+    def get_council_members(self) -> tuple[CouncilMember, ...]:
+        return self.roster().members
+
+    def select_council_members(
+        self,
+        mode: str = "full",
+        stats: Optional[StatsRegistry] = None,
+        breakers: Optional[BreakerRegistry] = None,
+    ) -> tuple[CouncilMember, ...]:
+        """Members that sit on a council in ``mode``, in roster order.
+
+        Fast mode keeps the ``fast_mode_members`` members whose publishers
+        have the lowest expected stage-1 latency (EWMA latency over EWMA
+        success rate). Members without recent stats get the median of the
+        measured members as a neutral prior, so a member that keeps failing
+        drops behind them; ties go to measured members, then roster order.
+        Publishers with an open circuit or only failures rank last.
+        """
+        members = self.get_council_members()
+        if mode != "fast" or self.fast_mode_members >= len(members):
+            return members
+
+        measured: dict[str, Optional[float]] = {}
+        if stats is not None:
+            for member in members:
+                measured[member.name] = stats.get(member.publisher_id, "stage1").expected_seconds()
+        finite = [seconds for seconds in measured.values() if seconds not in (None, math.inf)]
+        prior = median(finite) if finite else 0.0
+
+        def expected(member: CouncilMember) -> tuple[int, float, int]:
+            if breakers is not None and breakers.get(member.publisher_id).state == OPEN:
+                return (1, 0.0, 0)
+            seconds = measured.get(member.name)
+            if seconds is None:
+                return (0, prior, 1)
+            return (1, 0.0, 0) if seconds == math.inf else (0, seconds, 0)
+
+        ranked = sorted(members, key=expected)  # stable: ties keep roster order
+        chosen = set(ranked[: max(1, self.fast_mode_members)])
+        return tuple(member for member in members if member in chosen)
+
+    def _validate_member_models(self, members: tuple[CouncilMember, ...]) -> None:
         expected_models = {
             "claude": "claude-sonnet-4-5",
             "gpt5": "gpt-5.2",
@@ -78,33 +267,41 @@ class Settings(BaseSettings):
                     f"Model mismatch for {member.name}: expected {expected}, got {member.model}"
                 )
 
+    def max_tokens_for(self, member_name: str, stage: str, reasoning: bool = False) -> int:
+        """Generation budget for ``member_name`` in ``stage``.
+
+        ``reasoning`` members get ``reasoning_token_allowance`` on top of the
+        stage budget; an explicit ``member_max_tokens`` entry is used as is.
+        """
+        override = self.member_max_tokens.get(member_name, {}).get(stage)
+        if override is not None:
+            return override
+        budgets = {
+            "stage1": self.stage1_max_tokens,
+            "stage2": self.stage2_max_tokens,
+            "stage3": self.stage3_max_tokens,
+        }
+        budget = budgets.get(stage, self.default_max_tokens)
+        return budget + self.reasoning_token_allowance if reasoning else budget
+
     def get_chairman_config(self, chairman_override: Optional[str] = None) -> CouncilMember:
-        model_name = chairman_override or self.default_chairman
-
-        # Route to correct publisher based on model name
-        if model_name.startswith("claude"):
-            return CouncilMember(
-                "chairman",
-                self.claude_publisher_id,
-                model_name,
-                endpoint_path="/messages",
-                api_format="anthropic",
-            )
-        elif model_name.startswith("gpt"):
-            return CouncilMember(
-                "chairman",
-                self.openai_publisher_id,
-                model_name,
-            )
-        else:
-            # Default to Claude for unknown models
-            return CouncilMember(
-                "chairman",
-                self.claude_publisher_id,
-                model_name,
-                endpoint_path="/messages",
-                api_format="anthropic",
-            )
+        return self.roster().chairman(chairman_override or self.default_chairman)
+
+
+_settings: Optional[Settings] = None
+
+
+def get_settings() -> Settings:
+    """Process-wide settings, read from the environment on first use."""
+    global _settings
+    if _settings is None:
+        _settings = Settings()
+    return _settings
 
 
-settings = Settings()
+def __getattr__(name: str) -> Any:
+    # ``from backend.config import settings`` keeps working, but only builds
+    # the settings when a module that needs them is imported.
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
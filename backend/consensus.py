@@ -0,0 +1,138 @@
+"""ABOUTME: Local agreement scoring for stage-1 opinions.
+ABOUTME: Negation-aware TF-IDF cosine similarity plus matching of short factual answers."""
+
+from __future__ import annotations
+
+import math
+import re
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Sequence, Tuple
+
+# \w is Unicode-aware, so Cyrillic, Greek, CJK and accented text tokenize too.
+_WORD = re.compile(r"\w+(?:['.]\w+)*")
+# A negation holds until the end of its clause.
+_CLAUSE_END = re.compile(r"[,;:!?\n]|\.(?=\s|$)")
+_ARTICLES = frozenset({"a", "an", "the"})
+_NEGATIONS = frozenset({"not", "no", "never", "nor", "cannot", "without", "neither"})
+# Function words that long answers share whatever they say; they would
+# otherwise drown out the few content words where two answers differ.
+_STOPWORDS = _ARTICLES | frozenset(
+    {
+        "and", "or", "but", "if", "then", "so", "of", "to", "in", "on", "at", "by",
+        "for", "with", "from", "as", "into", "about", "it", "its", "this", "that",
+        "these", "those", "is", "are", "was", "were", "be", "been", "being", "do",
+        "does", "did", "have", "has", "had", "will", "would", "should", "could",
+        "can", "may", "might", "must", "you", "your", "we", "our", "they", "their",
+        "i", "he", "she", "which", "what", "there", "here", "also", "just", "very",
+    }
+)
+
+
+@dataclass(frozen=True, slots=True)
+class Agreement:
+    """How closely a set of answers agree.
+
+    ``score`` is the mean pairwise similarity in ``[0, 1]``; ``medoid`` is
+    the index of the answer most similar to all the others.
+    """
+
+    score: float
+    medoid: int
+
+
+def _is_negation(token: str) -> bool:
+    return token in _NEGATIONS or token.endswith("n't")
+
+
+def _tokens(text: str) -> List[str]:
+    """Content words of ``text``, marked ``not_`` inside a negated clause.
+
+    "index the key" and "do not index the key" then share no terms, where
+    plain bag-of-words would score them as near-identical.
+    """
+    tokens: List[str] = []
+    for clause in _CLAUSE_END.split(text.lower().replace("\u2019", "'")):
+        negated = False
+        for word in _WORD.findall(clause):
+            if _is_negation(word):
+                negated = True
+                tokens.append("not")
+            elif word not in _STOPWORDS:
+                tokens.append(f"not_{word}" if negated else word)
+    return tokens
+
+
+def _normalized_answer(tokens: Sequence[str]) -> str:
+    return " ".join(tokens)
+
+
+def _polarity(tokens: Sequence[str]) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    """Terms ``tokens`` only assert and terms they only negate."""
+    asserted = {token for token in tokens if not token.startswith("not_")}
+    negated = {token[4:] for token in tokens if token.startswith("not_")}
+    return frozenset(asserted - negated), frozenset(negated - asserted)
+
+
+def _tfidf_vectors(documents: Sequence[Sequence[str]]) -> List[Dict[str, float]]:
+    """L2-normalized TF-IDF vectors with smoothed IDF, as sparse dicts."""
+    count = len(documents)
+    document_frequency: Dict[str, int] = {}
+    for tokens in documents:
+        for term in set(tokens):
+            document_frequency[term] = document_frequency.get(term, 0) + 1
+    idf = {
+        term: math.log((1 + count) / (1 + frequency)) + 1.0
+        for term, frequency in document_frequency.items()
+    }
+    vectors = []
+    for tokens in documents:
+        weights: Dict[str, float] = {}
+        for term in tokens:
+            weights[term] = weights.get(term, 0.0) + idf[term]
+        norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+        vectors.append({term: weight / norm for term, weight in weights.items()} if norm else {})
+    return vectors
+
+
+def _cosine(left: Dict[str, float], right: Dict[str, float]) -> float:
+    if len(left) > len(right):
+        left, right = right, left
+    return sum(weight * right.get(term, 0.0) for term, weight in left.items())
+
+
+def agreement(texts: Sequence[str], short_answer_words: int = 12) -> Agreement:
+    """Score how much ``texts`` agree with each other.
+
+    Pairs are compared by TF-IDF cosine similarity. When both answers of a
+    pair have at most ``short_answer_words`` content words they also count as
+    a full match if they are equal after lowercasing and dropping punctuation
+    and stopwords, so "Paris." and "paris" agree even though short texts give
+    TF-IDF little to work with. Answers with no words left never match, and
+    a pair where one answer asserts a term the other only negates ("index
+    the key" against "do not index the key") counts as no agreement at all.
+    """
+    if len(texts) < 2:
+        return Agreement(score=1.0, medoid=0)
+    documents = [_tokens(text) for text in texts]
+    vectors = _tfidf_vectors(documents)
+    polarities = [_polarity(tokens) for tokens in documents]
+    short = [
+        _normalized_answer(tokens) if len(tokens) <= short_answer_words else None
+        for tokens in documents
+    ]
+    totals = [0.0] * len(texts)
+    pair_sum = 0.0
+    for i in range(len(texts)):
+        for j in range(i + 1, len(texts)):
+            similarity = _cosine(vectors[i], vectors[j])
+            if short[i] and short[i] == short[j]:
+                similarity = 1.0
+            similarity = min(1.0, similarity)
+            if polarities[i][0] & polarities[j][1] or polarities[i][1] & polarities[j][0]:
+                similarity = 0.0
+            totals[i] += similarity
+            totals[j] += similarity
+            pair_sum += similarity
+    pairs = len(texts) * (len(texts) - 1) // 2
+    medoid = max(range(len(texts)), key=lambda index: totals[index])
+    return Agreement(score=pair_sum / pairs, medoid=medoid)
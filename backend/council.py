@@ -5,46 +5,108 @@ from __future__ import annotations
 
 import asyncio
 import json
+import re
+from contextlib import contextmanager
 from time import perf_counter
-from typing import List, Optional
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+)
 
+from backend.cache import OpinionCache, get_opinion_cache, normalize_query
 from backend.config import CouncilMember, settings
+from backend.consensus import agreement
+from backend.deadline import Deadline
+from backend.metrics import time_council, time_stage
+from backend.ranking import aggregate, ballot_from_labels
 from backend.models import (
+    CallTiming,
     CouncilMetadata,
     CouncilResponse,
+    CouncilTimings,
+    RankingSummary,
     Stage1ResponseModel,
     Stage2CritiqueModel,
+    StageTiming,
+    TokenUsage,
+    UsageSummary,
+)
+from backend.resilience import PublisherLimiter
+from backend.similarity import get_near_duplicate_index
+from backend.topology import assign_critiques
+from backend.tracing import Span, get_tracer
+from backend.usage import Usage, UsageTotal, summarize
+from backend.x402_client import (
+    LLMResponse,
+    PaymentRequiredError,
+    SplitPrompt,
+    X402Client,
+    get_shared_client,
 )
-from backend.x402_client import LLMResponse, PaymentRequiredError, X402Client
 
 STAGE1_SYSTEM_PROMPT = (
     "You are a council member. Provide your best independent answer to the question."
 )
+# Stage 2 and 3 prompts share a prefix (question plus anonymized responses)
+# so publishers can serve it from their prompt cache; only the suffix varies.
+STAGE_CONTEXT_TEMPLATE = (
+    "Question: {query}\n\n"
+    "Council responses, anonymized as R1, R2, etc.:\n{responses}\n\n"
+)
 STAGE2_PROMPT_TEMPLATE = (
-    "You are critiquing peer responses to the question: {query}.\n\n"
-    "Responses are anonymized as R1, R2, etc. Here they are:\n{responses}\n\n"
+    "You are critiquing the peer responses to the question above.\n"
     "Return ONLY valid JSON with keys 'analysis' (string) and 'rankings' (array"
     " of response IDs from best to worst). Do not reveal model names."
 )
+# json_schema response_format for stage 2, mirroring STAGE2_PROMPT_TEMPLATE.
+STAGE2_RESPONSE_SCHEMA = {
+    "name": "critique",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "analysis": {"type": "string"},
+            "rankings": {"type": "array", "items": {"type": "string"}},
+        },
+        "required": ["analysis", "rankings"],
+        "additionalProperties": False,
+    },
+}
 STAGE3_PROMPT_TEMPLATE = (
-    "You are the chairman synthesizing all insights.\nQuestion: {query}\n\n"
-    "Stage 1 responses:\n{responses}\n\nStage 2 critiques:\n{critiques}\n\n"
+    "You are the chairman synthesizing all insights.\n"
+    "Response authors: {authors}\n\nStage 2 critiques:\n{critiques}\n\n"
     "Write a final, well-structured answer referencing the best ideas."
 )
 
 
-def _summarize_stage1(responses: List[LLMResponse]) -> str:
-    lines = []
-    for idx, response in enumerate(responses, start=1):
-        status = response.content if response.success else f"ERROR: {response.error or 'unknown'}"
-        lines.append(f"Response {idx} ({response.model_name}): {status}")
-    return "\n".join(lines)
+def _stage_context(
+    query: str,
+    responses: List[LLMResponse],
+    indexes: Optional[Sequence[int]] = None,
+) -> str:
+    return STAGE_CONTEXT_TEMPLATE.format(
+        query=query, responses=_summarize_stage1_anonymized(responses, indexes)
+    )
 
 
-def _summarize_stage1_anonymized(responses: List[LLMResponse]) -> str:
+def _summarize_stage1_anonymized(
+    responses: List[LLMResponse],
+    indexes: Optional[Sequence[int]] = None,
+) -> str:
+    """Anonymized responses labelled R1..Rn by their position in ``responses``.
+
+    With ``indexes`` only those responses are listed, keeping their labels.
+    """
     lines = []
-    for idx, response in enumerate(responses, start=1):
-        label = f"R{idx}"
+    for idx in indexes if indexes is not None else range(len(responses)):
+        response = responses[idx]
+        label = f"R{idx + 1}"
         status = response.content if response.success else f"ERROR: {response.error or 'unknown'}"
         lines.append(f"{label}: {status}")
     return "\n".join(lines)
@@ -61,70 +123,693 @@ def _summarize_stage2(responses: List[LLMResponse]) -> str:
     return "\n".join(lines)
 
 
+_JSON_FENCE = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.DOTALL | re.IGNORECASE)
+
+
+def _extract_json_object(content: str) -> Optional[dict]:
+    """The critique's JSON object, tolerating code fences and surrounding prose.
+
+    Tries the whole text, then each fenced block, then the span from the
+    first ``{`` to the last ``}``.
+    """
+    candidates = [content.strip(), *_JSON_FENCE.findall(content)]
+    start, end = content.find("{"), content.rfind("}")
+    if 0 <= start < end:
+        candidates.append(content[start : end + 1])
+    for candidate in candidates:
+        try:
+            data = json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(data, dict):
+            return data
+    return None
+
+
 def _parse_stage2_output(content: str) -> tuple[str, list[str]]:
-    try:
-        data = json.loads(content)
-        analysis = data.get("analysis") or ""
-        rankings = data.get("rankings") or []
-        if not isinstance(rankings, list):
-            rankings = []
-        rankings = [str(item) for item in rankings if isinstance(item, str)]
-        return analysis or content, rankings
-    except json.JSONDecodeError:
+    data = _extract_json_object(content)
+    if data is None:
         return content, []
+    analysis = data.get("analysis")
+    rankings = data.get("rankings") or []
+    if not isinstance(rankings, list):
+        rankings = []
+    rankings = [str(item) for item in rankings if isinstance(item, str)]
+    return (analysis if isinstance(analysis, str) and analysis else content), rankings
+
+
+UsageRecord = tuple[str, str, Usage]
+
+
+def _usage_records(stage: str, responses: List[LLMResponse]) -> List[UsageRecord]:
+    return [
+        (stage, response.model_name, response.usage)
+        for response in responses
+        if response.usage is not None
+    ]
+
+
+def _token_usage(total: UsageTotal) -> TokenUsage:
+    usage = total.usage
+    return TokenUsage(
+        calls=total.calls,
+        input_tokens=usage.input_tokens,
+        output_tokens=usage.output_tokens,
+        cached_input_tokens=usage.cached_input_tokens,
+        cost_usd=usage.cost_usd,
+    )
+
+
+def _usage_metadata(records: List[UsageRecord]) -> dict[str, Any]:
+    """``usage`` and per-stage ``cached_input_tokens`` metadata, from calls that reported usage."""
+    if not records:
+        return {}
+    total, stages, members = summarize(records)
+    return {
+        "usage": UsageSummary(
+            total=_token_usage(total),
+            stages={stage: _token_usage(value) for stage, value in stages.items()},
+            members={member: _token_usage(value) for member, value in members.items()},
+        ),
+        "cached_input_tokens": {
+            stage: value.usage.cached_input_tokens for stage, value in stages.items()
+        },
+    }
+
+
+def _stage1_model(response: LLMResponse) -> Stage1ResponseModel:
+    return Stage1ResponseModel(
+        model=response.model_name,
+        content=response.content,
+        success=response.success,
+        error=response.error,
+    )
+
+
+def _stage2_model(response: LLMResponse) -> Stage2CritiqueModel:
+    return Stage2CritiqueModel(
+        model=response.model_name,
+        analysis=response.content,
+        rankings=response.rankings or [],
+        success=response.success,
+        error=response.error,
+    )
+
+
+async def _report(
+    listeners: Sequence[ProgressCallback], event: str, payloads: List[dict]
+) -> None:
+    """Tell every listener about a finished stage, one payload at a time."""
+    for payload in payloads:
+        for listener in list(listeners):
+            await listener(event, payload)
+
+
+def _opinions_from_response(response: CouncilResponse) -> List[LLMResponse]:
+    return [
+        LLMResponse(
+            model_name=opinion.model,
+            content=opinion.content,
+            success=opinion.success,
+            error=opinion.error,
+            cached=True,
+        )
+        for opinion in response.stage1_responses.values()
+    ]
+
+
+def _failed_response(member: CouncilMember, exc: BaseException) -> LLMResponse:
+    return LLMResponse(
+        model_name=member.name,
+        content="",
+        success=False,
+        error=str(exc),
+    )
+
+
+async def _iter_completed(
+    calls: List[Awaitable[LLMResponse]],
+    quorum: Optional[int] = None,
+    grace_seconds: float = 0.0,
+) -> AsyncIterator[tuple[int, LLMResponse]]:
+    """Yield ``(index, response)`` pairs in completion order.
+
+    With a ``quorum``, iteration stops ``grace_seconds`` after that many
+    calls have succeeded. Calls still pending when iteration ends (or when
+    one of them raises) are cancelled.
+    """
+    loop = asyncio.get_running_loop()
+    tasks = [asyncio.ensure_future(call) for call in calls]
+    positions = {task: idx for idx, task in enumerate(tasks)}
+    pending = set(tasks)
+    successes = 0
+    cutoff: Optional[float] = None
+    try:
+        while pending:
+            if cutoff is None and quorum is not None and successes >= quorum:
+                cutoff = loop.time() + grace_seconds
+            timeout = None if cutoff is None else max(0.0, cutoff - loop.time())
+            done, pending = await asyncio.wait(
+                pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                break
+            for task in done:
+                response = task.result()
+                if response.success:
+                    successes += 1
+                yield positions[task], response
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def _timings(root: Span) -> CouncilTimings:
+    """Summarize the stage and gateway spans finished so far under ``root``."""
+    stage_spans: List[Span] = []
+    calls: List[CallTiming] = []
+    last_call: dict[str, tuple[float, str]] = {}
+    for span in root.trace_spans:
+        attributes = span.attributes
+        if span.name == "council.stage":
+            stage_spans.append(span)
+        elif span.name in ("gateway.attempt", "gateway.stream"):
+            stage = attributes["stage"]
+            calls.append(
+                CallTiming(
+                    stage=stage,
+                    member=attributes["member"],
+                    attempt=attributes.get("attempt", 0),
+                    status=span.status,
+                    status_code=attributes.get("status_code"),
+                    duration_ms=span.duration_ms,
+                    response_bytes=attributes.get("response_bytes"),
+                )
+            )
+            ended_at = span.start_time + (span.duration or 0.0)
+            if stage not in last_call or ended_at > last_call[stage][0]:
+                last_call[stage] = (ended_at, attributes["member"])
+    stages: dict[str, StageTiming] = {}
+    for span in stage_spans:
+        stage = span.attributes["stage"]
+        critical = last_call.get(stage)
+        stages[stage] = StageTiming(
+            duration_ms=span.duration_ms,
+            critical_member=critical[1] if critical is not None else None,
+        )
+    return CouncilTimings(trace_id=root.trace_id, stages=stages, calls=calls)
+
+
+def _in_member_order(
+    members: Sequence[CouncilMember],
+    responses: List[LLMResponse],
+) -> List[LLMResponse]:
+    order = {member.name: idx for idx, member in enumerate(members)}
+    return sorted(responses, key=lambda response: order.get(response.model_name, len(order)))
+
+
+def _cut_off_members(
+    members: Sequence[CouncilMember],
+    responses: List[LLMResponse],
+) -> List[str]:
+    answered = {response.model_name for response in responses}
+    return [member.name for member in members if member.name not in answered]
+
+
+# Receives ``("stage1", opinion)`` and ``("stage2", critique)`` events, with
+# the same payloads stream_council yields, as run_council finishes each stage.
+ProgressCallback = Callable[[str, dict], Awaitable[None]]
+
+
+class _Flight:
+    """A deliberation shared by every request waiting on the same key."""
+
+    __slots__ = ("listeners", "task", "waiters")
+
+    def __init__(
+        self,
+        task: asyncio.Future[CouncilResponse],
+        listeners: List[ProgressCallback],
+    ) -> None:
+        self.task = task
+        self.listeners = listeners
+        self.waiters = 0
+
+
+_inflight: dict[tuple[str, str, str, str], _Flight] = {}
+
+
+def _forget_flight(key: tuple[str, str, str, str], flight: _Flight) -> None:
+    if _inflight.get(key) is flight:
+        del _inflight[key]
 
 
 class CouncilService:
     """Coordinates the three-stage council deliberation."""
 
-    def __init__(self, caller_wallet: str, client: Optional[X402Client] = None) -> None:
-        self.client = client or X402Client(caller_wallet)
+    def __init__(
+        self,
+        caller_wallet: str,
+        client: Optional[X402Client] = None,
+        opinion_cache: Optional[OpinionCache] = None,
+        limiter: Optional[PublisherLimiter] = None,
+    ) -> None:
+        self.caller_wallet = caller_wallet
+        self.limiter = limiter
+        self.client = client or get_shared_client()
         self.settings = settings
+        self.opinion_cache = opinion_cache or get_opinion_cache()
+        self.near_duplicate_index = get_near_duplicate_index()
+        self.tracer = get_tracer()
+
+    @contextmanager
+    def _council_span(self, chairman_model: str) -> Iterator[Span]:
+        with time_council(), self.tracer.span("council", chairman=chairman_model) as span:
+            yield span
+
+    @contextmanager
+    def _stage_span(self, stage: str) -> Iterator[None]:
+        with time_stage(stage), self.tracer.span("council.stage", stage=stage):
+            yield
+
+    def _call_options(self, deadline: Optional[Deadline], stage: str) -> dict[str, Any]:
+        """Per-call keyword arguments shared by every upstream request."""
+        return {
+            "caller_wallet": self.caller_wallet,
+            "deadline": deadline,
+            "limiter": self.limiter,
+            "stage": stage,
+        }
+
+    def _members(self, mode: str = "full") -> Sequence[CouncilMember]:
+        """Members for a council in ``mode``; fast mode ranks them by client health."""
+        if mode != "fast":
+            return self.settings.select_council_members(mode)
+        return self.settings.select_council_members(mode, self.client.stats, self.client.breakers)
+
+    def _quorum(self, already_succeeded: int = 0) -> Optional[int]:
+        if not self.settings.quorum_enabled:
+            return None
+        return self.settings.min_responses_required - already_succeeded
+
+    async def _collect(
+        self,
+        calls: List[Awaitable[LLMResponse]],
+        already_succeeded: int = 0,
+    ) -> List[LLMResponse]:
+        """Gather stage results in member order, honoring quorum mode."""
+        collected: List[tuple[int, LLMResponse]] = []
+        async for item in _iter_completed(
+            calls, self._quorum(already_succeeded), self.settings.quorum_grace_seconds
+        ):
+            collected.append(item)
+        collected.sort(key=lambda item: item[0])
+        return [response for _, response in collected]
+
+    def _budget(self, deadline_seconds: Optional[float] = None) -> Deadline:
+        return Deadline.after(deadline_seconds or self.settings.default_deadline_seconds)
+
+    def _stage_deadline(self, budget: Deadline, stage: int) -> Deadline:
+        """Deadline for ``stage`` (1-3) from the budget still remaining."""
+        weights = (
+            self.settings.deadline_stage1_weight,
+            self.settings.deadline_stage2_weight,
+            self.settings.deadline_stage3_weight,
+        )
+        later = sum(weights[stage - 1 :])
+        if later <= 0:
+            return budget
+        return budget.share(weights[stage - 1] / later)
+
+    async def stage1_opinions(
+        self,
+        query: str,
+        deadline: Optional[Deadline] = None,
+        members: Optional[Sequence[CouncilMember]] = None,
+    ) -> List[LLMResponse]:
+        members = members or self.settings.get_council_members()
+        cached = await self._cached_opinions(members, query)
+        pending = [member for member in members if member.name not in cached]
+        if not pending:
+            fresh: List[LLMResponse] = []
+        elif self.settings.quorum_enabled:
+            fresh = await self._collect(
+                [self._stage1_opinion(member, query, deadline, members) for member in pending],
+                already_succeeded=len(cached),
+            )
+        else:
+            fresh = await self.client.query_models_parallel(
+                pending,
+                prompt=query,
+                system_prompt=STAGE1_SYSTEM_PROMPT,
+                **self._call_options(deadline, "stage1"),
+            )
+        for response in fresh:
+            await self._cache_opinion(members, query, response)
+        return _in_member_order(members, [*cached.values(), *fresh])
+
+    async def _cached_opinions(
+        self,
+        members: Sequence[CouncilMember],
+        query: str,
+    ) -> dict[str, LLMResponse]:
+        """Stage 1 opinions served from the opinion cache, keyed by member name."""
+        if self.opinion_cache is None:
+            return {}
+        hits: dict[str, LLMResponse] = {}
+        for member in members:
+            key = OpinionCache.make_key(member.model, STAGE1_SYSTEM_PROMPT, query)
+            content = await self.opinion_cache.get(key)
+            if content is not None:
+                hits[member.name] = LLMResponse(
+                    model_name=member.name,
+                    content=content,
+                    success=True,
+                    cached=True,
+                )
+        return hits
+
+    async def _cache_opinion(
+        self,
+        members: Sequence[CouncilMember],
+        query: str,
+        response: LLMResponse,
+    ) -> None:
+        # Hedged answers may come from a backup model, so they are not cached
+        # under the original member's key.
+        if self.opinion_cache is None or not response.success or response.hedged:
+            return
+        for member in members:
+            if member.name == response.model_name:
+                key = OpinionCache.make_key(member.model, STAGE1_SYSTEM_PROMPT, query)
+                await self.opinion_cache.set(key, response.content)
+                return
+
+    async def _stage1_opinion(
+        self,
+        member: CouncilMember,
+        query: str,
+        deadline: Optional[Deadline] = None,
+        council: Sequence[CouncilMember] = (),
+    ) -> LLMResponse:
+        options = self._call_options(deadline, "stage1")
+        query_model = self.client.query_model
+        if self.settings.hedging_enabled:
+            query_model = self.client.query_model_hedged
+            # A backup already sitting on this council would answer twice.
+            options["hedge_exclude"] = {other.name for other in council}
+        try:
+            return await query_model(
+                member,
+                query,
+                system_prompt=STAGE1_SYSTEM_PROMPT,
+                **options,
+            )
+        except PaymentRequiredError:
+            raise
+        except Exception as exc:
+            return _failed_response(member, exc)
+
+    async def iter_stage1_opinions(
+        self,
+        query: str,
+        deadline: Optional[Deadline] = None,
+        members: Optional[Sequence[CouncilMember]] = None,
+    ) -> AsyncIterator[LLMResponse]:
+        """Yield stage 1 opinions as each council member answers.
+
+        Cached opinions are yielded first, before any upstream call returns.
+        """
+        members = members or self.settings.get_council_members()
+        cached = await self._cached_opinions(members, query)
+        for response in cached.values():
+            yield response
+
+        pending = [member for member in members if member.name not in cached]
+        calls = [self._stage1_opinion(member, query, deadline, members) for member in pending]
+        async for _, response in _iter_completed(
+            calls, self._quorum(len(cached)), self.settings.quorum_grace_seconds
+        ):
+            await self._cache_opinion(members, query, response)
+            yield response
+
+    async def _stage2_critique(
+        self,
+        member: CouncilMember,
+        prompt: str,
+        deadline: Optional[Deadline] = None,
+    ) -> LLMResponse:
+        options = self._call_options(deadline, "stage2")
+        if self.settings.stage2_structured_output:
+            options["response_schema"] = STAGE2_RESPONSE_SCHEMA
+        try:
+            result = await self.client.query_model(member, prompt, **options)
+        except PaymentRequiredError:
+            raise
+        except Exception as exc:
+            return _failed_response(member, exc)
+
+        if result.success and not result.content.strip():
+            # A budget spent entirely on reasoning comes back empty; treat it
+            # as a failed critique rather than an abstaining ballot.
+            result.success = False
+            result.error = "Empty critique"
+        if result.success:
+            analysis, rankings = _parse_stage2_output(result.content)
+            result.content = analysis
+            result.rankings = rankings
+        return result
+
+    def _stage2_calls(
+        self,
+        query: str,
+        stage1_responses: List[LLMResponse],
+        deadline: Optional[Deadline] = None,
+        members: Optional[Sequence[CouncilMember]] = None,
+        chairman: Optional[CouncilMember] = None,
+    ) -> List[Awaitable[LLMResponse]]:
+        members = members or self.settings.get_council_members()
+        if self.settings.critique_topology == "all":
+            context = _stage_context(query, stage1_responses)
+            shared = self._shared_prefix_models(members, chairman)
+            return [
+                self._stage2_critique(
+                    member,
+                    SplitPrompt(context, STAGE2_PROMPT_TEMPLATE, member.model in shared),
+                    deadline,
+                )
+                for member in members
+            ]
+        assignment = self._critique_assignment(stage1_responses, members)
+        calls = []
+        for member in members:
+            context = _stage_context(query, stage1_responses, assignment[member.name])
+            prompt = SplitPrompt(context, STAGE2_PROMPT_TEMPLATE)
+            calls.append(self._stage2_critique(member, prompt, deadline))
+        return calls
 
-    async def stage1_opinions(self, query: str) -> List[LLMResponse]:
-        members = self.settings.get_council_members()
-        return await self.client.query_models_parallel(
-            members,
-            prompt=query,
-            system_prompt=STAGE1_SYSTEM_PROMPT,
+    def _shared_prefix_models(
+        self,
+        critics: Sequence[CouncilMember],
+        chairman: Optional[CouncilMember],
+    ) -> set[str]:
+        """Models that read the all-to-all stage 2 prefix more than once per council.
+
+        Anthropic caches prompts per model, so a cache breakpoint only earns
+        back its write surcharge when the same model sends the same prefix
+        again: two critics on one model, or a chairman that also critiques
+        and whose opinions cannot be pruned by ``chairman_top_k``.
+        """
+        if self.settings.critique_topology != "all":
+            return set()
+        models = [critic.model for critic in critics]
+        top_k = self.settings.chairman_top_k
+        if chairman is not None and not 0 < top_k < len(critics):
+            models.append(chairman.model)
+        return {model for model in models if models.count(model) > 1}
+
+    def _critique_assignment(
+        self,
+        stage1_responses: List[LLMResponse],
+        members: Sequence[CouncilMember],
+    ) -> dict[str, List[int]]:
+        """Indexes into ``stage1_responses`` that each critic reviews, by critic name.
+
+        All-to-all shows every response, failed ones included. Sparse
+        topologies only hand out successful responses.
+        """
+        topology = self.settings.critique_topology
+        if topology == "all":
+            everything = list(range(len(stage1_responses)))
+            return {member.name: everything for member in members}
+        answered = [idx for idx, response in enumerate(stage1_responses) if response.success]
+        position = {stage1_responses[idx].model_name: pos for pos, idx in enumerate(answered)}
+        blocks = assign_critiques(
+            [position.get(member.name) for member in members],
+            len(answered),
+            topology,
+            self.settings.critique_peers,
+            self.settings.critique_min_reviews,
         )
+        return {
+            member.name: [answered[pos] for pos in block]
+            for member, block in zip(members, blocks)
+        }
+
+    def _critique_metadata(
+        self,
+        stage1_responses: List[LLMResponse],
+        members: Sequence[CouncilMember],
+    ) -> dict[str, Any]:
+        topology = self.settings.critique_topology
+        if topology == "all":
+            return {"critique_topology": topology}
+        assignment = self._critique_assignment(stage1_responses, members)
+        return {
+            "critique_topology": topology,
+            "critique_assignments": {
+                critic: [stage1_responses[idx].model_name for idx in reviewed]
+                for critic, reviewed in assignment.items()
+            },
+        }
 
     async def stage2_critiques(
         self,
         query: str,
         stage1_responses: List[LLMResponse],
+        deadline: Optional[Deadline] = None,
+        members: Optional[Sequence[CouncilMember]] = None,
+        chairman: Optional[CouncilMember] = None,
     ) -> List[LLMResponse]:
-        members = self.settings.get_council_members()
-        stage1_summary = _summarize_stage1_anonymized(stage1_responses)
+        calls = self._stage2_calls(query, stage1_responses, deadline, members, chairman)
+        if self.settings.quorum_enabled:
+            return await self._collect(calls)
+        results = await asyncio.gather(*calls, return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return list(results)
 
-        async def _critique(member: CouncilMember) -> LLMResponse:
-            prompt = STAGE2_PROMPT_TEMPLATE.format(query=query, responses=stage1_summary)
-            return await self.client.query_model(member, prompt)
+    async def iter_stage2_critiques(
+        self,
+        query: str,
+        stage1_responses: List[LLMResponse],
+        deadline: Optional[Deadline] = None,
+        members: Optional[Sequence[CouncilMember]] = None,
+        chairman: Optional[CouncilMember] = None,
+    ) -> AsyncIterator[LLMResponse]:
+        """Yield stage 2 critiques as each council member finishes."""
+        calls = self._stage2_calls(query, stage1_responses, deadline, members, chairman)
+        async for _, response in _iter_completed(
+            calls, self._quorum(), self.settings.quorum_grace_seconds
+        ):
+            yield response
 
-        tasks = [_critique(member) for member in members]
-        raw_results = await asyncio.gather(*tasks, return_exceptions=True)
+    def _rank_opinions(
+        self,
+        stage1_responses: List[LLMResponse],
+        stage2_responses: List[LLMResponse],
+        members: Sequence[CouncilMember],
+    ) -> Optional[RankingSummary]:
+        """Aggregate the critics' R1..Rn rankings over the successful opinions.
 
-        normalized: List[LLMResponse] = []
-        for member, result in zip(members, raw_results):
-            if isinstance(result, PaymentRequiredError):
-                raise result
-            if isinstance(result, Exception):
-                normalized.append(
-                    LLMResponse(
-                        model_name=member.name,
-                        content="",
-                        success=False,
-                        error=str(result),
-                    )
-                )
-            else:
-                if result.success:
-                    analysis, rankings = _parse_stage2_output(result.content)
-                    result.content = analysis
-                    result.rankings = rankings
-                normalized.append(result)
+        Each ballot only compares the responses its critic was shown, so
+        sparse critique topologies yield partial rankings.
+        """
+        candidates: dict[int, int] = {}
+        names: List[str] = []
+        # Labels follow the anonymized stage 2 prompt, which numbers every
+        # stage 1 response, failed ones included.
+        for idx, response in enumerate(stage1_responses):
+            if response.success:
+                candidates[idx] = len(names)
+                names.append(response.model_name)
+        assignment = self._critique_assignment(stage1_responses, members)
+        labels = {f"R{idx + 1}": candidate for idx, candidate in candidates.items()}
+        ballots: List[List[int]] = []
+        shown: List[set[int]] = []
+        for critique in stage2_responses:
+            if not critique.success:
+                continue
+            visible = {
+                candidates[idx]
+                for idx in assignment.get(critique.model_name, ())
+                if idx in candidates
+            }
+            ballot = [
+                candidate
+                for candidate in ballot_from_labels(critique.rankings or [], labels)
+                if candidate in visible
+            ]
+            if ballot:
+                ballots.append(ballot)
+                shown.append(visible)
+        if not ballots:
+            return None
+        result = aggregate(ballots, len(names), shown)
+        method = self.settings.ranking_method
+        order = [names[index] for index in result.order(method)]
+        top_k = self.settings.chairman_top_k
+        return RankingSummary(
+            method=method,
+            ballots=result.ballots,
+            order=order,
+            borda=dict(zip(names, result.borda)),
+            copeland=dict(zip(names, result.copeland)),
+            kemeny=[names[index] for index in result.kemeny] if result.kemeny else None,
+            chairman_opinions=order[:top_k] if 0 < top_k < len(order) else [],
+        )
 
-        return normalized
+    @staticmethod
+    def _chairman_inputs(
+        stage1_responses: List[LLMResponse],
+        stage2_responses: List[LLMResponse],
+        ranking: Optional[RankingSummary],
+    ) -> tuple[Optional[List[int]], List[LLMResponse]]:
+        """Stage-1 indexes and critiques for stage 3, pruned to the ranking's top-k.
+
+        The indexes are in ranked order; ``None`` keeps every opinion.
+        """
+        if ranking is None or not ranking.chairman_opinions:
+            return None, stage2_responses
+        position = {
+            response.model_name: idx for idx, response in enumerate(stage1_responses)
+        }
+        keep = set(ranking.chairman_opinions)
+        return (
+            [position[name] for name in ranking.chairman_opinions],
+            [critique for critique in stage2_responses if critique.model_name in keep],
+        )
+
+    def _stage3_prompt(
+        self,
+        query: str,
+        stage1_responses: List[LLMResponse],
+        stage2_responses: List[LLMResponse],
+        chairman: CouncilMember,
+        opinions: Optional[Sequence[int]] = None,
+    ) -> SplitPrompt:
+        """Chairman prompt over the same R labels the critics ranked.
+
+        Without ``opinions`` the prefix is byte-identical to the all-to-all
+        stage 2 prefix, and is marked cacheable if a critic on the
+        chairman's model already sent it.
+        """
+        indexes = opinions if opinions is not None else range(len(stage1_responses))
+        authors = ", ".join(
+            f"R{idx + 1} = {stage1_responses[idx].model_name}" for idx in indexes
+        )
+        critiqued = {critique.model_name for critique in stage2_responses}
+        critics = [
+            member for member in self.settings.get_council_members() if member.name in critiqued
+        ]
+        return SplitPrompt(
+            _stage_context(query, stage1_responses, opinions),
+            STAGE3_PROMPT_TEMPLATE.format(
+                authors=authors, critiques=_summarize_stage2(stage2_responses)
+            ),
+            opinions is None and chairman.model in self._shared_prefix_models(critics, chairman),
+        )
 
     async def stage3_synthesis(
         self,
@@ -132,48 +817,97 @@ class CouncilService:
         stage1_responses: List[LLMResponse],
         stage2_responses: List[LLMResponse],
         chairman: Optional[CouncilMember] = None,
+        deadline: Optional[Deadline] = None,
+        opinions: Optional[Sequence[int]] = None,
     ) -> LLMResponse:
         chair = chairman or self.settings.get_chairman_config()
-        prompt = STAGE3_PROMPT_TEMPLATE.format(
-            query=query,
-            responses=_summarize_stage1(stage1_responses),
-            critiques=_summarize_stage2(stage2_responses),
+        prompt = self._stage3_prompt(query, stage1_responses, stage2_responses, chair, opinions)
+        result = await self.client.query_model(
+            chair, prompt, **self._call_options(deadline, "stage3")
         )
-        result = await self.client.query_model(chair, prompt)
         if not result.success:
             raise RuntimeError("Chairman failed to synthesize response")
         return result
 
-    async def run_council(self, query: str, chairman: Optional[str] = None) -> CouncilResponse:
-        start = perf_counter()
-        stage1 = await self.stage1_opinions(query)
+    async def stream_stage3_synthesis(
+        self,
+        query: str,
+        stage1_responses: List[LLMResponse],
+        stage2_responses: List[LLMResponse],
+        chairman: Optional[CouncilMember] = None,
+        deadline: Optional[Deadline] = None,
+        opinions: Optional[Sequence[int]] = None,
+        on_usage: Optional[Callable[[Usage], None]] = None,
+    ) -> AsyncIterator[str]:
+        """Yield chairman answer chunks as they stream from upstream."""
+        chair = chairman or self.settings.get_chairman_config()
+        prompt = self._stage3_prompt(query, stage1_responses, stage2_responses, chair, opinions)
+        options = self._call_options(deadline, "stage3")
+        if on_usage is not None:
+            options["on_usage"] = on_usage
+        produced = False
+        try:
+            async for chunk in self.client.stream_model(chair, prompt, **options):
+                produced = True
+                yield chunk
+        except PaymentRequiredError:
+            raise
+        except Exception as exc:
+            raise RuntimeError("Chairman failed to synthesize response") from exc
+        if not produced:
+            raise RuntimeError("Chairman failed to synthesize response")
+
+    def _check_stage1_quorum(
+        self,
+        stage1: List[LLMResponse],
+        members: Sequence[CouncilMember],
+    ) -> None:
+        # A fast council smaller than min_responses_required needs every member.
+        required = min(self.settings.min_responses_required, len(members))
         success_count = sum(1 for response in stage1 if response.success)
-        if success_count < self.settings.min_responses_required:
+        if success_count < required:
             raise RuntimeError("Insufficient successful council responses")
 
-        stage2 = await self.stage2_critiques(query, stage1)
-        chairman_member = self.settings.get_chairman_config(chairman)
-        final = await self.stage3_synthesis(query, stage1, stage2, chairman_member)
-        duration_ms = int((perf_counter() - start) * 1000)
+    def _consensus(
+        self,
+        stage1: List[LLMResponse],
+    ) -> tuple[dict[str, Any], Optional[LLMResponse]]:
+        """Consensus metadata and, when the opinions agree, the medoid opinion."""
+        answered = [response for response in stage1 if response.success]
+        if not self.settings.consensus_enabled or len(answered) < 2:
+            return {}, None
+        result = agreement(
+            [response.content for response in answered],
+            self.settings.consensus_short_answer_words,
+        )
+        score = round(result.score, 4)
+        if result.score < self.settings.consensus_threshold:
+            return {"consensus_score": score, "consensus_decision": "deliberate"}, None
+        medoid = answered[result.medoid]
+        metadata = {
+            "consensus_score": score,
+            "consensus_decision": self.settings.consensus_synthesis,
+            "consensus_medoid": medoid.model_name,
+        }
+        return metadata, medoid
 
+    def _build_response(
+        self,
+        final_answer: str,
+        stage1: List[LLMResponse],
+        stage2: List[LLMResponse],
+        chairman_member: CouncilMember,
+        duration_ms: int,
+        members: Sequence[CouncilMember],
+        mode: str = "full",
+        stage2_skipped: bool = False,
+        **extra_metadata: Any,
+    ) -> CouncilResponse:
         stage1_payload = {
-            response.model_name: Stage1ResponseModel(
-                model=response.model_name,
-                content=response.content,
-                success=response.success,
-                error=response.error,
-            )
-            for response in stage1
+            response.model_name: _stage1_model(response) for response in stage1
         }
         stage2_payload = {
-            response.model_name: Stage2CritiqueModel(
-                model=response.model_name,
-                analysis=response.content,
-                rankings=response.rankings or [],
-                success=response.success,
-                error=response.error,
-            )
-            for response in stage2
+            response.model_name: _stage2_model(response) for response in stage2
         }
         metadata = CouncilMetadata(
             models_succeeded=[response.model_name for response in stage1 if response.success],
@@ -181,16 +915,345 @@ class CouncilService:
             chairman=chairman_member.model,
             cost_usd=self.settings.flat_fee_usd,
             duration_ms=duration_ms,
+            mode=mode,
+            council_members=[member.name for member in members],
+            stage1_cut_off=_cut_off_members(members, stage1),
+            stage2_cut_off=[] if stage2_skipped else _cut_off_members(members, stage2),
+            hedged_members=[response.model_name for response in stage1 if response.hedged],
+            hedge_answered_by={
+                response.model_name: response.answered_by
+                for response in stage1
+                if response.answered_by
+            },
+            stage1_cache_hits=[response.model_name for response in stage1 if response.cached],
+            **extra_metadata,
         )
 
         return CouncilResponse(
-            final_answer=final.content,
+            final_answer=final_answer,
             stage1_responses=stage1_payload,
             stage2_critiques=stage2_payload,
             metadata=metadata,
         )
 
+    def _flight_key(
+        self,
+        query: str,
+        chairman: Optional[str],
+        mode: str,
+    ) -> tuple[str, str, str, str]:
+        wallet = "" if self.settings.coalesce_across_wallets else self.caller_wallet
+        chairman_model = self.settings.get_chairman_config(chairman).model
+        return wallet, normalize_query(query), chairman_model, mode
+
+    async def run_council(
+        self,
+        query: str,
+        chairman: Optional[str] = None,
+        deadline_seconds: Optional[float] = None,
+        include_timings: bool = False,
+        mode: str = "full",
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> CouncilResponse:
+        """Run a council, sharing one in-flight deliberation among identical requests.
+
+        Concurrent requests with the same normalized query, chairman and mode (and,
+        unless ``coalesce_across_wallets`` is set, the same wallet) await a
+        single deliberation. It keeps running while any waiter remains and is
+        cancelled when the last one disconnects. ``on_progress`` hears about
+        each opinion and critique once its stage finishes; a request that joins
+        a deliberation late only hears about the stages still to come.
+        """
+        response = await self._run_coalesced(
+            query, chairman, deadline_seconds, mode, on_progress
+        )
+        if include_timings:
+            return response
+        metadata = response.metadata.model_copy(update={"timings": None})
+        return response.model_copy(update={"metadata": metadata})
+
+    async def _run_coalesced(
+        self,
+        query: str,
+        chairman: Optional[str] = None,
+        deadline_seconds: Optional[float] = None,
+        mode: str = "full",
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> CouncilResponse:
+        if not self.settings.coalesce_enabled:
+            listeners = [on_progress] if on_progress is not None else []
+            return await self._deliberate(query, chairman, deadline_seconds, mode, listeners)
+
+        key = self._flight_key(query, chairman, mode)
+        flight = _inflight.get(key)
+        leader = flight is None
+        if flight is None:
+            listeners = []
+            flight = _Flight(
+                asyncio.ensure_future(
+                    self._deliberate(query, chairman, deadline_seconds, mode, listeners)
+                ),
+                listeners,
+            )
+            _inflight[key] = flight
+            flight.task.add_done_callback(lambda _: _forget_flight(key, flight))
+
+        flight.waiters += 1
+        if on_progress is not None:
+            flight.listeners.append(on_progress)
+        try:
+            response = await asyncio.shield(flight.task)
+        finally:
+            if on_progress is not None:
+                flight.listeners.remove(on_progress)
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+                _forget_flight(key, flight)
+
+        if leader:
+            return response
+        metadata = response.metadata.model_copy(update={"coalesced": True})
+        return response.model_copy(deep=True, update={"metadata": metadata})
+
+    async def _deliberate(
+        self,
+        query: str,
+        chairman: Optional[str] = None,
+        deadline_seconds: Optional[float] = None,
+        mode: str = "full",
+        listeners: Sequence[ProgressCallback] = (),
+    ) -> CouncilResponse:
+        start = perf_counter()
+        budget = self._budget(deadline_seconds)
+        chairman_member = self.settings.get_chairman_config(chairman)
+        with self._council_span(chairman_member.model) as root:
+            match = self._find_near_duplicate(query, chairman_member.model, mode)
+            if match is not None and self.settings.near_duplicate_reuse == "response":
+                similarity, previous = match
+                duration_ms = int((perf_counter() - start) * 1000)
+                metadata = previous.metadata.model_copy(
+                    update={
+                        "duration_ms": duration_ms,
+                        "cost_usd": self.settings.flat_fee_usd,
+                        "coalesced": False,
+                        "cache_reuse": "near_duplicate_response",
+                        "reuse_similarity": similarity,
+                        "timings": _timings(root),
+                        "usage": None,
+                        "cached_input_tokens": {},
+                    }
+                )
+                return previous.model_copy(deep=True, update={"metadata": metadata})
+
+            members = self._members(mode)
+            if match is not None:
+                similarity, previous = match
+                stage1 = _opinions_from_response(previous)
+                reuse: dict[str, Any] = {
+                    "cache_reuse": "near_duplicate_opinions",
+                    "reuse_similarity": similarity,
+                }
+            else:
+                with self._stage_span("stage1"):
+                    stage1 = await self.stage1_opinions(
+                        query, self._stage_deadline(budget, 1), members
+                    )
+                reuse = {}
+            await _report(
+                listeners, "stage1", [_stage1_model(response).model_dump() for response in stage1]
+            )
+            self._check_stage1_quorum(stage1, members)
+            consensus, medoid = self._consensus(stage1)
+
+            stage2: List[LLMResponse] = []
+            stage2_skipped = mode == "lite" or medoid is not None
+            if not stage2_skipped:
+                with self._stage_span("stage2"):
+                    stage2 = await self.stage2_critiques(
+                        query, stage1, self._stage_deadline(budget, 2), members, chairman_member
+                    )
+                await _report(
+                    listeners,
+                    "stage2",
+                    [_stage2_model(response).model_dump() for response in stage2],
+                )
+            ranking = self._rank_opinions(stage1, stage2, members)
+            stage3: List[LLMResponse] = []
+            if medoid is not None and self.settings.consensus_synthesis == "medoid":
+                final_answer = medoid.content
+            else:
+                opinions, critiques = self._chairman_inputs(stage1, stage2, ranking)
+                with self._stage_span("stage3"):
+                    final = await self.stage3_synthesis(
+                        query,
+                        stage1,
+                        critiques,
+                        chairman_member,
+                        self._stage_deadline(budget, 3),
+                        opinions,
+                    )
+                final_answer = final.content
+                stage3.append(final)
+            duration_ms = int((perf_counter() - start) * 1000)
+
+            response = self._build_response(
+                final_answer,
+                stage1,
+                stage2,
+                chairman_member,
+                duration_ms,
+                members,
+                mode,
+                stage2_skipped,
+                ranking=ranking,
+                timings=_timings(root),
+                **_usage_metadata(
+                    _usage_records("stage1", stage1)
+                    + _usage_records("stage2", stage2)
+                    + _usage_records("stage3", stage3)
+                ),
+                **({} if stage2_skipped else self._critique_metadata(stage1, members)),
+                **consensus,
+                **reuse,
+            )
+            if match is None:
+                self._index_council(query, chairman_member.model, mode, response)
+            return response
+
+    def _find_near_duplicate(
+        self,
+        query: str,
+        chairman_model: str,
+        mode: str = "full",
+    ) -> Optional[tuple[float, CouncilResponse]]:
+        if self.near_duplicate_index is None:
+            return None
+        match = self.near_duplicate_index.query(
+            query,
+            self.settings.near_duplicate_threshold,
+            accept=lambda entry: entry[0] == chairman_model and entry[1].metadata.mode == mode,
+        )
+        if match is None:
+            return None
+        similarity, (_, response) = match
+        return similarity, response
+
+    def _index_council(
+        self,
+        query: str,
+        chairman_model: str,
+        mode: str,
+        response: CouncilResponse,
+    ) -> None:
+        if self.near_duplicate_index is None:
+            return
+        # Keyed like in-flight councils, so councils in different modes for the
+        # same query keep separate entries.
+        key = (normalize_query(query), chairman_model, mode)
+        self.near_duplicate_index.insert(key, query, (chairman_model, response))
+
+    async def stream_council(
+        self,
+        query: str,
+        chairman: Optional[str] = None,
+        deadline_seconds: Optional[float] = None,
+        include_timings: bool = False,
+        mode: str = "full",
+    ) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+        """Run the council, yielding ``(event, data)`` pairs as results arrive.
+
+        Emits one ``stage1`` event per opinion, one ``stage2`` event per
+        critique, ``stage3`` events carrying chairman text deltas, and a final
+        ``complete`` event with the full :class:`CouncilResponse`. Lite mode
+        and a consensus short-circuit emit no ``stage2`` events; a medoid
+        answer arrives as a single ``stage3`` delta.
+        """
+        start = perf_counter()
+        budget = self._budget(deadline_seconds)
+        members = self._members(mode)
+        chairman_member = self.settings.get_chairman_config(chairman)
+        with self._council_span(chairman_member.model) as root:
+
+            stage1: List[LLMResponse] = []
+            with self._stage_span("stage1"):
+                async for response in self.iter_stage1_opinions(
+                    query, self._stage_deadline(budget, 1), members
+                ):
+                    stage1.append(response)
+                    yield "stage1", _stage1_model(response).model_dump()
+            stage1 = _in_member_order(members, stage1)
+            self._check_stage1_quorum(stage1, members)
+            consensus, medoid = self._consensus(stage1)
+
+            stage2: List[LLMResponse] = []
+            stage2_skipped = mode == "lite" or medoid is not None
+            if not stage2_skipped:
+                with self._stage_span("stage2"):
+                    async for response in self.iter_stage2_critiques(
+                        query, stage1, self._stage_deadline(budget, 2), members, chairman_member
+                    ):
+                        stage2.append(response)
+                        yield "stage2", _stage2_model(response).model_dump()
+                stage2 = _in_member_order(members, stage2)
+
+            ranking = self._rank_opinions(stage1, stage2, members)
+            chunks: List[str] = []
+            stage3_usage: List[Usage] = []
+            if medoid is not None and self.settings.consensus_synthesis == "medoid":
+                chunks.append(medoid.content)
+                yield "stage3", {"delta": medoid.content}
+            else:
+                opinions, critiques = self._chairman_inputs(stage1, stage2, ranking)
+                with self._stage_span("stage3"):
+                    async for chunk in self.stream_stage3_synthesis(
+                        query,
+                        stage1,
+                        critiques,
+                        chairman_member,
+                        self._stage_deadline(budget, 3),
+                        opinions,
+                        stage3_usage.append,
+                    ):
+                        chunks.append(chunk)
+                        yield "stage3", {"delta": chunk}
+            duration_ms = int((perf_counter() - start) * 1000)
+
+            response = self._build_response(
+                "".join(chunks),
+                stage1,
+                stage2,
+                chairman_member,
+                duration_ms,
+                members,
+                mode,
+                stage2_skipped,
+                ranking=ranking,
+                timings=_timings(root) if include_timings else None,
+                **_usage_metadata(
+                    _usage_records("stage1", stage1)
+                    + _usage_records("stage2", stage2)
+                    + [("stage3", chairman_member.name, usage) for usage in stage3_usage]
+                ),
+                **({} if stage2_skipped else self._critique_metadata(stage1, members)),
+                **consensus,
+            )
+            yield "complete", response.model_dump()
+
 
-async def run_council(query: str, chairman: Optional[str] = None) -> CouncilResponse:
-    service = CouncilService()
-    return await service.run_council(query, chairman=chairman)
+async def run_council(
+    query: str,
+    caller_wallet: str,
+    chairman: Optional[str] = None,
+    deadline_seconds: Optional[float] = None,
+    include_timings: bool = False,
+    mode: str = "full",
+) -> CouncilResponse:
+    service = CouncilService(caller_wallet=caller_wallet)
+    return await service.run_council(
+        query,
+        chairman=chairman,
+        deadline_seconds=deadline_seconds,
+        include_timings=include_timings,
+        mode=mode,
+    )
@@ -0,0 +1,38 @@
+"""ABOUTME: Deadline budget helpers for bounding council latency.
+ABOUTME: Tracks remaining time and splits it across council stages."""
+
+from __future__ import annotations
+
+from time import monotonic
+
+
+class Deadline:
+    """An absolute point on the monotonic clock by which work must finish."""
+
+    __slots__ = ("expires_at",)
+
+    def __init__(self, expires_at: float) -> None:
+        self.expires_at = expires_at
+
+    @classmethod
+    def after(cls, seconds: float) -> "Deadline":
+        return cls(monotonic() + seconds)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def share(self, fraction: float) -> "Deadline":
+        """Return a nearer deadline covering ``fraction`` of the remaining budget.
+
+        Because the share is taken from what is left at call time, time saved
+        by a fast stage rolls over to the stages after it.
+        """
+        fraction = min(max(fraction, 0.0), 1.0)
+        return Deadline(monotonic() + self.remaining() * fraction)
+
+    def __repr__(self) -> str:
+        return f"Deadline(remaining={self.remaining():.3f}s)"
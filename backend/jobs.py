@@ -0,0 +1,332 @@
+"""ABOUTME: Asynchronous council jobs with pluggable storage.
+ABOUTME: Runs councils in a bounded in-process worker pool and delivers webhooks."""
+
+from __future__ import annotations
+
+import asyncio
+import socket
+import sqlite3
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from time import time
+from typing import Callable, Dict, Iterator, Optional, Set
+from uuid import uuid4
+
+import httpx
+
+from backend.config import settings
+from backend.council import CouncilService
+from backend.models import (
+    CouncilJob,
+    CouncilJobRequest,
+    Stage1ResponseModel,
+    Stage2CritiqueModel,
+    is_internal_host,
+)
+from backend.x402_client import PaymentRequiredError
+
+
+# Jobs in these states never change again and are eligible for eviction.
+FINISHED_STATUSES = ("succeeded", "failed")
+
+
+class JobStore(ABC):
+    """Persists council jobs together with the wallet that owns them.
+
+    Finished jobs are kept for ``retention_seconds`` after they finish, and at
+    most ``max_finished`` of them are kept, oldest evicted first. Queued and
+    running jobs are never evicted.
+    """
+
+    def __init__(
+        self,
+        retention_seconds: float = 86_400.0,
+        max_finished: int = 10_000,
+        clock: Callable[[], float] = time,
+    ) -> None:
+        self.retention_seconds = retention_seconds
+        self.max_finished = max(1, max_finished)
+        self._clock = clock
+
+    def _horizon(self) -> float:
+        """Finished jobs last updated at or before this time have expired."""
+        return self._clock() - self.retention_seconds
+
+    def _expired(self, job: CouncilJob) -> bool:
+        return job.status in FINISHED_STATUSES and job.updated_at <= self._horizon()
+
+    @abstractmethod
+    async def save(self, job: CouncilJob, owner_wallet: str) -> None:
+        """Insert or replace ``job``."""
+
+    @abstractmethod
+    async def get(self, job_id: str, owner_wallet: str) -> Optional[CouncilJob]:
+        """Return the job if it exists and belongs to ``owner_wallet``."""
+
+
+class InMemoryJobStore(JobStore):
+    """Process-local job store; jobs are lost on restart."""
+
+    def __init__(
+        self,
+        retention_seconds: float = 86_400.0,
+        max_finished: int = 10_000,
+        clock: Callable[[], float] = time,
+    ) -> None:
+        super().__init__(retention_seconds, max_finished, clock)
+        self._jobs: Dict[str, tuple[str, CouncilJob]] = {}
+        # Finished job ids, oldest first, with the time each finished.
+        self._finished: OrderedDict[str, float] = OrderedDict()
+
+    async def save(self, job: CouncilJob, owner_wallet: str) -> None:
+        self._jobs[job.id] = (owner_wallet, job.model_copy(deep=True))
+        if job.status in FINISHED_STATUSES:
+            self._finished[job.id] = job.updated_at
+            self._finished.move_to_end(job.id)
+        self._evict()
+
+    async def get(self, job_id: str, owner_wallet: str) -> Optional[CouncilJob]:
+        entry = self._jobs.get(job_id)
+        if entry is None or entry[0] != owner_wallet or self._expired(entry[1]):
+            return None
+        return entry[1].model_copy(deep=True)
+
+    def _evict(self) -> None:
+        horizon = self._horizon()
+        while self._finished:
+            job_id, finished_at = next(iter(self._finished.items()))
+            if finished_at > horizon and len(self._finished) <= self.max_finished:
+                break
+            del self._finished[job_id]
+            self._jobs.pop(job_id, None)
+
+
+class SQLiteJobStore(JobStore):
+    """Job store backed by a SQLite file, shared by all local workers."""
+
+    def __init__(
+        self,
+        path: str,
+        retention_seconds: float = 86_400.0,
+        max_finished: int = 10_000,
+        clock: Callable[[], float] = time,
+    ) -> None:
+        super().__init__(retention_seconds, max_finished, clock)
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS council_jobs ("
+                " id TEXT PRIMARY KEY,"
+                " owner_wallet TEXT NOT NULL,"
+                " data TEXT NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS council_jobs_updated ON council_jobs (updated_at)"
+            )
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _save(self, job: CouncilJob, owner_wallet: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO council_jobs (id, owner_wallet, data, updated_at)"
+                " VALUES (?, ?, ?, ?)",
+                (job.id, owner_wallet, job.model_dump_json(), job.updated_at),
+            )
+            finished = "json_extract(data, '$.status') IN ('succeeded', 'failed')"
+            conn.execute(
+                f"DELETE FROM council_jobs WHERE {finished} AND updated_at <= ?",
+                (self._horizon(),),
+            )
+            conn.execute(
+                "DELETE FROM council_jobs WHERE id IN ("
+                f" SELECT id FROM council_jobs WHERE {finished}"
+                " ORDER BY updated_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_finished,),
+            )
+
+    def _get(self, job_id: str, owner_wallet: str) -> Optional[CouncilJob]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT data FROM council_jobs WHERE id = ? AND owner_wallet = ?",
+                (job_id, owner_wallet),
+            ).fetchone()
+        if row is None:
+            return None
+        job = CouncilJob.model_validate_json(row[0])
+        return None if self._expired(job) else job
+
+    async def save(self, job: CouncilJob, owner_wallet: str) -> None:
+        await asyncio.to_thread(self._save, job, owner_wallet)
+
+    async def get(self, job_id: str, owner_wallet: str) -> Optional[CouncilJob]:
+        return await asyncio.to_thread(self._get, job_id, owner_wallet)
+
+
+class JobRunner:
+    """Runs submitted council jobs in the background under a concurrency cap.
+
+    Partial stage results are saved as each opinion and critique arrives, so
+    pollers can watch progress before the chairman finishes.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        max_concurrency: int,
+        service_factory: Callable[..., CouncilService] = CouncilService,
+    ) -> None:
+        self.store = store
+        self.max_concurrency = max(1, max_concurrency)
+        self._service_factory = service_factory
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: Set[asyncio.Task[None]] = set()
+
+    async def submit(self, request: CouncilJobRequest, caller_wallet: str) -> CouncilJob:
+        now = time()
+        job = CouncilJob(id=uuid4().hex, status="queued", created_at=now, updated_at=now)
+        await self.store.save(job, caller_wallet)
+        task = asyncio.create_task(self._run(job, request, caller_wallet))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job.model_copy(deep=True)
+
+    async def get(self, job_id: str, caller_wallet: str) -> Optional[CouncilJob]:
+        return await self.store.get(job_id, caller_wallet)
+
+    async def aclose(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _save(self, job: CouncilJob, caller_wallet: str, **changes: object) -> None:
+        for field, value in changes.items():
+            setattr(job, field, value)
+        job.updated_at = time()
+        await self.store.save(job, caller_wallet)
+
+    async def _run(self, job: CouncilJob, request: CouncilJobRequest, caller_wallet: str) -> None:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        try:
+            async with self._semaphore:
+                await self._execute(job, request, caller_wallet)
+        except asyncio.CancelledError:
+            # Shutdown cancels queued and running jobs alike; record that rather
+            # than leaving pollers watching a job that will never finish.
+            await self._save(
+                job, caller_wallet, status="failed", error="Job worker shut down", error_status=503
+            )
+            raise
+
+        if request.webhook_url:
+            await self._deliver_webhook(str(request.webhook_url), job)
+
+    async def _execute(
+        self, job: CouncilJob, request: CouncilJobRequest, caller_wallet: str
+    ) -> None:
+        await self._save(job, caller_wallet, status="running")
+        service = self._service_factory(caller_wallet=caller_wallet)
+
+        async def record(event: str, data: dict) -> None:
+            if event == "stage1":
+                job.stage1_responses[data["model"]] = Stage1ResponseModel(**data)
+            elif event == "stage2":
+                job.stage2_critiques[data["model"]] = Stage2CritiqueModel(**data)
+            else:
+                return
+            await self._save(job, caller_wallet)
+
+        try:
+            # run_council, not stream_council: jobs get the same chairman retries,
+            # coalescing and opinion reuse as the synchronous endpoint.
+            job.result = await service.run_council(
+                request.query,
+                chairman=request.chairman,
+                deadline_seconds=request.deadline_seconds,
+                include_timings=request.include_timings,
+                mode=request.mode,
+                on_progress=record,
+            )
+            await self._save(job, caller_wallet, status="succeeded")
+        except PaymentRequiredError as exc:
+            await self._save(job, caller_wallet, status="failed", error=str(exc), error_status=402)
+        except RuntimeError as exc:
+            await self._save(job, caller_wallet, status="failed", error=str(exc), error_status=400)
+        except Exception as exc:
+            await self._save(job, caller_wallet, status="failed", error=str(exc), error_status=500)
+
+    async def _deliver_webhook(self, url: str, job: CouncilJob) -> None:
+        # Best effort: the job result stays available for polling either way.
+        try:
+            target = httpx.URL(url)
+            port = target.port or (443 if target.scheme == "https" else 80)
+            address = await _public_address(target.host, port)
+            if address is None:
+                return
+            # Connect to the address that was checked, so a second lookup cannot
+            # be steered at an internal host; Host and SNI keep the original name.
+            async with httpx.AsyncClient(timeout=settings.webhook_timeout_seconds) as client:
+                await client.post(
+                    target.copy_with(host=address),
+                    headers={"Host": target.netloc.decode("ascii")},
+                    extensions={"sni_hostname": target.host},
+                    json=job.model_dump(mode="json"),
+                )
+        except Exception:
+            pass
+
+
+async def _public_address(host: str, port: int) -> Optional[str]:
+    """An address ``host`` resolves to, or ``None`` if any of them is internal.
+
+    Validation only sees the name; this catches names such as
+    ``metadata.google.internal`` that resolve to private or link-local hosts.
+    """
+    if is_internal_host(host):
+        return None
+    try:
+        found = await asyncio.get_running_loop().getaddrinfo(
+            host, port, type=socket.SOCK_STREAM
+        )
+    except OSError:
+        return None
+    addresses = [str(info[4][0]) for info in found]
+    if not addresses or any(is_internal_host(address) for address in addresses):
+        return None
+    return addresses[0]
+
+
+_job_runner: Optional[JobRunner] = None
+
+
+def get_job_runner() -> JobRunner:
+    """Return the process-wide job runner, creating it on first use."""
+    global _job_runner
+    if _job_runner is None:
+        store: JobStore
+        retention = settings.job_retention_seconds, settings.job_max_finished
+        if settings.job_store_path:
+            store = SQLiteJobStore(settings.job_store_path, *retention)
+        else:
+            store = InMemoryJobStore(*retention)
+        _job_runner = JobRunner(store, settings.job_max_concurrency)
+    return _job_runner
+
+
+async def close_job_runner() -> None:
+    """Cancel running jobs and drop the process-wide runner."""
+    global _job_runner
+    if _job_runner is not None:
+        await _job_runner.aclose()
+        _job_runner = None
@@ -1,13 +1,43 @@
 """ABOUTME: FastAPI entrypoint for Seren LLM Council service.
-ABOUTME: Exposes health and council query endpoints."""
+ABOUTME: Exposes health, metrics, usage, council query, streaming, job, and batch endpoints."""
+
+import json
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
 
 from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import PlainTextResponse, StreamingResponse
+
+from backend.config import get_settings
+from backend.metrics import REGISTRY
+from backend.models import (
+    CouncilBatchRequest,
+    CouncilJob,
+    CouncilJobRequest,
+    CouncilQuery,
+    CouncilResponse,
+    PublisherUsage,
+)
+
+# The council, gateway client, job, and tracing modules (and httpx with
+# them) are imported by the handlers that use them, so a serverless cold
+# start only pays for FastAPI and the request models.
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    from backend.jobs import close_job_runner
+    from backend.tracing import close_tracer
+    from backend.x402_client import close_shared_client, get_shared_client
 
-from backend.council import CouncilService
-from backend.models import CouncilQuery, CouncilResponse
-from backend.x402_client import PaymentRequiredError
+    get_shared_client()
+    yield
+    await close_job_runner()
+    await close_shared_client()
+    await close_tracer()
 
-app = FastAPI(title="Seren LLM Council", version="0.1.0")
+
+app = FastAPI(title="Seren LLM Council", version="0.1.0", lifespan=lifespan)
 
 
 @app.get("/health")
@@ -15,15 +45,131 @@ async def health() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(
+        REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@app.get("/v1/usage", response_model=dict[str, PublisherUsage])
+async def publisher_usage() -> dict[str, PublisherUsage]:
+    """Tokens, spend and throughput per publisher over the rolling ledger window."""
+    from backend.x402_client import get_shared_client
+
+    usage = {}
+    for publisher_id, window in get_shared_client().ledger.snapshot().items():
+        total = window.total.usage
+        usage[publisher_id] = PublisherUsage(
+            calls=window.total.calls,
+            input_tokens=total.input_tokens,
+            output_tokens=total.output_tokens,
+            cached_input_tokens=total.cached_input_tokens,
+            cost_usd=total.cost_usd,
+            window_seconds=window.window_seconds,
+            tokens_per_second=window.tokens_per_second,
+            output_tokens_per_second=window.output_tokens_per_second,
+        )
+    return usage
+
+
 @app.post("/v1/council/query", response_model=CouncilResponse)
 async def query_council(
     payload: CouncilQuery,
     x_agent_wallet: str = Header(..., alias="X-AGENT-WALLET"),
 ) -> CouncilResponse:
+    from backend.council import CouncilService
+    from backend.x402_client import PaymentRequiredError
+
     service = CouncilService(caller_wallet=x_agent_wallet)
     try:
-        return await service.run_council(payload.query, chairman=payload.chairman)
+        return await service.run_council(
+            payload.query,
+            chairman=payload.chairman,
+            deadline_seconds=payload.deadline_seconds,
+            include_timings=payload.include_timings,
+            mode=payload.mode,
+        )
     except PaymentRequiredError as exc:
         raise HTTPException(status_code=402, detail=str(exc)) from exc
     except RuntimeError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
+
+
+def _format_sse(event: str, data: dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/v1/council/stream")
+async def stream_council(
+    payload: CouncilQuery,
+    x_agent_wallet: str = Header(..., alias="X-AGENT-WALLET"),
+) -> StreamingResponse:
+    from backend.council import CouncilService
+    from backend.x402_client import PaymentRequiredError
+
+    service = CouncilService(caller_wallet=x_agent_wallet)
+
+    async def _events() -> AsyncIterator[str]:
+        # Headers are already sent once streaming starts, so failures are
+        # reported as a terminal ``error`` event carrying the HTTP status.
+        try:
+            async for event, data in service.stream_council(
+                payload.query,
+                chairman=payload.chairman,
+                deadline_seconds=payload.deadline_seconds,
+                include_timings=payload.include_timings,
+                mode=payload.mode,
+            ):
+                yield _format_sse(event, data)
+        except PaymentRequiredError as exc:
+            yield _format_sse("error", {"status": 402, "detail": str(exc)})
+        except RuntimeError as exc:
+            yield _format_sse("error", {"status": 400, "detail": str(exc)})
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.post("/v1/council/jobs", response_model=CouncilJob, status_code=202)
+async def submit_council_job(
+    payload: CouncilJobRequest,
+    x_agent_wallet: str = Header(..., alias="X-AGENT-WALLET"),
+) -> CouncilJob:
+    from backend.jobs import get_job_runner
+
+    return await get_job_runner().submit(payload, caller_wallet=x_agent_wallet)
+
+
+@app.get("/v1/council/jobs/{job_id}", response_model=CouncilJob)
+async def get_council_job(
+    job_id: str,
+    x_agent_wallet: str = Header(..., alias="X-AGENT-WALLET"),
+) -> CouncilJob:
+    from backend.jobs import get_job_runner
+
+    job = await get_job_runner().get(job_id, caller_wallet=x_agent_wallet)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.post("/v1/council/batch")
+async def batch_council(
+    payload: CouncilBatchRequest,
+    x_agent_wallet: str = Header(..., alias="X-AGENT-WALLET"),
+) -> StreamingResponse:
+    from backend.batch import run_batch
+
+    max_queries = get_settings().batch_max_queries
+    if len(payload.queries) > max_queries:
+        raise HTTPException(status_code=400, detail=f"Batch exceeds {max_queries} queries")
+
+    async def _lines() -> AsyncIterator[str]:
+        async for result in run_batch(payload.queries, caller_wallet=x_agent_wallet):
+            yield json.dumps(result) + "\n"
+
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
@@ -0,0 +1,338 @@
+"""ABOUTME: In-process Prometheus-style counters, gauges, and histograms.
+ABOUTME: Records gateway and stage metrics and renders the text exposition format."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from contextlib import contextmanager
+from math import inf
+from time import perf_counter
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 80.0, 160.0)
+
+STAGES = ("stage1", "stage2", "stage3")
+
+# Stage label used for gateway calls made outside a council stage.
+DIRECT_STAGE = "direct"
+
+
+class CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class GaugeChild:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+
+class HistogramChild:
+    """Fixed-bucket histogram series.
+
+    Bucket counts live in a preallocated list, so ``observe`` only bumps
+    existing slots and never grows a container.
+    """
+
+    __slots__ = ("upper_bounds", "bucket_counts", "sum", "count")
+
+    def __init__(self, upper_bounds: Tuple[float, ...]) -> None:
+        self.upper_bounds = upper_bounds
+        self.bucket_counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect_left(self.upper_bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+
+    def _new_child(self) -> object:
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """Return the series for ``values``, creating it on first use.
+
+        Hot paths should resolve their series once and keep the child.
+        """
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        child = self._children.get(values)
+        if child is None:
+            child = self._new_child()
+            self._children[values] = child
+        return child
+
+    def _label_text(self, values: Tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, values)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in self._children.items():
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def _render_child(self, values: Tuple[str, ...], child) -> List[str]:
+        return [f"{self.name}{self._label_text(values)} {_format(child.value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> CounterChild:
+        return CounterChild()
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self) -> GaugeChild:
+        return GaugeChild()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.upper_bounds = tuple(sorted(buckets))
+
+    def _new_child(self) -> HistogramChild:
+        return HistogramChild(self.upper_bounds)
+
+    def _render_child(self, values: Tuple[str, ...], child: HistogramChild) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip((*child.upper_bounds, inf), child.bucket_counts):
+            cumulative += count
+            le = "+Inf" if bound == inf else _format(bound)
+            labels = self._label_text(values, f'le="{le}"')
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = self._label_text(values)
+        lines.append(f"{self.name}_sum{labels} {_format(child.sum)}")
+        lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Ordered collection of metrics rendered together by ``/metrics``."""
+
+    def __init__(self) -> None:
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format(value: float) -> str:
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+REGISTRY = MetricsRegistry()
+
+GATEWAY_REQUESTS = REGISTRY.register(
+    Counter("council_gateway_requests_total", "Gateway attempts sent.", ("publisher", "stage"))
+)
+GATEWAY_LATENCY = REGISTRY.register(
+    Histogram(
+        "council_gateway_request_duration_seconds",
+        "Latency of gateway attempts that received a response.",
+        ("publisher", "stage"),
+    )
+)
+GATEWAY_RETRIES = REGISTRY.register(
+    Counter(
+        "council_gateway_retries_total",
+        "Gateway attempts that were retries.",
+        ("publisher", "stage"),
+    )
+)
+GATEWAY_PAYMENT_REQUIRED = REGISTRY.register(
+    Counter(
+        "council_gateway_payment_required_total",
+        "Gateway responses with status 402.",
+        ("publisher", "stage"),
+    )
+)
+GATEWAY_FAILURES = REGISTRY.register(
+    Counter(
+        "council_gateway_failures_total",
+        "Member calls that ended without a usable answer.",
+        ("publisher", "stage"),
+    )
+)
+GATEWAY_REQUEST_BYTES = REGISTRY.register(
+    Counter(
+        "council_gateway_request_bytes_total",
+        "Request body bytes sent.",
+        ("publisher", "stage"),
+    )
+)
+GATEWAY_RESPONSE_BYTES = REGISTRY.register(
+    Counter(
+        "council_gateway_response_bytes_total",
+        "Response body bytes received.",
+        ("publisher", "stage"),
+    )
+)
+GATEWAY_INPUT_TOKENS = REGISTRY.register(
+    Counter(
+        "council_gateway_input_tokens_total",
+        "Prompt tokens publishers reported, cached ones included.",
+        ("publisher", "stage"),
+    )
+)
+GATEWAY_OUTPUT_TOKENS = REGISTRY.register(
+    Counter(
+        "council_gateway_output_tokens_total",
+        "Completion tokens publishers reported.",
+        ("publisher", "stage"),
+    )
+)
+GATEWAY_COST = REGISTRY.register(
+    Counter(
+        "council_gateway_cost_usd_total",
+        "Upstream spend in USD for calls to priced models.",
+        ("publisher", "stage"),
+    )
+)
+GATEWAY_CACHED_INPUT_TOKENS = REGISTRY.register(
+    Counter(
+        "council_gateway_cached_input_tokens_total",
+        "Prompt tokens publishers reported serving from their prompt cache.",
+        ("publisher", "stage"),
+    )
+)
+GATEWAY_IN_FLIGHT = REGISTRY.register(
+    Gauge(
+        "council_gateway_in_flight",
+        "Gateway attempts currently awaiting a response.",
+        ("publisher",),
+    )
+)
+STAGE_LATENCY = REGISTRY.register(
+    Histogram("council_stage_duration_seconds", "Wall-clock time per council stage.", ("stage",))
+)
+COUNCIL_LATENCY = REGISTRY.register(
+    Histogram("council_duration_seconds", "Wall-clock time per council.")
+)
+COUNCILS_IN_FLIGHT = REGISTRY.register(
+    Gauge("council_in_flight", "Councils currently deliberating.")
+)
+
+
+class GatewaySeries:
+    """Pre-resolved metric children for one (publisher, stage) pair."""
+
+    __slots__ = (
+        "requests",
+        "latency",
+        "retries",
+        "payment_required",
+        "failures",
+        "request_bytes",
+        "response_bytes",
+        "input_tokens",
+        "output_tokens",
+        "cached_input_tokens",
+        "cost_usd",
+        "in_flight",
+    )
+
+    def __init__(self, publisher_id: str, stage: str) -> None:
+        self.requests = GATEWAY_REQUESTS.labels(publisher_id, stage)
+        self.latency = GATEWAY_LATENCY.labels(publisher_id, stage)
+        self.retries = GATEWAY_RETRIES.labels(publisher_id, stage)
+        self.payment_required = GATEWAY_PAYMENT_REQUIRED.labels(publisher_id, stage)
+        self.failures = GATEWAY_FAILURES.labels(publisher_id, stage)
+        self.request_bytes = GATEWAY_REQUEST_BYTES.labels(publisher_id, stage)
+        self.response_bytes = GATEWAY_RESPONSE_BYTES.labels(publisher_id, stage)
+        self.input_tokens = GATEWAY_INPUT_TOKENS.labels(publisher_id, stage)
+        self.output_tokens = GATEWAY_OUTPUT_TOKENS.labels(publisher_id, stage)
+        self.cached_input_tokens = GATEWAY_CACHED_INPUT_TOKENS.labels(publisher_id, stage)
+        self.cost_usd = GATEWAY_COST.labels(publisher_id, stage)
+        self.in_flight = GATEWAY_IN_FLIGHT.labels(publisher_id)
+
+
+_gateway_series: Dict[str, Dict[str, GatewaySeries]] = {}
+
+
+def gateway_series(publisher_id: str, stage: str = DIRECT_STAGE) -> GatewaySeries:
+    """Series bundle for a publisher and stage, built once and then reused."""
+    by_stage = _gateway_series.get(publisher_id)
+    if by_stage is None:
+        by_stage = _gateway_series[publisher_id] = {}
+    series = by_stage.get(stage)
+    if series is None:
+        series = by_stage[stage] = GatewaySeries(publisher_id, stage)
+    return series
+
+
+_stage_latency = {stage: STAGE_LATENCY.labels(stage) for stage in STAGES}
+_council_latency = COUNCIL_LATENCY.labels()
+_councils_in_flight = COUNCILS_IN_FLIGHT.labels()
+
+
+@contextmanager
+def time_stage(stage: str) -> Iterator[None]:
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        _stage_latency[stage].observe(perf_counter() - started)
+
+
+@contextmanager
+def time_council() -> Iterator[None]:
+    _councils_in_flight.inc()
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        _councils_in_flight.dec()
+        _council_latency.observe(perf_counter() - started)
@@ -0,0 +1,286 @@
+"""ABOUTME: Local stand-in for the x402 gateway proxy used in load tests.
+ABOUTME: Serves OpenAI and Anthropic shapes with injected latency, errors, and 402s."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, ConfigDict, Field
+
+ANTHROPIC_PATH = "/messages"
+
+_LABEL_PATTERN = re.compile(r"^R(\d+): ", re.MULTILINE)
+
+
+class PublisherProfile(BaseModel):
+    """Simulated behaviour of one publisher."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    latency_median_seconds: float = Field(default=0.05, ge=0)
+    latency_sigma: float = Field(
+        default=0.5,
+        ge=0,
+        description="Log-normal shape; 0 gives a fixed latency, larger values a longer tail",
+    )
+    error_rate: float = Field(default=0.0, ge=0, le=1)
+    error_status: int = 503
+    payment_required_rate: float = Field(default=0.0, ge=0, le=1)
+    response_words: int = Field(default=120, ge=1)
+    stream_chunk_words: int = Field(default=8, ge=1)
+    stream_chunk_delay_seconds: float = Field(default=0.01, ge=0)
+
+
+class MockGatewayConfig(BaseModel):
+    """Per-publisher profiles, falling back to ``default`` for unknown ids."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    default: PublisherProfile = Field(default_factory=PublisherProfile)
+    publishers: Dict[str, PublisherProfile] = Field(default_factory=dict)
+    seed: Optional[int] = None
+
+    def profile(self, publisher_id: str) -> PublisherProfile:
+        return self.publishers.get(publisher_id, self.default)
+
+
+class _Gateway:
+    def __init__(self, config: MockGatewayConfig) -> None:
+        self.config = config
+        self.rand = random.Random(config.seed)
+        self.requests: Dict[str, int] = {}
+        self.cached_prefixes: set[tuple[str, str]] = set()
+
+    def cache_read(self, model: str, body: Dict[str, Any]) -> int:
+        """Words of the prompt up to its last ``cache_control`` block seen before.
+
+        Mimics Anthropic prompt caching: the first call writes the prefix,
+        later calls from the same model read it.
+        """
+        prefix: List[str] = []
+        cached = ""
+        for message in body.get("messages", []):
+            content = message.get("content")
+            if not isinstance(content, list):
+                prefix.append(content or "")
+                continue
+            for block in content:
+                prefix.append(block.get("text", ""))
+                if "cache_control" in block:
+                    cached = "".join(prefix)
+        if not cached:
+            return 0
+        key = (model, cached)
+        if key not in self.cached_prefixes:
+            self.cached_prefixes.add(key)
+            return 0
+        return len(cached.split())
+
+    def latency(self, profile: PublisherProfile) -> float:
+        if profile.latency_sigma == 0:
+            return profile.latency_median_seconds
+        spread = self.rand.lognormvariate(0.0, profile.latency_sigma)
+        return profile.latency_median_seconds * spread
+
+    def fault(self, profile: PublisherProfile) -> Optional[int]:
+        roll = self.rand.random()
+        if roll < profile.payment_required_rate:
+            return 402
+        if roll < profile.payment_required_rate + profile.error_rate:
+            return profile.error_status
+        return None
+
+
+def _message_text(content: Any) -> str:
+    if isinstance(content, list):
+        return "".join(block.get("text", "") for block in content if isinstance(block, dict))
+    return content if isinstance(content, str) else ""
+
+
+def _prompt_text(body: Dict[str, Any]) -> str:
+    return "\n".join(_message_text(message.get("content")) for message in body.get("messages", []))
+
+
+def _max_tokens(body: Dict[str, Any]) -> int:
+    """The request's generation budget, in words; unlimited if none was set."""
+    for key in ("max_tokens", "max_completion_tokens"):
+        value = body.get(key)
+        if isinstance(value, int) and value > 0:
+            return value
+    return 1 << 30
+
+
+def _answer_text(model: str, prompt: str, words: int) -> str:
+    """Deterministic answer; stage 2 prompts get the JSON critique they ask for."""
+    if "Return ONLY valid JSON" in prompt:
+        labels = [f"R{number}" for number in _LABEL_PATTERN.findall(prompt)]
+        analysis = f"{model} reviewed {len(labels)} responses."
+        return json.dumps({"analysis": analysis, "rankings": labels})
+    filler = " ".join(f"w{index}" for index in range(max(0, words - 3)))
+    return f"{model} mock answer: {filler}".strip()
+
+
+def _usage(is_anthropic: bool, text: str, prompt: str, cache_read: int = 0) -> Dict[str, Any]:
+    """Word counts standing in for tokens, in the publisher's usage shape."""
+    input_tokens = len(prompt.split())
+    output_tokens = len(text.split())
+    if is_anthropic:
+        usage = {"input_tokens": input_tokens - cache_read, "output_tokens": output_tokens}
+        if cache_read:
+            usage["cache_read_input_tokens"] = cache_read
+        return usage
+    return {
+        "prompt_tokens": input_tokens,
+        "completion_tokens": output_tokens,
+        "total_tokens": input_tokens + output_tokens,
+    }
+
+
+def _completion(
+    is_anthropic: bool,
+    model: str,
+    text: str,
+    prompt: str,
+    cache_read: int = 0,
+) -> Dict[str, Any]:
+    usage = _usage(is_anthropic, text, prompt, cache_read)
+    if is_anthropic:
+        return {
+            "type": "message",
+            "role": "assistant",
+            "model": model,
+            "content": [{"type": "text", "text": text}],
+            "stop_reason": "end_turn",
+            "usage": usage,
+        }
+    return {
+        "object": "chat.completion",
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": usage,
+    }
+
+
+def _chunks(text: str, words_per_chunk: int) -> List[str]:
+    words = text.split(" ")
+    chunks = [
+        " ".join(words[start:start + words_per_chunk])
+        for start in range(0, len(words), words_per_chunk)
+    ]
+    return [chunk + " " for chunk in chunks[:-1]] + chunks[-1:]
+
+
+async def _stream_events(
+    is_anthropic: bool,
+    text: str,
+    profile: PublisherProfile,
+    usage: Optional[Dict[str, Any]] = None,
+) -> AsyncIterator[str]:
+    """Server-sent events for ``text``; ``usage`` is reported the way each format does."""
+    if is_anthropic and usage is not None:
+        prompt_usage = {**usage, "output_tokens": 0}
+        start = {"type": "message_start", "message": {"usage": prompt_usage}}
+        yield f"data: {json.dumps(start)}\n\n"
+    for index, chunk in enumerate(_chunks(text, profile.stream_chunk_words)):
+        if index and profile.stream_chunk_delay_seconds:
+            await asyncio.sleep(profile.stream_chunk_delay_seconds)
+        if is_anthropic:
+            event = {
+                "type": "content_block_delta",
+                "index": 0,
+                "delta": {"type": "text_delta", "text": chunk},
+            }
+        else:
+            event = {"choices": [{"index": 0, "delta": {"content": chunk}}]}
+        yield f"data: {json.dumps(event)}\n\n"
+    if is_anthropic:
+        if usage is not None:
+            delta = {"type": "message_delta", "usage": {"output_tokens": usage["output_tokens"]}}
+            yield f"data: {json.dumps(delta)}\n\n"
+        yield f"data: {json.dumps({'type': 'message_stop'})}\n\n"
+    else:
+        if usage is not None:
+            yield f"data: {json.dumps({'choices': [], 'usage': usage})}\n\n"
+        yield "data: [DONE]\n\n"
+
+
+def create_mock_gateway(config: Optional[MockGatewayConfig] = None) -> FastAPI:
+    """Build a mock gateway app serving ``POST /api/proxy``."""
+    gateway = _Gateway(config or MockGatewayConfig())
+    app = FastAPI(title="Mock x402 Gateway")
+    app.state.gateway = gateway
+
+    @app.post("/api/proxy")
+    async def proxy(request: Request) -> Response:
+        envelope = await request.json()
+        publisher_id = envelope.get("publisherId", "")
+        upstream = envelope.get("request", {})
+        body = upstream.get("body", {})
+        profile = gateway.config.profile(publisher_id)
+        gateway.requests[publisher_id] = gateway.requests.get(publisher_id, 0) + 1
+
+        await asyncio.sleep(gateway.latency(profile))
+        status = gateway.fault(profile)
+        if status == 402:
+            return JSONResponse({"error": "Payment required"}, status_code=402)
+        if status is not None:
+            return JSONResponse({"error": "Injected upstream failure"}, status_code=status)
+
+        is_anthropic = upstream.get("path") == ANTHROPIC_PATH
+        model = body.get("model", "mock-model")
+        prompt = _prompt_text(body)
+        text = _answer_text(model, prompt, min(profile.response_words, _max_tokens(body)))
+        cache_read = gateway.cache_read(model, body) if is_anthropic else 0
+        if body.get("stream"):
+            reports_usage = is_anthropic or bool(
+                (body.get("stream_options") or {}).get("include_usage")
+            )
+            usage = _usage(is_anthropic, text, prompt, cache_read) if reports_usage else None
+            return StreamingResponse(
+                _stream_events(is_anthropic, text, profile, usage),
+                media_type="text/event-stream",
+            )
+        return JSONResponse(_completion(is_anthropic, model, text, prompt, cache_read))
+
+    @app.get("/mock/stats")
+    async def stats() -> Dict[str, Dict[str, int]]:
+        return {"requests": dict(gateway.requests)}
+
+    return app
+
+
+def load_config(path: Optional[str]) -> MockGatewayConfig:
+    if not path:
+        return MockGatewayConfig()
+    with open(path, encoding="utf-8") as handle:
+        return MockGatewayConfig.model_validate_json(handle.read())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a local mock x402 gateway.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8402)
+    parser.add_argument("--config", default=os.environ.get("MOCK_GATEWAY_CONFIG"))
+    args = parser.parse_args()
+
+    import uvicorn
+
+    uvicorn.run(create_mock_gateway(load_config(args.config)), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
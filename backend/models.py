@@ -3,9 +3,10 @@ ABOUTME: Provides request, response, and metadata schemas."""
 
 from __future__ import annotations
 
-from typing import Dict, List, Optional
+import ipaddress
+from typing import Dict, List, Literal, Optional
 
-from pydantic import BaseModel, Field, ConfigDict, field_validator
+from pydantic import BaseModel, Field, ConfigDict, HttpUrl, field_validator
 
 
 class CouncilQuery(BaseModel):
@@ -15,6 +16,23 @@ class CouncilQuery(BaseModel):
 
     query: str = Field(..., description="User query for the council")
     chairman: Optional[str] = Field(default=None, description="Optional chairman override")
+    deadline_seconds: Optional[float] = Field(
+        default=None,
+        gt=0,
+        description="Overall time budget for the council; defaults to the server setting",
+    )
+    include_timings: bool = Field(
+        default=False,
+        description="Return a per-stage and per-call timing breakdown in metadata.timings",
+    )
+    mode: Literal["full", "fast", "lite"] = Field(
+        default="full",
+        description=(
+            "'full' runs every member through all stages, 'fast' asks only the"
+            " members with the best recent latency and success rate, 'lite'"
+            " skips stage 2 critiques"
+        ),
+    )
 
     @field_validator("query")
     @classmethod
@@ -48,6 +66,95 @@ class Stage2CritiqueModel(BaseModel):
     error: Optional[str] = None
 
 
+class CallTiming(BaseModel):
+    """One gateway attempt or stream within a council."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    stage: str
+    member: str
+    attempt: int = 0
+    status: str
+    status_code: Optional[int] = None
+    duration_ms: float
+    response_bytes: Optional[int] = None
+
+
+class StageTiming(BaseModel):
+    """Wall-clock time of one stage and the call that finished last."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    duration_ms: float
+    critical_member: Optional[str] = Field(
+        default=None,
+        description="Member whose call ended last, i.e. the one the stage waited on",
+    )
+
+
+class CouncilTimings(BaseModel):
+    """Timing breakdown of a council, derived from its trace."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    trace_id: str
+    stages: Dict[str, StageTiming] = Field(default_factory=dict)
+    calls: List[CallTiming] = Field(default_factory=list)
+
+
+class RankingSummary(BaseModel):
+    """Aggregate of the stage 2 rankings over the stage 1 opinions."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    method: Literal["borda", "copeland", "kemeny"]
+    ballots: int
+    order: List[str] = Field(description="Members best first under the configured method")
+    borda: Dict[str, float] = Field(default_factory=dict)
+    copeland: Dict[str, float] = Field(default_factory=dict)
+    kemeny: Optional[List[str]] = Field(
+        default=None,
+        description="Kemeny-Young order, omitted when there are too many opinions to solve",
+    )
+    chairman_opinions: List[str] = Field(
+        default_factory=list,
+        description="Top-k opinions the chairman saw; empty when it saw all of them",
+    )
+
+
+class TokenUsage(BaseModel):
+    """Tokens and upstream spend summed over one or more gateway calls."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    calls: int = 0
+    input_tokens: int = Field(default=0, description="Prompt tokens, cached ones included")
+    output_tokens: int = 0
+    cached_input_tokens: int = 0
+    cost_usd: Optional[float] = Field(
+        default=None,
+        description="Upstream spend at the configured token prices; unset if no model was priced",
+    )
+
+
+class UsageSummary(BaseModel):
+    """Token usage of a council, overall and broken down by stage and member."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    total: TokenUsage
+    stages: Dict[str, TokenUsage] = Field(default_factory=dict)
+    members: Dict[str, TokenUsage] = Field(default_factory=dict)
+
+
+class PublisherUsage(TokenUsage):
+    """One publisher's usage over the rolling ledger window."""
+
+    window_seconds: float
+    tokens_per_second: float
+    output_tokens_per_second: float
+
+
 class CouncilMetadata(BaseModel):
     """Metadata about the council run."""
 
@@ -56,8 +163,87 @@ class CouncilMetadata(BaseModel):
     models_succeeded: List[str]
     models_failed: List[str]
     chairman: str
-    cost_usd: float
+    cost_usd: float = Field(description="Flat fee charged for the council")
     duration_ms: int
+    mode: Literal["full", "fast", "lite"] = "full"
+    council_members: List[str] = Field(
+        default_factory=list,
+        description="Members selected to sit on this council",
+    )
+    stage1_cut_off: List[str] = Field(
+        default_factory=list,
+        description="Members cancelled in stage 1 after quorum was reached",
+    )
+    stage2_cut_off: List[str] = Field(
+        default_factory=list,
+        description="Critics cancelled in stage 2 after quorum was reached",
+    )
+    hedged_members: List[str] = Field(
+        default_factory=list,
+        description="Stage 1 members that received a hedged duplicate request",
+    )
+    hedge_answered_by: Dict[str, str] = Field(
+        default_factory=dict,
+        description="Hedged members whose answer came from their backup member, mapped to it",
+    )
+    stage1_cache_hits: List[str] = Field(
+        default_factory=list,
+        description="Stage 1 members whose opinion was served from the opinion cache",
+    )
+    cache_reuse: Optional[str] = Field(
+        default=None,
+        description=(
+            "How a near-duplicate past council was reused:"
+            " 'near_duplicate_response' or 'near_duplicate_opinions'"
+        ),
+    )
+    reuse_similarity: Optional[float] = Field(
+        default=None,
+        description="Estimated similarity between this query and the reused one",
+    )
+    critique_topology: Optional[Literal["all", "round_robin", "bibd"]] = Field(
+        default=None,
+        description="How stage 2 critics were assigned responses; unset when stage 2 was skipped",
+    )
+    critique_assignments: Dict[str, List[str]] = Field(
+        default_factory=dict,
+        description="Members whose responses each critic reviewed, for sparse topologies",
+    )
+    ranking: Optional[RankingSummary] = Field(
+        default=None,
+        description="Borda, Copeland and Kemeny-Young aggregation of the stage 2 rankings",
+    )
+    consensus_score: Optional[float] = Field(
+        default=None,
+        description="Mean pairwise agreement of the stage 1 opinions, when scored",
+    )
+    consensus_decision: Optional[Literal["deliberate", "medoid", "chairman"]] = Field(
+        default=None,
+        description=(
+            "'deliberate' when opinions disagreed; otherwise stage 2 was skipped and the"
+            " answer is the medoid opinion ('medoid') or a critique-free synthesis ('chairman')"
+        ),
+    )
+    consensus_medoid: Optional[str] = Field(
+        default=None,
+        description="Member whose opinion best represents the others, when consensus was reached",
+    )
+    usage: Optional[UsageSummary] = Field(
+        default=None,
+        description="Tokens and upstream spend of the calls this council made, when reported",
+    )
+    cached_input_tokens: Dict[str, int] = Field(
+        default_factory=dict,
+        description="Prompt tokens publishers served from their prompt cache, per stage",
+    )
+    coalesced: bool = Field(
+        default=False,
+        description="True when this response was shared from an identical in-flight council",
+    )
+    timings: Optional[CouncilTimings] = Field(
+        default=None,
+        description="Per-stage and per-call timings, present when include_timings is set",
+    )
 
 
 class CouncilResponse(BaseModel):
@@ -69,3 +255,57 @@ class CouncilResponse(BaseModel):
     stage1_responses: Dict[str, Stage1ResponseModel]
     stage2_critiques: Dict[str, Stage2CritiqueModel]
     metadata: CouncilMetadata
+
+
+class CouncilBatchRequest(BaseModel):
+    """Payload for running many council queries in one request."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    queries: List[CouncilQuery] = Field(..., min_length=1, description="Queries to run")
+
+
+def is_internal_host(host: str) -> bool:
+    """True for loopback, private, link-local and other non-public hosts."""
+    host = host.strip("[]").rstrip(".").lower()
+    if host == "localhost" or host.endswith(".localhost"):
+        return True
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return not address.is_global or address.is_multicast
+
+
+class CouncilJobRequest(CouncilQuery):
+    """Payload for submitting an asynchronous council job."""
+
+    webhook_url: Optional[HttpUrl] = Field(
+        default=None,
+        description="Optional public http(s) URL that receives the finished job as a JSON POST",
+    )
+
+    @field_validator("webhook_url")
+    @classmethod
+    def _validate_webhook_url(cls, value: Optional[HttpUrl]) -> Optional[HttpUrl]:
+        # The server POSTs here, so internal addresses would let callers probe
+        # the deployment's own network (e.g. cloud metadata at 169.254.169.254).
+        if value is not None and is_internal_host(value.host or ""):
+            raise ValueError("Webhook URL must not point at a private or loopback host")
+        return value
+
+
+class CouncilJob(BaseModel):
+    """Status and (partial) results of an asynchronous council job."""
+
+    model_config = ConfigDict(extra="forbid")
+
+    id: str
+    status: Literal["queued", "running", "succeeded", "failed"]
+    created_at: float
+    updated_at: float
+    stage1_responses: Dict[str, Stage1ResponseModel] = Field(default_factory=dict)
+    stage2_critiques: Dict[str, Stage2CritiqueModel] = Field(default_factory=dict)
+    result: Optional[CouncilResponse] = None
+    error: Optional[str] = None
+    error_status: Optional[int] = None
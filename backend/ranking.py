@@ -0,0 +1,145 @@
+"""ABOUTME: Consensus ranking over stage-2 critic ballots.
+ABOUTME: Borda, Copeland, and Kemeny-Young aggregation from a pairwise preference matrix."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from itertools import permutations
+from typing import Collection, List, Mapping, Optional, Sequence
+
+METHODS = ("borda", "copeland", "kemeny")
+
+# Kemeny-Young is solved by trying every order, so it is only run up to here.
+KEMENY_MAX_CANDIDATES = 7
+
+
+@dataclass(frozen=True, slots=True)
+class Aggregate:
+    """Aggregate scores for ``n`` candidates, indexed like the candidates."""
+
+    borda: List[float]
+    copeland: List[float]
+    kemeny: Optional[List[int]]
+    ballots: int
+
+    def order(self, method: str = "borda") -> List[int]:
+        """Candidates best first under ``method``.
+
+        Kemeny falls back to Borda when there were too many candidates to
+        solve it. Ties keep candidate order.
+        """
+        if method == "kemeny" and self.kemeny is not None:
+            return list(self.kemeny)
+        scores = self.copeland if method == "copeland" else self.borda
+        return sorted(range(len(scores)), key=lambda index: -scores[index])
+
+
+def ballot_from_labels(ranking: Sequence[str], candidates: Mapping[str, int]) -> List[int]:
+    """Turn ranked labels such as ``["R2", "R1"]`` into candidate indexes.
+
+    Unknown labels and repeats are dropped.
+    """
+    ballot: List[int] = []
+    for label in ranking:
+        index = candidates.get(label.strip().upper())
+        if index is not None and index not in ballot:
+            ballot.append(index)
+    return ballot
+
+
+def pairwise_matrix(
+    ballots: Sequence[Sequence[int]],
+    count: int,
+    shown: Optional[Sequence[Collection[int]]] = None,
+) -> List[List[int]]:
+    """``matrix[a][b]`` counts ballots that prefer candidate ``a`` to ``b``.
+
+    A ballot prefers each ranked candidate to those ranked after it and to
+    candidates it was shown but left unranked. ``shown`` gives the
+    candidates each ballot saw (all of them by default); pairs a ballot
+    never saw together contribute nothing.
+    """
+    matrix = [[0] * count for _ in range(count)]
+    everyone = range(count)
+    for position, ballot in enumerate(ballots):
+        seen = shown[position] if shown is not None else everyone
+        unranked = [candidate for candidate in seen if candidate not in ballot]
+        for rank, winner in enumerate(ballot):
+            row = matrix[winner]
+            for loser in ballot[rank + 1 :]:
+                row[loser] += 1
+            for loser in unranked:
+                row[loser] += 1
+    return matrix
+
+
+def borda_scores(matrix: Sequence[Sequence[int]]) -> List[float]:
+    """Borda points per ballot, on a ``0..n-1`` scale.
+
+    Each candidate's pairwise wins are divided by the pairwise comparisons
+    it took part in, so a response reviewed by fewer critics under a sparse
+    topology is not penalized for appearing on fewer ballots.
+    """
+    count = len(matrix)
+    scores = []
+    for a in range(count):
+        wins = sum(matrix[a])
+        comparisons = wins + sum(matrix[b][a] for b in range(count))
+        scores.append((count - 1) * wins / comparisons if comparisons else 0.0)
+    return scores
+
+
+def copeland_scores(matrix: Sequence[Sequence[int]]) -> List[float]:
+    """Copeland score: pairwise majority wins plus half a point per tie."""
+    count = len(matrix)
+    scores = [0.0] * count
+    for a in range(count):
+        for b in range(a + 1, count):
+            if matrix[a][b] > matrix[b][a]:
+                scores[a] += 1.0
+            elif matrix[b][a] > matrix[a][b]:
+                scores[b] += 1.0
+            else:
+                scores[a] += 0.5
+                scores[b] += 0.5
+    return scores
+
+
+def kemeny_order(
+    matrix: Sequence[Sequence[int]],
+    max_candidates: int = KEMENY_MAX_CANDIDATES,
+) -> Optional[List[int]]:
+    """Order agreeing with the most pairwise preferences, or ``None`` if too large.
+
+    Among equally good orders the first in lexicographic order wins.
+    """
+    count = len(matrix)
+    if count > max_candidates:
+        return None
+    best: Optional[tuple[int, ...]] = None
+    best_agreement = -1
+    for order in permutations(range(count)):
+        agreement = 0
+        for rank, winner in enumerate(order):
+            row = matrix[winner]
+            for loser in order[rank + 1 :]:
+                agreement += row[loser]
+        if agreement > best_agreement:
+            best, best_agreement = order, agreement
+    return list(best or ())
+
+
+def aggregate(
+    ballots: Sequence[Sequence[int]],
+    count: int,
+    shown: Optional[Sequence[Collection[int]]] = None,
+    kemeny_max_candidates: int = KEMENY_MAX_CANDIDATES,
+) -> Aggregate:
+    """Borda, Copeland, and (for small ``count``) Kemeny-Young results."""
+    matrix = pairwise_matrix(ballots, count, shown)
+    return Aggregate(
+        borda=borda_scores(matrix),
+        copeland=copeland_scores(matrix),
+        kemeny=kemeny_order(matrix, kemeny_max_candidates),
+        ballots=len(ballots),
+    )
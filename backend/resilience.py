@@ -0,0 +1,164 @@
+"""ABOUTME: Failure isolation primitives for upstream publisher calls.
+ABOUTME: Provides circuit breakers, retry budgets, backoff, and concurrency caps."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+from contextlib import asynccontextmanager
+from time import monotonic
+from typing import AsyncIterator, Callable, Dict
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with half-open probing.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    rejects calls for ``reset_timeout`` seconds. It then lets a single probe
+    through; the probe's outcome closes or re-opens the breaker. A probe that
+    never reports back (e.g. it was cancelled) is replaced after another
+    ``reset_timeout``.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started_at = 0.0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            return HALF_OPEN
+        return self._state
+
+    def allow_request(self) -> bool:
+        now = self._clock()
+        if self._state == CLOSED:
+            return True
+        if self._state == OPEN:
+            if now - self._opened_at < self.reset_timeout:
+                return False
+            self._state = HALF_OPEN
+            self._probe_started_at = now
+            return True
+        # Half-open: one probe at a time, replaced if it goes silent.
+        if now - self._probe_started_at >= self.reset_timeout:
+            self._probe_started_at = now
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._state = CLOSED
+        self._failures = 0
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+            self._state = OPEN
+            self._opened_at = self._clock()
+
+
+class BreakerRegistry:
+    """Lazily creates one :class:`CircuitBreaker` per publisher id."""
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, publisher_id: str) -> CircuitBreaker:
+        breaker = self._breakers.get(publisher_id)
+        if breaker is None:
+            breaker = CircuitBreaker(self.failure_threshold, self.reset_timeout, self._clock)
+            self._breakers[publisher_id] = breaker
+        return breaker
+
+    def states(self) -> Dict[str, str]:
+        return {publisher_id: breaker.state for publisher_id, breaker in self._breakers.items()}
+
+
+class RetryBudget:
+    """Token bucket that caps retries to a fraction of overall traffic.
+
+    Every first attempt deposits ``ratio`` tokens and every retry spends one,
+    so retries stay near ``ratio`` of requests during an outage instead of
+    multiplying load. ``min_tokens`` seeds the bucket so low-traffic
+    processes can still retry.
+    """
+
+    def __init__(self, ratio: float, min_tokens: float, max_tokens: float) -> None:
+        self.ratio = ratio
+        self.max_tokens = max(max_tokens, min_tokens)
+        self._tokens = float(min_tokens)
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+    def deposit(self) -> None:
+        self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self._tokens < 1.0:
+            return False
+        self._tokens -= 1.0
+        return True
+
+
+def backoff_delay(
+    attempt: int,
+    base: float,
+    cap: float,
+    rand: Callable[[], float] = random.random,
+) -> float:
+    """Exponential backoff with full jitter for retry number ``attempt`` (0-based)."""
+    return rand() * min(cap, base * (2**attempt))
+
+
+class PublisherLimiter:
+    """Caps concurrent in-flight calls per publisher id.
+
+    Shared by every council in a batch so that a publisher's limit holds
+    across the whole batch rather than per query.
+    """
+
+    def __init__(self, max_per_publisher: int) -> None:
+        self.max_per_publisher = max(1, max_per_publisher)
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._in_flight: Dict[str, int] = {}
+        self.peak_in_flight: Dict[str, int] = {}
+
+    @asynccontextmanager
+    async def slot(self, publisher_id: str) -> AsyncIterator[None]:
+        semaphore = self._semaphores.get(publisher_id)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_per_publisher)
+            self._semaphores[publisher_id] = semaphore
+        async with semaphore:
+            current = self._in_flight.get(publisher_id, 0) + 1
+            self._in_flight[publisher_id] = current
+            if current > self.peak_in_flight.get(publisher_id, 0):
+                self.peak_in_flight[publisher_id] = current
+            try:
+                yield
+            finally:
+                self._in_flight[publisher_id] -= 1
@@ -0,0 +1,253 @@
+"""ABOUTME: Immutable council roster and chairman routing table.
+ABOUTME: Built once from defaults or a TOML/JSON file, and reloaded when the file changes."""
+
+from __future__ import annotations
+
+import json
+import os
+import tomllib
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import Any, Callable, Dict, Optional, Tuple
+
+API_FORMATS = ("openai", "anthropic")
+MAX_TOKENS_PARAMS = ("max_tokens", "max_completion_tokens")
+
+# Chairman overrides come from callers, so only this many are memoized.
+_MAX_CACHED_CHAIRMEN = 256
+
+DEFAULT_ROSTER: Dict[str, Any] = {
+    "members": [
+        {
+            "name": "claude",
+            "publisher": "claude",
+            "model": "claude-sonnet-4-5",
+            "endpoint_path": "/messages",
+            "api_format": "anthropic",
+        },
+        {
+            "name": "gpt5",
+            "publisher": "openai",
+            "model": "gpt-5.2",
+            "max_tokens_param": "max_completion_tokens",
+            "reasoning": True,
+        },
+        {
+            "name": "kimi",
+            "publisher": "moonshot",
+            "model": "kimi-k2-0711-preview",
+            "structured_output": False,
+        },
+        {"name": "gemini", "publisher": "gemini", "model": "google/gemini-3-pro-preview"},
+        {"name": "sonar", "publisher": "perplexity", "model": "sonar"},
+    ],
+    "chairmen": [
+        {
+            "prefix": "claude",
+            "publisher": "claude",
+            "endpoint_path": "/messages",
+            "api_format": "anthropic",
+        },
+        {
+            "prefix": "gpt",
+            "publisher": "openai",
+            "max_tokens_param": "max_completion_tokens",
+            "reasoning": True,
+        },
+    ],
+    # Unknown chairman models go to Claude.
+    "fallback_chairman": {
+        "publisher": "claude",
+        "endpoint_path": "/messages",
+        "api_format": "anthropic",
+    },
+}
+
+
+@dataclass(frozen=True, slots=True)
+class CouncilMember:
+    """Represents a single council model configuration."""
+
+    name: str
+    publisher_id: str
+    model: str
+    endpoint_path: str = "/chat/completions"
+    api_format: str = "openai"  # "openai" or "anthropic"
+    # OpenAI-format request field for the generation budget; newer OpenAI
+    # models only accept "max_completion_tokens".
+    max_tokens_param: str = "max_tokens"
+    # Whether an OpenAI-format publisher accepts a json_schema response_format.
+    structured_output: bool = True
+    # Reasoning models spend part of the generation budget on hidden
+    # reasoning tokens, so they get settings.reasoning_token_allowance on top.
+    reasoning: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class ChairmanRoute:
+    """Sends chairman models starting with ``prefix`` to one publisher."""
+
+    prefix: str
+    publisher_id: str
+    endpoint_path: str = "/chat/completions"
+    api_format: str = "openai"
+    max_tokens_param: str = "max_tokens"
+    structured_output: bool = True
+    reasoning: bool = False
+
+    def member(self, model: str) -> CouncilMember:
+        return CouncilMember(
+            "chairman",
+            self.publisher_id,
+            model,
+            endpoint_path=self.endpoint_path,
+            api_format=self.api_format,
+            max_tokens_param=self.max_tokens_param,
+            structured_output=self.structured_output,
+            reasoning=self.reasoning,
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class Roster:
+    members: Tuple[CouncilMember, ...]
+    routes: Tuple[ChairmanRoute, ...]
+    fallback: ChairmanRoute
+    _chairmen: Dict[str, CouncilMember] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    def chairman(self, model: str) -> CouncilMember:
+        """Chairman member for ``model``, routed by the first matching prefix."""
+        member = self._chairmen.get(model)
+        if member is None:
+            route = next(
+                (route for route in self.routes if model.startswith(route.prefix)),
+                self.fallback,
+            )
+            member = route.member(model)
+            if len(self._chairmen) < _MAX_CACHED_CHAIRMEN:
+                self._chairmen[model] = member
+        return member
+
+
+def _publisher_id(entry: Dict[str, Any], settings: Any) -> str:
+    """Resolve a literal ``publisher_id`` or a ``publisher`` settings alias."""
+    if entry.get("publisher_id"):
+        return str(entry["publisher_id"])
+    alias = entry.get("publisher")
+    publisher_id = getattr(settings, f"{alias}_publisher_id", None) if alias else None
+    if not publisher_id:
+        raise ValueError(f"Unknown publisher in roster entry: {entry}")
+    return publisher_id
+
+
+def _api_format(entry: Dict[str, Any]) -> str:
+    api_format = entry.get("api_format", "openai")
+    if api_format not in API_FORMATS:
+        raise ValueError(f"Unsupported api_format {api_format!r} in roster entry: {entry}")
+    return api_format
+
+
+def _max_tokens_param(entry: Dict[str, Any]) -> str:
+    param = entry.get("max_tokens_param", "max_tokens")
+    if param not in MAX_TOKENS_PARAMS:
+        raise ValueError(f"Unsupported max_tokens_param {param!r} in roster entry: {entry}")
+    return param
+
+
+def _route(entry: Dict[str, Any], settings: Any) -> ChairmanRoute:
+    return ChairmanRoute(
+        prefix=entry.get("prefix", ""),
+        publisher_id=_publisher_id(entry, settings),
+        endpoint_path=entry.get("endpoint_path", "/chat/completions"),
+        api_format=_api_format(entry),
+        max_tokens_param=_max_tokens_param(entry),
+        structured_output=bool(entry.get("structured_output", True)),
+        reasoning=bool(entry.get("reasoning", False)),
+    )
+
+
+def build_roster(spec: Dict[str, Any], settings: Any) -> Roster:
+    """Validate a roster spec and freeze it into a :class:`Roster`."""
+    members = tuple(
+        CouncilMember(
+            entry["name"],
+            _publisher_id(entry, settings),
+            entry["model"],
+            endpoint_path=entry.get("endpoint_path", "/chat/completions"),
+            api_format=_api_format(entry),
+            max_tokens_param=_max_tokens_param(entry),
+            structured_output=bool(entry.get("structured_output", True)),
+            reasoning=bool(entry.get("reasoning", False)),
+        )
+        for entry in spec.get("members", [])
+    )
+    if not members:
+        raise ValueError("Roster must define at least one member")
+    names = [member.name for member in members]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Roster member names must be unique: {names}")
+    routes = tuple(_route(entry, settings) for entry in spec.get("chairmen", []))
+    fallback_entry = spec.get("fallback_chairman") or DEFAULT_ROSTER["fallback_chairman"]
+    return Roster(members, routes, _route({**fallback_entry, "prefix": ""}, settings))
+
+
+def load_roster_file(path: str) -> Dict[str, Any]:
+    """Read a roster spec from a ``.toml`` or JSON file."""
+    with open(path, "rb") as handle:
+        raw = handle.read()
+    if path.endswith(".toml"):
+        return tomllib.loads(raw.decode("utf-8"))
+    return json.loads(raw)
+
+
+class RosterSource:
+    """Serves the current roster, rebuilding it when the roster file changes.
+
+    Without a path the roster is built once. With a path the file's mtime
+    is checked at most every ``check_interval`` seconds; a changed file is
+    reloaded, and a file that fails to load or validate leaves the last
+    good roster in place.
+    """
+
+    def __init__(
+        self,
+        build: Callable[[Optional[Dict[str, Any]]], Roster],
+        path: Optional[str] = None,
+        check_interval: float = 2.0,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        self._build = build
+        self.path = path
+        self.check_interval = check_interval
+        self._clock = clock
+        self._mtime: Optional[int] = None
+        self._checked_at = 0.0
+        if path is None:
+            self._roster = build(None)
+        else:
+            self._mtime = os.stat(path).st_mtime_ns
+            self._roster = build(load_roster_file(path))
+            self._checked_at = clock()
+
+    def current(self) -> Roster:
+        if self.path is None:
+            return self._roster
+        now = self._clock()
+        if now - self._checked_at >= self.check_interval:
+            self._checked_at = now
+            self._reload_if_changed()
+        return self._roster
+
+    def _reload_if_changed(self) -> None:
+        assert self.path is not None
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+            if mtime == self._mtime:
+                return
+            roster = self._build(load_roster_file(self.path))
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+        self._mtime = mtime
+        self._roster = roster
@@ -0,0 +1,136 @@
+"""ABOUTME: Near-duplicate query index built on MinHash LSH.
+ABOUTME: Finds past councils whose query closely matches a new one."""
+
+from __future__ import annotations
+
+import hashlib
+import random
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, Set, TypeVar
+
+from backend.config import settings
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+T = TypeVar("T")
+
+
+def _shingles(text: str, size: int) -> Set[bytes]:
+    normalized = " ".join(text.lower().split())
+    if len(normalized) <= size:
+        return {normalized.encode("utf-8")}
+    return {normalized[i : i + size].encode("utf-8") for i in range(len(normalized) - size + 1)}
+
+
+def _base_hash(shingle: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(shingle, digest_size=4).digest(), "big")
+
+
+class MinHashLSH(Generic[T]):
+    """Bounded MinHash index with banded LSH buckets.
+
+    Each text is reduced to ``num_perm`` MinHash values over character
+    shingles. Signatures are split into ``bands`` bands and bucketed per
+    band, so lookups only compare against entries that share at least one
+    band. Candidates are then scored by the fraction of matching MinHash
+    values, an estimate of Jaccard similarity. The oldest entries are
+    evicted once ``max_entries`` is reached.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 4,
+        max_entries: int = 2048,
+        seed: int = 1,
+    ) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.max_entries = max(1, max_entries)
+        rng = random.Random(seed)
+        self._perms = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+        self._entries: OrderedDict[Hashable, tuple[tuple[int, ...], T]] = OrderedDict()
+        self._buckets: list[Dict[tuple[int, ...], Set[Hashable]]] = [{} for _ in range(bands)]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def signature(self, text: str) -> tuple[int, ...]:
+        hashes = [_base_hash(shingle) for shingle in _shingles(text, self.shingle_size)]
+        return tuple(
+            min(((a * value + b) % _MERSENNE_PRIME) & _MAX_HASH for value in hashes)
+            for a, b in self._perms
+        )
+
+    def _band_keys(self, signature: tuple[int, ...]) -> list[tuple[int, ...]]:
+        return [signature[i * self.rows : (i + 1) * self.rows] for i in range(self.bands)]
+
+    def insert(self, key: Hashable, text: str, value: T) -> None:
+        if key in self._entries:
+            self.remove(key)
+        signature = self.signature(text)
+        self._entries[key] = (signature, value)
+        for band, band_key in zip(self._buckets, self._band_keys(signature)):
+            band.setdefault(band_key, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self.remove(oldest)
+
+    def remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for band, band_key in zip(self._buckets, self._band_keys(entry[0])):
+            members = band.get(band_key)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del band[band_key]
+
+    def query(
+        self,
+        text: str,
+        threshold: float,
+        accept: Optional[Callable[[T], bool]] = None,
+    ) -> Optional[tuple[float, T]]:
+        """Return ``(similarity, value)`` of the best match at or above ``threshold``."""
+        signature = self.signature(text)
+        candidates: Set[Hashable] = set()
+        for band, band_key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(band.get(band_key, ()))
+
+        best: Optional[tuple[float, T]] = None
+        for key in candidates:
+            other, value = self._entries[key]
+            if accept is not None and not accept(value):
+                continue
+            similarity = sum(x == y for x, y in zip(signature, other)) / self.num_perm
+            if similarity >= threshold and (best is None or similarity > best[0]):
+                best = (similarity, value)
+        return best
+
+
+_near_duplicate_index: Optional[MinHashLSH[Any]] = None
+
+
+def get_near_duplicate_index() -> Optional[MinHashLSH[Any]]:
+    """Return the process-wide near-duplicate index, or ``None`` when disabled."""
+    global _near_duplicate_index
+    if not settings.near_duplicate_enabled:
+        return None
+    if _near_duplicate_index is None:
+        _near_duplicate_index = MinHashLSH(
+            num_perm=settings.near_duplicate_num_perm,
+            bands=settings.near_duplicate_bands,
+            max_entries=settings.near_duplicate_max_entries,
+        )
+    return _near_duplicate_index
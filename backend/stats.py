@@ -0,0 +1,91 @@
+"""ABOUTME: Rolling per-publisher, per-stage performance statistics.
+ABOUTME: Tracks recent latencies and success rates for hedging and fast councils."""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+
+class PublisherStats:
+    """Recent call performance for one publisher.
+
+    Keeps a sliding window of successful call latencies for percentiles, plus
+    exponentially weighted moving averages of latency and success rate that
+    weight the newest call by ``alpha``.
+    """
+
+    __slots__ = ("_latencies", "alpha", "ewma_latency", "ewma_success", "outcome_count")
+
+    def __init__(self, window: int, alpha: float = 0.2) -> None:
+        self._latencies: Deque[float] = deque(maxlen=max(1, window))
+        self.alpha = alpha
+        self.ewma_latency: Optional[float] = None
+        self.ewma_success: Optional[float] = None
+        self.outcome_count = 0
+
+    @property
+    def sample_count(self) -> int:
+        return len(self._latencies)
+
+    def record_latency(self, seconds: float) -> None:
+        """Record a successful call that took ``seconds``."""
+        self._latencies.append(seconds)
+        self.ewma_latency = self._smooth(self.ewma_latency, seconds)
+        self._record_outcome(1.0)
+
+    def record_failure(self) -> None:
+        """Record a call that ended without a usable answer."""
+        self._record_outcome(0.0)
+
+    def _record_outcome(self, success: float) -> None:
+        self.ewma_success = self._smooth(self.ewma_success, success)
+        self.outcome_count += 1
+
+    def _smooth(self, average: Optional[float], value: float) -> float:
+        if average is None:
+            return value
+        return average + self.alpha * (value - average)
+
+    def expected_seconds(self) -> Optional[float]:
+        """EWMA latency divided by EWMA success rate, lower is better.
+
+        ``inf`` when recent calls all failed, ``None`` with no calls recorded.
+        """
+        if self.ewma_success is not None and self.ewma_success <= 0:
+            return math.inf
+        if self.ewma_latency is None or self.ewma_success is None:
+            return None
+        return self.ewma_latency / self.ewma_success
+
+    def latency_percentile(self, quantile: float, min_samples: int = 1) -> Optional[float]:
+        """Nearest-rank percentile, or ``None`` until ``min_samples`` are recorded."""
+        count = len(self._latencies)
+        if count == 0 or count < min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        rank = min(count, max(1, math.ceil(quantile * count)))
+        return ordered[rank - 1]
+
+
+class StatsRegistry:
+    """Lazily creates one :class:`PublisherStats` per publisher and stage.
+
+    Stages are kept apart because their prompts differ in size: a short
+    stage-2 ranking would otherwise drag down the stage-1 latencies that
+    hedging and fast mode rely on.
+    """
+
+    def __init__(self, window: int, alpha: float = 0.2) -> None:
+        self.window = window
+        self.alpha = alpha
+        self._stats: Dict[Tuple[str, str], PublisherStats] = {}
+
+    def get(self, publisher_id: str, stage: str) -> PublisherStats:
+        key = (publisher_id, stage)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = PublisherStats(self.window, self.alpha)
+            self._stats[key] = stats
+        return stats
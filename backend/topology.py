@@ -0,0 +1,117 @@
+"""ABOUTME: Critique topologies that decide which stage-1 responses each critic reviews.
+ABOUTME: All-to-all, round-robin k-peer, and a greedy balanced incomplete block design."""
+
+from __future__ import annotations
+
+from typing import List, Optional, Sequence
+
+TOPOLOGIES = ("all", "round_robin", "bibd")
+
+
+def _round_robin(authors: Sequence[Optional[int]], responses: int, peers: int) -> List[List[int]]:
+    """Critic ``j`` reviews the ``peers`` responses after its own, wrapping around."""
+    blocks = []
+    for critic, own in enumerate(authors):
+        start = own if own is not None else critic % responses
+        blocks.append([(start + offset) % responses for offset in range(1, peers + 1)])
+    return blocks
+
+
+def _balanced_blocks(
+    authors: Sequence[Optional[int]],
+    responses: int,
+    peers: int,
+) -> List[List[int]]:
+    """Greedy approximation of a balanced incomplete block design.
+
+    Each critic's block is filled one response at a time, picking the
+    response reviewed least so far and, among those, the one that has
+    appeared least often alongside the responses already in the block.
+    This keeps both per-response review counts and pairwise co-occurrence
+    (how often two responses are ranked against each other) close to even
+    for any council size, where an exact BIBD usually does not exist.
+    """
+    reviews = [0] * responses
+    together = [[0] * responses for _ in range(responses)]
+    blocks = []
+    for own in authors:
+        block: List[int] = []
+        for _ in range(peers):
+            choice = min(
+                (
+                    candidate
+                    for candidate in range(responses)
+                    if candidate != own and candidate not in block
+                ),
+                key=lambda candidate: (
+                    reviews[candidate],
+                    sum(together[candidate][other] for other in block),
+                    candidate,
+                ),
+            )
+            block.append(choice)
+        for index, response in enumerate(block):
+            reviews[response] += 1
+            for other in block[index + 1 :]:
+                together[response][other] += 1
+                together[other][response] += 1
+        blocks.append(sorted(block))
+    return blocks
+
+
+def _ensure_coverage(
+    blocks: List[List[int]],
+    authors: Sequence[Optional[int]],
+    responses: int,
+    min_reviews: int,
+) -> None:
+    """Add reviews until every response has ``min_reviews`` critics, where possible.
+
+    Extra reviews go to the least-loaded critics that did not write the
+    response and do not already review it.
+    """
+    reviews = [0] * responses
+    for block in blocks:
+        for response in block:
+            reviews[response] += 1
+    for response in range(responses):
+        while reviews[response] < min_reviews:
+            eligible = [
+                critic
+                for critic, block in enumerate(blocks)
+                if authors[critic] != response and response not in block
+            ]
+            if not eligible:
+                break
+            critic = min(eligible, key=lambda index: (len(blocks[index]), index))
+            blocks[critic].append(response)
+            blocks[critic].sort()
+            reviews[response] += 1
+
+
+def assign_critiques(
+    authors: Sequence[Optional[int]],
+    responses: int,
+    topology: str = "all",
+    peers: int = 3,
+    min_reviews: int = 2,
+) -> List[List[int]]:
+    """Response indexes each critic reviews, one list per critic.
+
+    ``authors[j]`` is the index of critic ``j``'s own response, or ``None``
+    if it has none. Sparse topologies never assign critics their own
+    response and guarantee each response at least ``min_reviews`` critics
+    when enough critics exist. When ``peers`` covers every other response
+    the sparse topologies collapse to all-to-all.
+    """
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"Unknown critique topology: {topology}")
+    if topology == "all" or responses == 0 or peers >= responses - 1:
+        return [list(range(responses)) for _ in authors]
+    peers = max(1, peers)
+    if topology == "round_robin":
+        blocks = _round_robin(authors, responses, peers)
+    else:
+        blocks = _balanced_blocks(authors, responses, peers)
+    _ensure_coverage(blocks, authors, responses, min_reviews)
+    return blocks
@@ -0,0 +1,215 @@
+"""ABOUTME: Lightweight in-process tracing for councils and gateway calls.
+ABOUTME: Builds nested spans via a context variable and exports finished traces."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter, time
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set
+
+import httpx
+
+from backend.config import settings
+
+OK = "ok"
+ERROR = "error"
+CANCELLED = "cancelled"
+
+
+class _Trace:
+    """Spans finished so far under one root span."""
+
+    __slots__ = ("trace_id", "spans")
+
+    def __init__(self) -> None:
+        self.trace_id = os.urandom(16).hex()
+        self.spans: List[Span] = []
+
+
+class Span:
+    __slots__ = (
+        "name",
+        "span_id",
+        "parent_id",
+        "attributes",
+        "status",
+        "start_time",
+        "duration",
+        "_started",
+        "_trace",
+    )
+
+    def __init__(self, name: str, parent: Optional[Span], attributes: Dict[str, Any]) -> None:
+        self.name = name
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attributes = attributes
+        self.status = OK
+        self.start_time = time()
+        self.duration: Optional[float] = None
+        self._started = perf_counter()
+        self._trace = parent._trace if parent is not None else _Trace()
+
+    @property
+    def trace_id(self) -> str:
+        return self._trace.trace_id
+
+    @property
+    def trace_spans(self) -> List[Span]:
+        """Spans of this span's trace that have finished so far."""
+        return self._trace.spans
+
+    @property
+    def duration_ms(self) -> float:
+        elapsed = self.duration if self.duration is not None else perf_counter() - self._started
+        return round(elapsed * 1000, 3)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def finish(self) -> None:
+        if self.duration is None:
+            self.duration = perf_counter() - self._started
+            self._trace.spans.append(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_time": self.start_time,
+            "duration_ms": self.duration_ms,
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("council_current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+class SpanExporter(ABC):
+    """Receives every span of a trace once its root span finishes."""
+
+    @abstractmethod
+    def export(self, spans: Sequence[Span]) -> None:
+        """Hand off finished spans; must not block the event loop for long."""
+
+    async def aclose(self) -> None:
+        """Flush any pending exports."""
+
+
+class JsonLinesExporter(SpanExporter):
+    """Appends one JSON object per span to a local file."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def export(self, spans: Sequence[Span]) -> None:
+        lines = "".join(json.dumps(span.to_dict()) + "\n" for span in spans)
+        with open(self.path, "a", encoding="utf-8") as handle:
+            handle.write(lines)
+
+
+class HttpCollectorExporter(SpanExporter):
+    """POSTs each finished trace as ``{"spans": [...]}`` to a collector URL.
+
+    Delivery is best effort and runs in the background so that exporting
+    never delays a council response.
+    """
+
+    def __init__(self, url: str, timeout: float = 5.0) -> None:
+        self.url = url
+        self.timeout = timeout
+        self._pending: Set[asyncio.Task[None]] = set()
+
+    def export(self, spans: Sequence[Span]) -> None:
+        payload = {"spans": [span.to_dict() for span in spans]}
+        task = asyncio.ensure_future(self._post(payload))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _post(self, payload: Dict[str, Any]) -> None:
+        try:
+            async with httpx.AsyncClient(timeout=self.timeout) as client:
+                await client.post(self.url, json=payload)
+        except httpx.HTTPError:
+            pass
+
+    async def aclose(self) -> None:
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+
+class Tracer:
+    def __init__(self, exporter: Optional[SpanExporter] = None) -> None:
+        self.exporter = exporter
+
+    @contextmanager
+    def span(self, name: str, *, activate: bool = True, **attributes: Any) -> Iterator[Span]:
+        """Open a child of the current span, or a new root span.
+
+        With ``activate`` the span becomes current for code (and tasks
+        spawned) inside the block. Spans held open across ``yield`` in an
+        async generator that the caller also traces should pass
+        ``activate=False`` so they do not leak into the caller's context.
+        """
+        parent = _current_span.get()
+        span = Span(name, parent, attributes)
+        token = _current_span.set(span) if activate else None
+        try:
+            yield span
+        except asyncio.CancelledError:
+            span.status = CANCELLED
+            raise
+        except BaseException as exc:
+            span.status = ERROR
+            span.set_attribute("error", str(exc) or exc.__class__.__name__)
+            raise
+        finally:
+            if token is not None:
+                try:
+                    _current_span.reset(token)
+                except ValueError:
+                    # Closed from another context, e.g. an abandoned generator.
+                    pass
+            span.finish()
+            if parent is None and self.exporter is not None:
+                self.exporter.export(span.trace_spans)
+
+    async def aclose(self) -> None:
+        if self.exporter is not None:
+            await self.exporter.aclose()
+
+
+_tracer: Optional[Tracer] = None
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer, exporting as configured in settings."""
+    global _tracer
+    if _tracer is None:
+        exporter: Optional[SpanExporter] = None
+        if settings.trace_collector_url:
+            exporter = HttpCollectorExporter(settings.trace_collector_url)
+        elif settings.trace_export_path:
+            exporter = JsonLinesExporter(settings.trace_export_path)
+        _tracer = Tracer(exporter)
+    return _tracer
+
+
+async def close_tracer() -> None:
+    """Flush pending exports and drop the process-wide tracer."""
+    global _tracer
+    if _tracer is not None:
+        await _tracer.aclose()
+        _tracer = None
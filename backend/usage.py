@@ -0,0 +1,175 @@
+"""ABOUTME: Compact token usage records parsed from upstream responses.
+ABOUTME: Prices calls, aggregates them by stage and member, and keeps a rolling publisher ledger."""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from time import monotonic
+from typing import Any, Deque, Dict, Iterable, Mapping, Optional, Tuple
+
+# Token prices are quoted in USD per million tokens.
+_PER_TOKEN = 1e-6
+
+
+@dataclass(frozen=True, slots=True)
+class Usage:
+    """Tokens one call consumed.
+
+    ``input_tokens`` counts every prompt token, including the
+    ``cached_input_tokens`` the publisher served from its prompt cache.
+    ``cost_usd`` is ``None`` when the model has no configured price.
+    """
+
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_input_tokens: int = 0
+    cost_usd: Optional[float] = None
+
+    def __add__(self, other: Usage) -> Usage:
+        if self.cost_usd is None and other.cost_usd is None:
+            cost = None
+        else:
+            cost = (self.cost_usd or 0.0) + (other.cost_usd or 0.0)
+        return Usage(
+            input_tokens=self.input_tokens + other.input_tokens,
+            output_tokens=self.output_tokens + other.output_tokens,
+            cached_input_tokens=self.cached_input_tokens + other.cached_input_tokens,
+            cost_usd=cost,
+        )
+
+
+def _count(fields: Any, key: str) -> int:
+    value = fields.get(key) if isinstance(fields, dict) else None
+    return value if isinstance(value, int) else 0
+
+
+def parse_usage(api_format: str, usage: Any) -> Optional[Usage]:
+    """Usage from an upstream ``usage`` object, or ``None`` if none was reported.
+
+    Anthropic reports cache reads and writes separately from
+    ``input_tokens``; they are folded back in so both formats count prompt
+    tokens the same way.
+    """
+    if not isinstance(usage, dict) or not usage:
+        return None
+    if api_format == "anthropic":
+        cached = _count(usage, "cache_read_input_tokens")
+        return Usage(
+            input_tokens=(
+                _count(usage, "input_tokens")
+                + cached
+                + _count(usage, "cache_creation_input_tokens")
+            ),
+            output_tokens=_count(usage, "output_tokens"),
+            cached_input_tokens=cached,
+        )
+    return Usage(
+        input_tokens=_count(usage, "prompt_tokens"),
+        output_tokens=_count(usage, "completion_tokens"),
+        cached_input_tokens=_count(usage.get("prompt_tokens_details"), "cached_tokens"),
+    )
+
+
+def priced(usage: Usage, prices: Optional[Mapping[str, float]]) -> Usage:
+    """``usage`` with its cost under ``prices`` (USD per million tokens).
+
+    ``prices`` has ``input`` and ``output`` keys and an optional
+    ``cached_input`` key, which defaults to the input price.
+    """
+    if not prices:
+        return usage
+    input_price = prices.get("input", 0.0)
+    cached_price = prices.get("cached_input", input_price)
+    cost = _PER_TOKEN * (
+        (usage.input_tokens - usage.cached_input_tokens) * input_price
+        + usage.cached_input_tokens * cached_price
+        + usage.output_tokens * prices.get("output", 0.0)
+    )
+    return Usage(
+        input_tokens=usage.input_tokens,
+        output_tokens=usage.output_tokens,
+        cached_input_tokens=usage.cached_input_tokens,
+        cost_usd=cost,
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class UsageTotal:
+    """Usage summed over ``calls`` calls."""
+
+    calls: int = 0
+    usage: Usage = Usage()
+
+    def add(self, usage: Usage) -> UsageTotal:
+        return UsageTotal(self.calls + 1, self.usage + usage)
+
+
+def summarize(
+    records: Iterable[Tuple[str, str, Usage]],
+) -> Tuple[UsageTotal, Dict[str, UsageTotal], Dict[str, UsageTotal]]:
+    """Overall, per-stage and per-member totals of ``(stage, member, usage)`` records."""
+    total = UsageTotal()
+    stages: Dict[str, UsageTotal] = {}
+    members: Dict[str, UsageTotal] = {}
+    for stage, member, usage in records:
+        total = total.add(usage)
+        stages[stage] = stages.get(stage, UsageTotal()).add(usage)
+        members[member] = members.get(member, UsageTotal()).add(usage)
+    return total, stages, members
+
+
+@dataclass(frozen=True, slots=True)
+class LedgerWindow:
+    """One publisher's usage over the last ``window_seconds``."""
+
+    total: UsageTotal
+    window_seconds: float
+
+    @property
+    def tokens_per_second(self) -> float:
+        usage = self.total.usage
+        return (usage.input_tokens + usage.output_tokens) / self.window_seconds
+
+    @property
+    def output_tokens_per_second(self) -> float:
+        return self.total.usage.output_tokens / self.window_seconds
+
+
+class UsageLedger:
+    """Rolling per-publisher record of tokens and dollars spent.
+
+    Calls older than ``window_seconds`` drop out, so throughput and spend
+    reflect current load rather than the whole process lifetime.
+    """
+
+    def __init__(self, window_seconds: float) -> None:
+        self.window_seconds = max(window_seconds, 1e-3)
+        self._calls: Dict[str, Deque[Tuple[float, Usage]]] = {}
+
+    def record(self, publisher_id: str, usage: Usage, now: Optional[float] = None) -> None:
+        calls = self._calls.get(publisher_id)
+        if calls is None:
+            calls = self._calls[publisher_id] = deque()
+        now = monotonic() if now is None else now
+        self._expire(calls, now)
+        calls.append((now, usage))
+
+    def _expire(self, calls: Deque[Tuple[float, Usage]], now: float) -> None:
+        horizon = now - self.window_seconds
+        while calls and calls[0][0] <= horizon:
+            calls.popleft()
+
+    def snapshot(self, now: Optional[float] = None) -> Dict[str, LedgerWindow]:
+        """Usage per publisher within the window; idle publishers are omitted."""
+        now = monotonic() if now is None else now
+        windows: Dict[str, LedgerWindow] = {}
+        for publisher_id, calls in self._calls.items():
+            self._expire(calls, now)
+            if not calls:
+                continue
+            total = UsageTotal()
+            for _, usage in calls:
+                total = total.add(usage)
+            windows[publisher_id] = LedgerWindow(total, self.window_seconds)
+        return windows
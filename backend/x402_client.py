@@ -1,27 +1,71 @@
 """ABOUTME: Async client for querying LLM publishers via x402.
-ABOUTME: Handles retries, payment errors, and parallel fan-out."""
+ABOUTME: Handles retries, circuit breaking, hedging, payment errors, and fan-out."""
 
 from __future__ import annotations
 
 import asyncio
-from dataclasses import dataclass
-from typing import Optional
+import json
+from contextlib import AsyncExitStack, nullcontext
+from dataclasses import dataclass, replace
+from time import perf_counter
+from typing import AsyncIterator, Callable, Collection, Optional
 
 import httpx
 
+from backend.cassette import RECORD, CassetteTransport
 from backend.config import CouncilMember, settings
+from backend.deadline import Deadline
+from backend.metrics import DIRECT_STAGE, GatewaySeries, gateway_series
+from backend.resilience import BreakerRegistry, PublisherLimiter, RetryBudget, backoff_delay
+from backend.stats import StatsRegistry
+from backend.tracing import ERROR, Span, get_tracer
+from backend.usage import Usage, UsageLedger, parse_usage, priced
+
+# 4xx responses are the caller's problem and are not retried, except these.
+RETRYABLE_CLIENT_STATUSES = frozenset({408, 429})
 
 
 @dataclass
 class LLMResponse:
-    """Normalized response payload from a council member."""
+    """Normalized response payload from a council member.
+
+    ``usage`` holds the tokens the call consumed when the publisher reported
+    them; the upstream body itself is not kept. ``answered_by`` names the
+    backup member when a hedge sent to it produced the answer.
+    """
 
     model_name: str
     content: str
     success: bool
     error: Optional[str] = None
-    raw_response: Optional[dict] = None
+    usage: Optional[Usage] = None
     rankings: Optional[list[str]] = None
+    hedged: bool = False
+    answered_by: Optional[str] = None
+    cached: bool = False
+
+
+class SplitPrompt(str):
+    """Prompt text made of a ``prefix`` shared across calls and a per-call suffix.
+
+    It is an ordinary string equal to ``prefix + suffix``, so anything that
+    treats prompts as text keeps working. When ``cacheable`` is set,
+    :meth:`X402Client._build_payload` marks the prefix cacheable upstream;
+    callers set it only when the same model will see the prefix again.
+    """
+
+    prefix: str
+    cacheable: bool
+
+    def __new__(cls, prefix: str, suffix: str, cacheable: bool = False) -> "SplitPrompt":
+        prompt = super().__new__(cls, prefix + suffix)
+        prompt.prefix = prefix
+        prompt.cacheable = cacheable
+        return prompt
+
+    @property
+    def suffix(self) -> str:
+        return self[len(self.prefix) :]
 
 
 class X402ClientError(Exception):
@@ -32,15 +76,51 @@ class PaymentRequiredError(X402ClientError):
     """Raised when upstream gateway indicates insufficient funds."""
 
 
+class DeadlineTimeout(X402ClientError, TimeoutError):
+    """Raised when a call runs out of the caller's deadline, not the publisher's timeout.
+
+    The caller chose the budget, so these are kept out of the circuit
+    breaker and latency stats that every other caller shares.
+    """
+
+
+class SlotWaitTimeout(DeadlineTimeout):
+    """Raised when the deadline passes while queued for a publisher slot."""
+
+
 class X402Client:
-    """Async helper that communicates with Seren's x402 gateway."""
+    """Async helper that communicates with Seren's x402 gateway.
+
+    The client holds no per-caller state, so a single instance (and its
+    connection pool) can be shared by every request in the process. The
+    paying wallet is supplied on each call instead.
+    """
 
-    def __init__(self, caller_wallet: str) -> None:
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None) -> None:
         self.gateway_url = settings.x402_gateway_url
-        self.caller_wallet = caller_wallet
         self.timeout = settings.request_timeout_seconds
         self.retry_attempts = settings.retry_attempts
-        self._client: Optional[httpx.AsyncClient] = None
+        self.min_attempt_seconds = settings.min_attempt_seconds
+        self.breakers = BreakerRegistry(
+            settings.breaker_failure_threshold,
+            settings.breaker_reset_seconds,
+        )
+        self.retry_budget = RetryBudget(
+            settings.retry_budget_ratio,
+            settings.retry_budget_min_tokens,
+            settings.retry_budget_max_tokens,
+        )
+        self.stats = StatsRegistry(settings.stats_window, settings.stats_ewma_alpha)
+        self.ledger = UsageLedger(settings.usage_ledger_window_seconds)
+        self.tracer = get_tracer()
+        # Same token bucket as retries: each primary request earns
+        # hedge_max_rate tokens and each hedge spends one.
+        self.hedge_budget = RetryBudget(
+            settings.hedge_max_rate,
+            settings.hedge_budget_min_tokens,
+            settings.hedge_budget_max_tokens,
+        )
+        self._client: Optional[httpx.AsyncClient] = http_client
 
     def _get_headers(self) -> dict[str, str]:
         return {
@@ -51,9 +131,36 @@ class X402Client:
     def _get_proxy_url(self) -> str:
         return f"{self.gateway_url}/api/proxy"
 
+    def _create_http_client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=settings.pool_max_connections,
+            max_keepalive_connections=settings.pool_max_keepalive_connections,
+            keepalive_expiry=settings.pool_keepalive_expiry_seconds,
+        )
+        if settings.cassette_mode == "off":
+            return httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=limits,
+                http2=settings.http2_enabled,
+            )
+        if not settings.cassette_path:
+            raise X402ClientError("CASSETTE_PATH is required when CASSETTE_MODE is set")
+        inner = (
+            httpx.AsyncHTTPTransport(limits=limits, http2=settings.http2_enabled)
+            if settings.cassette_mode == RECORD
+            else None
+        )
+        transport = CassetteTransport(
+            settings.cassette_path,
+            settings.cassette_mode,
+            inner=inner,
+            replay_latency=settings.cassette_replay_latency,
+        )
+        return httpx.AsyncClient(timeout=self.timeout, transport=transport)
+
     async def _get_client(self) -> httpx.AsyncClient:
         if self._client is None:
-            self._client = httpx.AsyncClient(timeout=self.timeout)
+            self._client = self._create_http_client()
         return self._client
 
     async def aclose(self) -> None:
@@ -66,13 +173,22 @@ class X402Client:
         member: CouncilMember,
         prompt: str,
         system_prompt: Optional[str] = None,
+        stage: str = DIRECT_STAGE,
+        response_schema: Optional[dict] = None,
     ) -> dict:
+        """Upstream request body, with the stage's generation budget.
+
+        ``response_schema`` asks OpenAI-format members that support
+        structured output for JSON matching the schema; other members rely
+        on the prompt alone.
+        """
+        max_tokens = settings.max_tokens_for(member.name, stage, reasoning=member.reasoning)
         if member.api_format == "anthropic":
-            messages: list[dict[str, str]] = [{"role": "user", "content": prompt}]
+            messages: list[dict] = [{"role": "user", "content": self._anthropic_content(prompt)}]
             payload: dict = {
                 "model": member.model,
                 "messages": messages,
-                "max_tokens": 4096,
+                "max_tokens": max_tokens,
             }
             if system_prompt:
                 payload["system"] = system_prompt
@@ -81,8 +197,28 @@ class X402Client:
             messages = []
             if system_prompt:
                 messages.append({"role": "system", "content": system_prompt})
-            messages.append({"role": "user", "content": prompt})
-            return {"model": member.model, "messages": messages}
+            # OpenAI-format publishers cache prompt prefixes automatically, so
+            # the plain string (shared prefix first) is already cache-friendly.
+            messages.append({"role": "user", "content": str(prompt)})
+            payload = {
+                "model": member.model,
+                "messages": messages,
+                member.max_tokens_param: max_tokens,
+            }
+            if response_schema is not None and member.structured_output:
+                payload["response_format"] = {"type": "json_schema", "json_schema": response_schema}
+            return payload
+
+    def _anthropic_content(self, prompt: str) -> str | list[dict]:
+        """User content, with a cache breakpoint after a cacheable prompt prefix."""
+        if not settings.prompt_caching_enabled or not isinstance(prompt, SplitPrompt):
+            return str(prompt)
+        if not prompt.cacheable or not prompt.prefix or not prompt.suffix:
+            return str(prompt)
+        return [
+            {"type": "text", "text": prompt.prefix, "cache_control": {"type": "ephemeral"}},
+            {"type": "text", "text": prompt.suffix},
+        ]
 
     def _parse_response(self, member: CouncilMember, body: dict) -> str:
         if member.api_format == "anthropic":
@@ -90,17 +226,145 @@ class X402Client:
         else:
             return body["choices"][0]["message"]["content"]
 
+    def _parse_usage(self, member: CouncilMember, usage: object) -> Optional[Usage]:
+        """Priced usage from an upstream ``usage`` object, if one was reported."""
+        parsed = parse_usage(member.api_format, usage)
+        if parsed is None:
+            return None
+        return priced(parsed, settings.token_prices_usd.get(member.model))
+
+    def _record_usage(
+        self,
+        member: CouncilMember,
+        usage: Usage,
+        series: GatewaySeries,
+        span: Optional[Span] = None,
+    ) -> None:
+        series.input_tokens.inc(usage.input_tokens)
+        series.output_tokens.inc(usage.output_tokens)
+        series.cached_input_tokens.inc(usage.cached_input_tokens)
+        if usage.cost_usd is not None:
+            series.cost_usd.inc(usage.cost_usd)
+        self.ledger.record(member.publisher_id, usage)
+        if span is not None:
+            span.set_attribute("input_tokens", usage.input_tokens)
+            span.set_attribute("output_tokens", usage.output_tokens)
+            span.set_attribute("cached_input_tokens", usage.cached_input_tokens)
+
+    async def _post(
+        self,
+        member: CouncilMember,
+        url: str,
+        gateway_request: dict,
+        deadline: Optional[Deadline],
+        limiter: Optional[PublisherLimiter],
+        series: GatewaySeries,
+    ) -> tuple[httpx.Response, float]:
+        """POST one attempt, holding a publisher slot if a limiter is given.
+
+        The attempt timeout starts once the slot is held, so queueing behind
+        other calls to the publisher is bounded only by ``deadline``; running
+        out of it while queued raises :class:`SlotWaitTimeout`. An attempt
+        whose timeout the deadline cut short and that then times out raises
+        :class:`DeadlineTimeout`. Returns the response and its latency,
+        excluding time spent waiting for a slot.
+        """
+        client = await self._get_client()
+        async with AsyncExitStack() as held:
+            if limiter is not None:
+                try:
+                    async with asyncio.timeout(deadline.remaining() if deadline else None):
+                        await held.enter_async_context(limiter.slot(member.publisher_id))
+                except TimeoutError as exc:
+                    raise SlotWaitTimeout(
+                        f"Deadline exceeded waiting for a {member.name} slot"
+                    ) from exc
+            timeout = self._attempt_timeout(deadline)
+            if timeout is None:
+                raise SlotWaitTimeout(f"Deadline exceeded waiting for a {member.name} slot")
+            series.requests.inc()
+            series.in_flight.inc()
+            started = perf_counter()
+            try:
+                response = await asyncio.wait_for(
+                    client.post(
+                        url,
+                        headers=self._get_headers(),
+                        json=gateway_request,
+                        timeout=timeout,
+                    ),
+                    timeout,
+                )
+            except (TimeoutError, httpx.TimeoutException) as exc:
+                if timeout < self.timeout:
+                    raise DeadlineTimeout(
+                        f"Deadline exceeded waiting for {member.name}"
+                    ) from exc
+                raise
+            finally:
+                series.in_flight.dec()
+            elapsed = perf_counter() - started
+            series.latency.observe(elapsed)
+            series.request_bytes.inc(len(response.request.content))
+            series.response_bytes.inc(response.num_bytes_downloaded)
+            return response, elapsed
+
+    def _attempt_timeout(self, deadline: Optional[Deadline]) -> Optional[float]:
+        """Timeout for the next attempt, or ``None`` if the budget is spent."""
+        if deadline is None:
+            return float(self.timeout)
+        remaining = deadline.remaining()
+        if remaining <= 0:
+            return None
+        return min(float(self.timeout), remaining)
+
+    def _stream_usage(self, member: CouncilMember, event: dict) -> Optional[dict]:
+        """Usage fields carried by one upstream server-sent event, if any.
+
+        Anthropic sends prompt usage in ``message_start`` and the running
+        output count in ``message_delta``; OpenAI sends one final ``usage``.
+        """
+        if member.api_format == "anthropic":
+            if event.get("type") == "message_start":
+                return (event.get("message") or {}).get("usage")
+            if event.get("type") == "message_delta":
+                return event.get("usage")
+            return None
+        return event.get("usage")
+
+    def _parse_stream_event(self, member: CouncilMember, event: dict) -> str:
+        """Extract the text delta from one upstream server-sent event."""
+        if member.api_format == "anthropic":
+            if event.get("type") != "content_block_delta":
+                return ""
+            return event.get("delta", {}).get("text") or ""
+        else:
+            choices = event.get("choices") or []
+            if not choices:
+                return ""
+            return choices[0].get("delta", {}).get("content") or ""
+
     def _build_gateway_request(
         self,
         member: CouncilMember,
         prompt: str,
         system_prompt: Optional[str] = None,
+        *,
+        caller_wallet: str,
+        stream: bool = False,
+        stage: str = DIRECT_STAGE,
+        response_schema: Optional[dict] = None,
     ) -> dict:
         """Build the x402 gateway proxy request envelope."""
-        llm_payload = self._build_payload(member, prompt, system_prompt)
+        llm_payload = self._build_payload(member, prompt, system_prompt, stage, response_schema)
+        if stream:
+            llm_payload["stream"] = True
+            if member.api_format != "anthropic":
+                # Anthropic streams always carry usage; OpenAI needs asking.
+                llm_payload["stream_options"] = {"include_usage": True}
         return {
             "publisherId": member.publisher_id,
-            "agentWallet": self.caller_wallet,
+            "agentWallet": caller_wallet,
             "request": {
                 "method": "POST",
                 "path": member.endpoint_path,
@@ -113,36 +377,125 @@ class X402Client:
         member: CouncilMember,
         prompt: str,
         system_prompt: Optional[str] = None,
+        *,
+        caller_wallet: str,
+        deadline: Optional[Deadline] = None,
+        limiter: Optional[PublisherLimiter] = None,
+        stage: str = DIRECT_STAGE,
+        response_schema: Optional[dict] = None,
     ) -> LLMResponse:
-        gateway_request = self._build_gateway_request(member, prompt, system_prompt)
+        gateway_request = self._build_gateway_request(
+            member,
+            prompt,
+            system_prompt,
+            caller_wallet=caller_wallet,
+            stage=stage,
+            response_schema=response_schema,
+        )
         url = self._get_proxy_url()
+        series = gateway_series(member.publisher_id, stage)
+        breaker = self.breakers.get(member.publisher_id)
+        if not breaker.allow_request():
+            series.failures.inc()
+            self.stats.get(member.publisher_id, stage).record_failure()
+            return LLMResponse(
+                model_name=member.name,
+                content="",
+                success=False,
+                error=f"Circuit open for {member.name}",
+            )
+        self.retry_budget.deposit()
 
         last_error: Optional[str] = None
         for attempt in range(self.retry_attempts + 1):
+            if self._attempt_timeout(deadline) is None:
+                last_error = last_error or "Deadline exceeded before request could start"
+                break
+            if attempt:
+                series.retries.inc()
             try:
-                client = await self._get_client()
-                response = await client.post(url, headers=self._get_headers(), json=gateway_request)
+                with self.tracer.span(
+                    "gateway.attempt",
+                    member=member.name,
+                    publisher=member.publisher_id,
+                    stage=stage,
+                    attempt=attempt,
+                ) as span:
+                    response, elapsed = await self._post(
+                        member, url, gateway_request, deadline, limiter, series
+                    )
+                    span.set_attribute("status_code", response.status_code)
+                    span.set_attribute("request_bytes", len(response.request.content))
+                    span.set_attribute("response_bytes", response.num_bytes_downloaded)
+                    if response.status_code >= 400:
+                        span.status = ERROR
+                    else:
+                        body = response.json()
+                        usage = self._parse_usage(member, body.get("usage"))
+                        if usage is not None:
+                            self._record_usage(member, usage, series, span)
 
                 if response.status_code == 402:
+                    series.payment_required.inc()
                     raise PaymentRequiredError(f"Insufficient balance for {member.name}")
+                if (
+                    400 <= response.status_code < 500
+                    and response.status_code not in RETRYABLE_CLIENT_STATUSES
+                ):
+                    # The publisher answered; the request itself is at fault.
+                    breaker.record_success()
+                    series.failures.inc()
+                    return LLMResponse(
+                        model_name=member.name,
+                        content="",
+                        success=False,
+                        error=f"Upstream rejected request with status {response.status_code}",
+                    )
 
                 response.raise_for_status()
-                body = response.json()
                 content = self._parse_response(member, body)
+                breaker.record_success()
+                self.stats.get(member.publisher_id, stage).record_latency(elapsed)
                 return LLMResponse(
                     model_name=member.name,
                     content=content,
                     success=True,
-                    raw_response=body,
+                    usage=usage,
                 )
             except PaymentRequiredError:
                 raise
+            except DeadlineTimeout as exc:
+                # Running out of the caller's own budget, queued or in flight, says
+                # nothing about the publisher's health, so neither the breaker nor
+                # the latency stats hear of it.
+                series.failures.inc()
+                return LLMResponse(
+                    model_name=member.name,
+                    content="",
+                    success=False,
+                    error=str(exc),
+                )
             except Exception as exc:  # pragma: no cover - string conversion is trivial
-                last_error = str(exc)
+                last_error = str(exc) or exc.__class__.__name__
+                breaker.record_failure()
                 if attempt < self.retry_attempts:
-                    await asyncio.sleep(1 * (attempt + 1))
+                    if not breaker.allow_request() or not self.retry_budget.try_spend():
+                        break
+                    backoff = backoff_delay(
+                        attempt,
+                        settings.retry_backoff_base_seconds,
+                        settings.retry_backoff_max_seconds,
+                    )
+                    if deadline is not None and (
+                        deadline.remaining() < backoff + self.min_attempt_seconds
+                    ):
+                        # The retry could not finish inside the budget.
+                        break
+                    await asyncio.sleep(backoff)
                     continue
 
+        series.failures.inc()
+        self.stats.get(member.publisher_id, stage).record_failure()
         return LLMResponse(
             model_name=member.name,
             content="",
@@ -150,13 +503,230 @@ class X402Client:
             error=last_error,
         )
 
+    async def stream_model(
+        self,
+        member: CouncilMember,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        *,
+        caller_wallet: str,
+        deadline: Optional[Deadline] = None,
+        limiter: Optional[PublisherLimiter] = None,
+        stage: str = DIRECT_STAGE,
+        on_usage: Optional[Callable[[Usage], None]] = None,
+    ) -> AsyncIterator[str]:
+        """Yield text chunks as the upstream model streams its answer.
+
+        Streams are not retried: once chunks have been forwarded to the
+        caller a replay would duplicate output. If the stream reports token
+        usage, ``on_usage`` receives it once the stream ends.
+        """
+        gateway_request = self._build_gateway_request(
+            member, prompt, system_prompt, caller_wallet=caller_wallet, stream=True, stage=stage
+        )
+        timeout = self._attempt_timeout(deadline)
+        if timeout is None:
+            raise TimeoutError("Deadline exceeded before stream could start")
+        series = gateway_series(member.publisher_id, stage)
+        breaker = self.breakers.get(member.publisher_id)
+        if not breaker.allow_request():
+            series.failures.inc()
+            raise X402ClientError(f"Circuit open for {member.name}")
+        slot = limiter.slot(member.publisher_id) if limiter is not None else nullcontext()
+        try:
+            async with slot:
+                with self.tracer.span(
+                    "gateway.stream",
+                    activate=False,
+                    member=member.name,
+                    publisher=member.publisher_id,
+                    stage=stage,
+                ) as span:
+                    async for chunk in self._stream_chunks(
+                        member, gateway_request, timeout, deadline, series, span, on_usage
+                    ):
+                        yield chunk
+        except PaymentRequiredError:
+            raise
+        except Exception:
+            if deadline is None or not deadline.expired:
+                breaker.record_failure()
+            series.failures.inc()
+            raise
+        breaker.record_success()
+
+    async def _stream_chunks(
+        self,
+        member: CouncilMember,
+        gateway_request: dict,
+        timeout: float,
+        deadline: Optional[Deadline],
+        series: GatewaySeries,
+        span: Optional[Span] = None,
+        on_usage: Optional[Callable[[Usage], None]] = None,
+    ) -> AsyncIterator[str]:
+        client = await self._get_client()
+        usage_fields: dict = {}
+        series.requests.inc()
+        series.in_flight.inc()
+        started = perf_counter()
+        try:
+            async with client.stream(
+                "POST",
+                self._get_proxy_url(),
+                headers=self._get_headers(),
+                json=gateway_request,
+                timeout=timeout,
+            ) as response:
+                series.request_bytes.inc(len(response.request.content))
+                if response.status_code == 402:
+                    series.payment_required.inc()
+                    raise PaymentRequiredError(f"Insufficient balance for {member.name}")
+                response.raise_for_status()
+
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[len("data:"):].strip()
+                    if data == "[DONE]":
+                        break
+                    if not data:
+                        continue
+                    try:
+                        event = json.loads(data)
+                    except json.JSONDecodeError:
+                        continue
+                    usage_fields.update(self._stream_usage(member, event) or {})
+                    chunk = self._parse_stream_event(member, event)
+                    if chunk:
+                        yield chunk
+                    if deadline is not None and deadline.expired:
+                        raise TimeoutError("Deadline exceeded while streaming")
+                series.response_bytes.inc(response.num_bytes_downloaded)
+        finally:
+            series.in_flight.dec()
+        series.latency.observe(perf_counter() - started)
+        usage = self._parse_usage(member, usage_fields)
+        if usage is not None:
+            self._record_usage(member, usage, series, span)
+            if on_usage is not None:
+                on_usage(usage)
+
+    def _hedge_target(
+        self,
+        member: CouncilMember,
+        exclude: Collection[str] = (),
+    ) -> CouncilMember:
+        """Member that receives ``member``'s hedge.
+
+        A backup is a roster member name or any model id, which is routed to
+        a publisher the way chairman models are. A full council seats every
+        roster member, so only a model id can back a member up there. The
+        backup is skipped when it, or its model, is already answering for a
+        member in ``exclude``, so a council never gets one model's opinion twice.
+        """
+        backup = settings.hedge_backup_members.get(member.name)
+        if not backup or backup in exclude:
+            return member
+        roster = settings.get_council_members()
+        for candidate in roster:
+            if candidate.name == backup:
+                return candidate
+        if any(seated.model == backup for seated in roster if seated.name in exclude):
+            return member
+        return replace(settings.get_chairman_config(backup), name=backup)
+
+    async def query_model_hedged(
+        self,
+        member: CouncilMember,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        *,
+        caller_wallet: str,
+        deadline: Optional[Deadline] = None,
+        limiter: Optional[PublisherLimiter] = None,
+        stage: str = DIRECT_STAGE,
+        hedge_exclude: Collection[str] = (),
+    ) -> LLMResponse:
+        """Query ``member``, sending a hedge if it is slower than usual.
+
+        Once the primary call outlives the publisher's recent
+        ``hedge_percentile`` latency, a duplicate goes to the same publisher
+        (or its configured backup, unless that is in ``hedge_exclude``) and
+        the first success wins. Hedges are drawn from a token bucket so they
+        stay under ``hedge_max_rate`` of requests. A backup's answer keeps
+        ``member``'s slot but names the backup in ``answered_by``.
+        Cancelling the caller cancels every call still in flight.
+        """
+        self.hedge_budget.deposit()
+        hedge_after = self.stats.get(member.publisher_id, stage).latency_percentile(
+            settings.hedge_percentile, settings.hedge_min_samples
+        )
+        kwargs = {
+            "caller_wallet": caller_wallet,
+            "deadline": deadline,
+            "limiter": limiter,
+            "stage": stage,
+        }
+        primary = asyncio.ensure_future(self.query_model(member, prompt, system_prompt, **kwargs))
+        tasks = {primary: member}
+        try:
+            if hedge_after is None:
+                return await primary
+
+            done, _ = await asyncio.wait({primary}, timeout=hedge_after)
+            if done or not self.hedge_budget.try_spend():
+                return await primary
+
+            target = self._hedge_target(member, hedge_exclude)
+            hedge = asyncio.ensure_future(
+                self.query_model(target, prompt, system_prompt, **kwargs)
+            )
+            tasks[hedge] = target
+            pending = {primary, hedge}
+            result: Optional[LLMResponse] = None
+            answered_by = member
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    candidate = task.result()
+                    if result is None or candidate.success:
+                        result, answered_by = candidate, tasks[task]
+                if result is not None and result.success:
+                    break
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+        result.model_name = member.name
+        result.hedged = True
+        if answered_by.name != member.name:
+            result.answered_by = answered_by.name
+        return result
+
     async def query_models_parallel(
         self,
         members: list[CouncilMember],
         prompt: str,
         system_prompt: Optional[str] = None,
+        *,
+        caller_wallet: str,
+        deadline: Optional[Deadline] = None,
+        limiter: Optional[PublisherLimiter] = None,
+        stage: str = DIRECT_STAGE,
     ) -> list[LLMResponse]:
-        tasks = [self.query_model(member, prompt, system_prompt) for member in members]
+        options: dict = {
+            "caller_wallet": caller_wallet,
+            "deadline": deadline,
+            "limiter": limiter,
+            "stage": stage,
+        }
+        query = self.query_model
+        if settings.hedging_enabled:
+            query = self.query_model_hedged
+            options["hedge_exclude"] = {member.name for member in members}
+        tasks = [query(member, prompt, system_prompt, **options) for member in members]
         results = await asyncio.gather(*tasks, return_exceptions=True)
 
         normalized: list[LLMResponse] = []
@@ -176,3 +746,36 @@ class X402Client:
                 normalized.append(result)
 
         return normalized
+
+
+_shared_client: Optional[X402Client] = None
+
+
+def get_shared_client() -> X402Client:
+    """Return the process-wide gateway client, creating it on first use.
+
+    Creation is lazy so warm serverless invocations that skip the ASGI
+    lifespan still reuse one pooled client.
+    """
+    global _shared_client
+    if _shared_client is None:
+        _shared_client = X402Client()
+    return _shared_client
+
+
+def use_shared_client(client: X402Client) -> None:
+    """Install ``client`` as the process-wide gateway client.
+
+    Used by benchmarks to route the app's councils through an in-process
+    transport such as the mock gateway.
+    """
+    global _shared_client
+    _shared_client = client
+
+
+async def close_shared_client() -> None:
+    """Close the process-wide gateway client and release its connections."""
+    global _shared_client
+    if _shared_client is not None:
+        await _shared_client.aclose()
+        _shared_client = None
@@ -1,6 +1,7 @@
 """ABOUTME: FastAPI route tests for council service.
 ABOUTME: Validates success and error responses."""
 
+import json
 import os
 from unittest.mock import AsyncMock, patch
 
@@ -15,6 +16,7 @@ os.environ.setdefault("GEMINI_PUBLISHER_ID", "gemini-id")
 os.environ.setdefault("PERPLEXITY_PUBLISHER_ID", "perplexity-id")
 
 from backend import models
+from backend.config import get_settings
 from backend.main import app
 from backend.x402_client import PaymentRequiredError
 
@@ -46,7 +48,7 @@ def test_query_endpoint_returns_response():
     client = TestClient(app)
     mock_response = _sample_response()
 
-    with patch("backend.main.CouncilService") as mock_cls:
+    with patch("backend.council.CouncilService") as mock_cls:
         mock_service = AsyncMock()
         mock_service.run_council.return_value = mock_response
         mock_cls.return_value = mock_service
@@ -65,7 +67,7 @@ def test_query_endpoint_returns_response():
 def test_query_endpoint_handles_payment_error():
     client = TestClient(app)
 
-    with patch("backend.main.CouncilService") as mock_cls:
+    with patch("backend.council.CouncilService") as mock_cls:
         mock_service = AsyncMock()
         mock_service.run_council.side_effect = PaymentRequiredError("Insufficient balance")
         mock_cls.return_value = mock_service
@@ -95,3 +97,206 @@ def test_health_endpoint():
 
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
+
+
+def test_lifespan_opens_and_closes_shared_client():
+    with patch("backend.x402_client.get_shared_client") as mock_get, patch(
+        "backend.x402_client.close_shared_client", new_callable=AsyncMock
+    ) as mock_close:
+        with TestClient(app) as client:
+            assert client.get("/health").status_code == 200
+            mock_get.assert_called_once_with()
+            mock_close.assert_not_awaited()
+
+    mock_close.assert_awaited_once_with()
+
+
+def _sse_events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_stream_endpoint_emits_sse_events():
+    client = TestClient(app)
+
+    async def _stream(query, chairman=None, deadline_seconds=None, **_):
+        yield "stage1", {"model": "claude", "content": "Opinion"}
+        yield "stage3", {"delta": "Fin"}
+        yield "complete", {"final_answer": "Fin"}
+
+    with patch("backend.council.CouncilService") as mock_cls:
+        mock_cls.return_value.stream_council = _stream
+
+        response = client.post(
+            "/v1/council/stream",
+            json={"query": "Help"},
+            headers={"X-AGENT-WALLET": "0xtest"},
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _sse_events(response.text)
+    assert [event for event, _ in events] == ["stage1", "stage3", "complete"]
+    assert events[-1][1]["final_answer"] == "Fin"
+    mock_cls.assert_called_once_with(caller_wallet="0xtest")
+
+
+def test_stream_endpoint_reports_payment_error_event():
+    client = TestClient(app)
+
+    async def _stream(query, chairman=None, deadline_seconds=None, **_):
+        yield "stage1", {"model": "claude", "content": "Opinion"}
+        raise PaymentRequiredError("Insufficient balance")
+
+    with patch("backend.council.CouncilService") as mock_cls:
+        mock_cls.return_value.stream_council = _stream
+
+        response = client.post(
+            "/v1/council/stream",
+            json={"query": "Help"},
+            headers={"X-AGENT-WALLET": "0xtest"},
+        )
+
+    events = _sse_events(response.text)
+    assert events[-1] == ("error", {"status": 402, "detail": "Insufficient balance"})
+
+
+def _sample_job(status: str = "queued") -> models.CouncilJob:
+    return models.CouncilJob(id="job-1", status=status, created_at=1.0, updated_at=1.0)
+
+
+def test_submit_job_returns_202_with_job_id():
+    client = TestClient(app)
+
+    with patch("backend.jobs.get_job_runner") as mock_get:
+        mock_get.return_value.submit = AsyncMock(return_value=_sample_job())
+
+        response = client.post(
+            "/v1/council/jobs",
+            json={"query": "Help", "webhook_url": "https://agent.example.com/hook"},
+            headers={"X-AGENT-WALLET": "0xtest"},
+        )
+
+    assert response.status_code == 202
+    assert response.json()["id"] == "job-1"
+    submitted = mock_get.return_value.submit.await_args
+    assert str(submitted.args[0].webhook_url) == "https://agent.example.com/hook"
+    assert submitted.kwargs == {"caller_wallet": "0xtest"}
+
+
+
+@pytest.mark.parametrize(
+    "webhook_url",
+    [
+        "ftp://agent.example.com/hook",
+        "not a url",
+        "http://localhost:8000/hook",
+        "http://127.0.0.1/hook",
+        "http://2130706433/hook",
+        "http://10.0.0.5/hook",
+        "http://169.254.169.254/latest/meta-data",
+        "http://[::1]/hook",
+    ],
+)
+def test_submit_job_rejects_unsafe_webhook_urls(webhook_url):
+    client = TestClient(app)
+
+    with patch("backend.jobs.get_job_runner") as mock_get:
+        response = client.post(
+            "/v1/council/jobs",
+            json={"query": "Help", "webhook_url": webhook_url},
+            headers={"X-AGENT-WALLET": "0xtest"},
+        )
+
+    assert response.status_code == 422
+    mock_get.return_value.submit.assert_not_called()
+
+def test_get_job_returns_status_or_404():
+    client = TestClient(app)
+
+    with patch("backend.jobs.get_job_runner") as mock_get:
+        mock_get.return_value.get = AsyncMock(side_effect=[_sample_job("running"), None])
+
+        found = client.get("/v1/council/jobs/job-1", headers={"X-AGENT-WALLET": "0xtest"})
+        missing = client.get("/v1/council/jobs/nope", headers={"X-AGENT-WALLET": "0xtest"})
+
+    assert found.status_code == 200
+    assert found.json()["status"] == "running"
+    assert missing.status_code == 404
+
+
+def test_batch_endpoint_streams_ndjson_results():
+    client = TestClient(app)
+    seen = {}
+
+    async def _run_batch(queries, caller_wallet):
+        seen["queries"] = [query.query for query in queries]
+        seen["wallet"] = caller_wallet
+        yield {"index": 1, "response": _sample_response().model_dump()}
+        yield {"index": 0, "error": {"status": 402, "detail": "Insufficient balance"}}
+
+    with patch("backend.batch.run_batch", _run_batch):
+        response = client.post(
+            "/v1/council/batch",
+            json={"queries": [{"query": "First"}, {"query": "Second"}]},
+            headers={"X-AGENT-WALLET": "0xtest"},
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["index"] for line in lines] == [1, 0]
+    assert lines[0]["response"]["final_answer"] == "Final"
+    assert seen == {"queries": ["First", "Second"], "wallet": "0xtest"}
+
+
+def test_batch_endpoint_rejects_oversized_batch():
+    client = TestClient(app)
+
+    with patch.object(get_settings(), "batch_max_queries", 1):
+        response = client.post(
+            "/v1/council/batch",
+            json={"queries": [{"query": "First"}, {"query": "Second"}]},
+            headers={"X-AGENT-WALLET": "0xtest"},
+        )
+
+    assert response.status_code == 400
+
+
+def test_metrics_endpoint_exposes_prometheus_text():
+    client = TestClient(app)
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE council_gateway_request_duration_seconds histogram" in response.text
+    assert "# TYPE council_in_flight gauge" in response.text
+
+
+def test_usage_endpoint_reports_rolling_publisher_ledger():
+    from types import SimpleNamespace
+
+    from backend.usage import Usage, UsageLedger
+
+    ledger = UsageLedger(window_seconds=60)
+    ledger.record("claude-id", Usage(input_tokens=1000, output_tokens=200, cost_usd=0.006))
+    ledger.record("claude-id", Usage(input_tokens=500, output_tokens=100, cost_usd=0.003))
+    client = TestClient(app)
+
+    with patch(
+        "backend.x402_client.get_shared_client",
+        return_value=SimpleNamespace(ledger=ledger),
+    ):
+        response = client.get("/v1/usage")
+
+    assert response.status_code == 200
+    claude = response.json()["claude-id"]
+    assert claude["calls"] == 2
+    assert claude["output_tokens"] == 300
+    assert claude["cost_usd"] == pytest.approx(0.009)
+    assert claude["window_seconds"] == 60
+    assert claude["tokens_per_second"] == pytest.approx(1800 / 60)
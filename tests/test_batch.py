@@ -0,0 +1,121 @@
+"""ABOUTME: Tests for batch council execution.
+ABOUTME: Covers shared per-publisher caps, completion order, and error results."""
+
+import asyncio
+import os
+
+import pytest
+
+os.environ.setdefault("X402_GATEWAY_URL", "https://x402.serendb.com")
+os.environ.setdefault("CLAUDE_PUBLISHER_ID", "claude-id")
+os.environ.setdefault("OPENAI_PUBLISHER_ID", "openai-id")
+os.environ.setdefault("MOONSHOT_PUBLISHER_ID", "moonshot-id")
+os.environ.setdefault("GEMINI_PUBLISHER_ID", "gemini-id")
+os.environ.setdefault("PERPLEXITY_PUBLISHER_ID", "perplexity-id")
+
+from backend import models
+from backend.batch import run_batch
+from backend.x402_client import PaymentRequiredError
+
+PUBLISHERS = ["claude-id", "openai-id", "moonshot-id"]
+
+
+def _response(query: str) -> models.CouncilResponse:
+    return models.CouncilResponse(
+        final_answer=f"Answer to {query}",
+        stage1_responses={},
+        stage2_critiques={},
+        metadata=models.CouncilMetadata(
+            models_succeeded=[],
+            models_failed=[],
+            chairman="claude-opus-4.5",
+            cost_usd=0.0,
+            duration_ms=1,
+        ),
+    )
+
+
+class FakeService:
+    """Simulates a council: one call per publisher, routed through the shared limiter."""
+
+    delays: dict[str, float] = {}
+
+    def __init__(self, caller_wallet: str, limiter=None):
+        self.caller_wallet = caller_wallet
+        self.limiter = limiter
+
+    async def _call(self, publisher_id: str, delay: float) -> None:
+        async with self.limiter.slot(publisher_id):
+            await asyncio.sleep(delay)
+
+    async def run_council(self, query, chairman=None, deadline_seconds=None, **_):
+        if query == "unpaid":
+            raise PaymentRequiredError("Payment required")
+        if query == "empty":
+            raise RuntimeError("Insufficient council responses")
+        delay = FakeService.delays.get(query, 0.01)
+        await asyncio.gather(*(self._call(publisher, delay) for publisher in PUBLISHERS))
+        return _response(query)
+
+
+def _queries(*texts: str) -> list[models.CouncilQuery]:
+    return [models.CouncilQuery(query=text) for text in texts]
+
+
+@pytest.mark.asyncio()
+async def test_batch_respects_publisher_cap_across_queries():
+    limiters = []
+
+    def factory(caller_wallet, limiter):
+        limiters.append(limiter)
+        return FakeService(caller_wallet, limiter)
+
+    results = [
+        result
+        async for result in run_batch(
+            _queries(*(f"q{i}" for i in range(12))),
+            caller_wallet="0xtest",
+            publisher_concurrency=2,
+            max_concurrent_councils=6,
+            service_factory=factory,
+        )
+    ]
+
+    assert len(results) == 12
+    assert {id(limiter) for limiter in limiters} == {id(limiters[0])}
+    assert limiters[0].peak_in_flight == {publisher: 2 for publisher in PUBLISHERS}
+
+
+@pytest.mark.asyncio()
+async def test_batch_yields_results_as_queries_finish():
+    FakeService.delays = {"slow": 0.2, "fast": 0.01}
+    try:
+        results = [
+            result
+            async for result in run_batch(
+                _queries("slow", "fast"),
+                caller_wallet="0xtest",
+                service_factory=FakeService,
+            )
+        ]
+    finally:
+        FakeService.delays = {}
+
+    assert [result["index"] for result in results] == [1, 0]
+    assert results[0]["response"]["final_answer"] == "Answer to fast"
+
+
+@pytest.mark.asyncio()
+async def test_batch_reports_failures_per_query():
+    results = {
+        result["index"]: result
+        async for result in run_batch(
+            _queries("ok", "unpaid", "empty"),
+            caller_wallet="0xtest",
+            service_factory=FakeService,
+        )
+    }
+
+    assert "response" in results[0]
+    assert results[1]["error"] == {"status": 402, "detail": "Payment required"}
+    assert results[2]["error"]["status"] == 400
@@ -0,0 +1,67 @@
+"""ABOUTME: Tests for the load-generation benchmark harness.
+ABOUTME: Runs a tiny benchmark in-process against the mock gateway."""
+
+import json
+import os
+
+import pytest
+
+os.environ.setdefault("X402_GATEWAY_URL", "https://x402.serendb.com")
+os.environ.setdefault("CLAUDE_PUBLISHER_ID", "claude-id")
+os.environ.setdefault("OPENAI_PUBLISHER_ID", "openai-id")
+os.environ.setdefault("MOONSHOT_PUBLISHER_ID", "moonshot-id")
+os.environ.setdefault("GEMINI_PUBLISHER_ID", "gemini-id")
+os.environ.setdefault("PERPLEXITY_PUBLISHER_ID", "perplexity-id")
+
+from backend.benchmark import main, percentile, run_benchmark
+from backend.mock_gateway import MockGatewayConfig, PublisherProfile
+
+FAST = MockGatewayConfig(
+    seed=3,
+    default=PublisherProfile(
+        latency_median_seconds=0.001,
+        latency_sigma=0.0,
+        response_words=20,
+        stream_chunk_delay_seconds=0,
+    ),
+)
+
+
+def test_percentile_uses_nearest_rank():
+    samples = [float(value) for value in range(1, 101)]
+
+    assert percentile(samples, 0.5) == 50.0
+    assert percentile(samples, 0.99) == 99.0
+    assert percentile([], 0.5) is None
+
+
+@pytest.mark.asyncio()
+async def test_run_benchmark_reports_throughput_and_stage_percentiles():
+    result = await run_benchmark(councils=6, concurrency=3, mock_config=FAST)
+
+    assert result["succeeded"] == 6
+    assert result["statuses"] == {"200": 6}
+    assert result["councils_per_second"] > 0
+    for name in ("total", "stage1", "stage2", "stage3"):
+        assert result["latency_ms"][name]["count"] == 6
+        assert result["latency_ms"][name]["p50"] <= result["latency_ms"][name]["p99"]
+    assert "p99" in result["event_loop_lag_ms"]
+
+
+def test_main_writes_json_result(tmp_path, capsys):
+    config_path = tmp_path / "mock.json"
+    config_path.write_text(FAST.model_dump_json())
+    output = tmp_path / "bench.json"
+
+    main(
+        [
+            "--councils", "2",
+            "--concurrency", "2",
+            "--mock-config", str(config_path),
+            "--output", str(output),
+        ]
+    )
+
+    result = json.loads(output.read_text())
+    assert result["succeeded"] == 2
+    assert "councils/sec" in capsys.readouterr().out
@@ -0,0 +1,87 @@
+"""ABOUTME: Tests for the tiered stage-1 opinion cache.
+ABOUTME: Covers LRU eviction, TTL expiry, counters, and the SQLite tier."""
+
+import sqlite3
+
+import pytest
+
+from backend.cache import OpinionCache, normalize_query
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_make_key_normalizes_query_but_not_model_or_prompt():
+    key = OpinionCache.make_key("gpt-5.2", "system", "What  is AGI?")
+
+    assert key == OpinionCache.make_key("gpt-5.2", "system", " what is agi? ")
+    assert key != OpinionCache.make_key("sonar", "system", "What is AGI?")
+    assert key != OpinionCache.make_key("gpt-5.2", "other", "What is AGI?")
+    assert normalize_query("  A\tB  ") == "a b"
+
+
+@pytest.mark.asyncio()
+async def test_memory_tier_hits_misses_and_lru_eviction():
+    cache = OpinionCache(max_entries=2, ttl_seconds=60)
+
+    assert await cache.get("a") is None
+    await cache.set("a", "A")
+    await cache.set("b", "B")
+    assert await cache.get("a") == "A"
+    await cache.set("c", "C")  # evicts "b", the least recently used
+
+    assert await cache.get("b") is None
+    assert await cache.get("c") == "C"
+    assert cache.stats() == {"hits": 2, "misses": 2, "disk_hits": 0, "memory_entries": 2}
+
+
+@pytest.mark.asyncio()
+async def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = OpinionCache(max_entries=10, ttl_seconds=5, clock=clock)
+    await cache.set("a", "A")
+
+    clock.now += 4
+    assert await cache.get("a") == "A"
+    clock.now += 2
+    assert await cache.get("a") is None
+
+
+@pytest.mark.asyncio()
+async def test_sqlite_tier_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "opinions.db")
+    writer = OpinionCache(max_entries=10, ttl_seconds=60, sqlite_path=path)
+    reader = OpinionCache(max_entries=10, ttl_seconds=60, sqlite_path=path)
+
+    await writer.set("a", "A")
+
+    assert await reader.get("a") == "A"
+    assert reader.disk_hits == 1
+    # Promoted into memory: the second read does not touch disk.
+    assert await reader.get("a") == "A"
+    assert reader.disk_hits == 1
+
+
+@pytest.mark.asyncio()
+async def test_sqlite_tier_is_size_bounded_and_honors_ttl(tmp_path):
+    path = str(tmp_path / "opinions.db")
+    clock = FakeClock()
+    cache = OpinionCache(
+        max_entries=1, ttl_seconds=5, sqlite_path=path, sqlite_max_entries=2, clock=clock
+    )
+    for key in ("a", "b", "c"):
+        clock.now += 1
+        await cache.set(key, key.upper())
+
+    with sqlite3.connect(path) as conn:
+        keys = {row[0] for row in conn.execute("SELECT key FROM opinions")}
+    assert keys == {"b", "c"}
+
+    fresh = OpinionCache(max_entries=1, ttl_seconds=5, sqlite_path=path, clock=clock)
+    clock.now += 10
+    assert await fresh.get("c") is None
@@ -0,0 +1,145 @@
+"""ABOUTME: Tests for gateway record/replay cassettes.
+ABOUTME: Records through a mocked upstream and replays without network access."""
+
+from importlib import reload
+from unittest.mock import patch
+import json
+import os
+
+import httpx
+import pytest
+from httpx import Response
+
+from backend.cassette import CassetteMissError, CassetteTransport, request_key
+
+
+def _envelope(wallet: str, prompt: str = "Hi") -> bytes:
+    return json.dumps(
+        {
+            "publisherId": "openai-id",
+            "agentWallet": wallet,
+            "request": {"method": "POST", "path": "/chat/completions", "body": {"prompt": prompt}},
+        }
+    ).encode()
+
+
+def test_request_key_ignores_wallet_and_field_order():
+    reordered = json.dumps(
+        {
+            "request": {"body": {"prompt": "Hi"}, "path": "/chat/completions", "method": "POST"},
+            "publisherId": "openai-id",
+        }
+    ).encode()
+
+    assert request_key(_envelope("0xa")) == request_key(_envelope("0xb")) == request_key(reordered)
+    assert request_key(_envelope("0xa", "Hello")) != request_key(_envelope("0xa"))
+
+
+@pytest.mark.asyncio()
+@pytest.mark.parametrize("filename", ["gateway.jsonl", "gateway.jsonl.gz"])
+async def test_record_appends_interactions_then_replays_them(tmp_path, respx_mock, filename):
+    path = str(tmp_path / filename)
+    respx_mock.post("https://x402.test/api/proxy").mock(
+        side_effect=[
+            Response(200, json={"answer": "first"}),
+            Response(503, text="busy"),
+        ]
+    )
+    async with httpx.AsyncClient(transport=CassetteTransport(path, "record")) as recorder:
+        first = await recorder.post("https://x402.test/api/proxy", content=_envelope("0xa"))
+        second = await recorder.post("https://x402.test/api/proxy", content=_envelope("0xa"))
+    assert first.json() == {"answer": "first"} and second.status_code == 503
+
+    respx_mock.reset()
+    transport = CassetteTransport(path, "replay", replay_latency="zero")
+    async with httpx.AsyncClient(transport=transport) as replayer:
+        replayed = [
+            await replayer.post("https://x402.test/api/proxy", content=_envelope("0xother"))
+            for _ in range(3)
+        ]
+
+    assert [response.status_code for response in replayed] == [200, 503, 200]
+    assert replayed[0].json() == {"answer": "first"}
+    assert not respx_mock.calls
+
+
+@pytest.mark.asyncio()
+@pytest.mark.parametrize("latency, expected", [("original", [0.25]), ("zero", [])])
+async def test_replay_honours_latency_mode(tmp_path, latency, expected):
+    path = tmp_path / "cassette.jsonl"
+    entry = {
+        "key": request_key(_envelope("0xa")),
+        "request": None,
+        "status": 200,
+        "content_type": "application/json",
+        "body": '{"ok": true}',
+        "elapsed": 0.25,
+    }
+    path.write_text(json.dumps(entry) + "\n")
+    slept = []
+
+    async def fake_sleep(seconds):
+        slept.append(seconds)
+
+    transport = CassetteTransport(str(path), "replay", replay_latency=latency, sleep=fake_sleep)
+    async with httpx.AsyncClient(transport=transport) as client:
+        response = await client.post("https://x402.test/api/proxy", content=_envelope("0xb"))
+
+    assert response.json() == {"ok": True}
+    assert slept == expected
+
+
+@pytest.mark.asyncio()
+async def test_replay_miss_raises_transport_error(tmp_path):
+    path = tmp_path / "empty.jsonl"
+    path.write_text("")
+    transport = CassetteTransport(str(path), "replay")
+
+    async with httpx.AsyncClient(transport=transport) as client:
+        with pytest.raises(CassetteMissError):
+            await client.post("https://x402.test/api/proxy", content=_envelope("0xa"))
+
+
+@pytest.mark.asyncio()
+async def test_x402_client_replays_cassette_from_settings(tmp_path, respx_mock):
+    path = str(tmp_path / "council.jsonl")
+    env = {
+        "X402_GATEWAY_URL": "https://x402.serendb.com",
+        "CLAUDE_PUBLISHER_ID": "claude-id",
+        "OPENAI_PUBLISHER_ID": "openai-id",
+        "MOONSHOT_PUBLISHER_ID": "moonshot-id",
+        "GEMINI_PUBLISHER_ID": "gemini-id",
+        "PERPLEXITY_PUBLISHER_ID": "perplexity-id",
+        "CASSETTE_PATH": path,
+        "CASSETTE_REPLAY_LATENCY": "zero",
+    }
+
+    def load(mode):
+        with patch.dict(os.environ, {**env, "CASSETTE_MODE": mode}, clear=True):
+            import backend.config as config_module
+            reload(config_module)
+
+            import backend.x402_client as client_module
+            reload(client_module)
+
+            return config_module, client_module
+
+    config_module, client_module = load("record")
+    member = config_module.settings.get_council_members()[1]
+    respx_mock.post("https://x402.serendb.com/api/proxy").mock(
+        return_value=Response(200, json={"choices": [{"message": {"content": "recorded"}}]})
+    )
+    recorder = client_module.X402Client()
+    await recorder.query_model(member, "Hi", caller_wallet="0xrecorder")
+    await recorder.aclose()
+
+    respx_mock.reset()
+    _, client_module = load("replay")
+    replayer = client_module.X402Client()
+    result = await replayer.query_model(member, "Hi", caller_wallet="0xreplayer")
+    await replayer.aclose()
+
+    assert result.success and result.content == "recorded"
+    assert not respx_mock.calls
+    entry = json.loads(open(path).readline())
+    assert "agentWallet" not in entry["request"]
@@ -0,0 +1,69 @@
+"""ABOUTME: Cold-start budget for the Vercel serverless entrypoint.
+ABOUTME: Imports api/index.py in a fresh interpreter and checks time, memory, and laziness."""
+
+from pathlib import Path
+import json
+import os
+import subprocess
+import sys
+
+# Generous enough for a loaded CI runner; importing FastAPI dominates both.
+IMPORT_SECONDS_BUDGET = 2.0
+IMPORT_MEMORY_MB_BUDGET = 64.0
+
+DEFERRED_MODULES = (
+    "httpx",
+    "backend.council",
+    "backend.x402_client",
+    "backend.jobs",
+    "backend.batch",
+    "backend.tracing",
+)
+
+_PROBE = """
+import json, resource, sys, time
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+started = time.perf_counter()
+import api.index
+elapsed = time.perf_counter() - started
+grown = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before
+import backend.config
+print(json.dumps({
+    "seconds": elapsed,
+    "memory_mb": grown / (1024 * 1024 if sys.platform == "darwin" else 1024),
+    "loaded": [name for name in %r if name in sys.modules],
+    "settings_built": backend.config._settings is not None,
+}))
+""" % (DEFERRED_MODULES,)
+
+
+def _probe() -> dict:
+    root = Path(__file__).resolve().parent.parent
+    env = {
+        **os.environ,
+        "X402_GATEWAY_URL": "https://x402.serendb.com",
+        "CLAUDE_PUBLISHER_ID": "claude-id",
+        "OPENAI_PUBLISHER_ID": "openai-id",
+        "MOONSHOT_PUBLISHER_ID": "moonshot-id",
+        "GEMINI_PUBLISHER_ID": "gemini-id",
+        "PERPLEXITY_PUBLISHER_ID": "perplexity-id",
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=root,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=60,
+    )
+    return json.loads(result.stdout)
+
+
+def test_entrypoint_import_stays_lazy_and_within_budget():
+    probe = _probe()
+
+    assert probe["loaded"] == []
+    assert probe["settings_built"] is False
+    assert probe["seconds"] < IMPORT_SECONDS_BUDGET
+    assert probe["memory_mb"] < IMPORT_MEMORY_MB_BUDGET
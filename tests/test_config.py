@@ -25,6 +25,7 @@ def _load_config(env: dict) -> ModuleType:
         import backend.config as config_module
 
         reload(config_module)
+        config_module.get_settings()
         return config_module
 
 
@@ -49,3 +50,107 @@ def test_get_chairman_respects_override(base_env):
     chairman = config_module.settings.get_chairman_config("gpt-5")
     assert chairman.model == "gpt-5"
     assert chairman.name == "chairman"
+
+
+def test_generation_budgets_by_stage_with_member_overrides(base_env):
+    env = {
+        **base_env,
+        "STAGE2_MAX_TOKENS": "512",
+        "MEMBER_MAX_TOKENS": '{"gpt5": {"stage2": 3000}}',
+    }
+    config_module = _load_config(env)
+
+    settings = config_module.settings
+    assert settings.max_tokens_for("claude", "stage2") == 512
+    assert settings.max_tokens_for("gpt5", "stage2") == 3000
+    assert settings.max_tokens_for("gpt5", "stage1") == 4096
+    assert settings.max_tokens_for("chairman", "direct") == settings.default_max_tokens
+
+
+def test_reasoning_members_get_an_allowance_unless_overridden(base_env):
+    env = {
+        **base_env,
+        "REASONING_TOKEN_ALLOWANCE": "2000",
+        "MEMBER_MAX_TOKENS": '{"gpt5": {"stage3": 3000}}',
+    }
+    config_module = _load_config(env)
+
+    settings = config_module.settings
+    assert settings.max_tokens_for("gpt5", "stage2", reasoning=True) == 1024 + 2000
+    assert settings.max_tokens_for("gpt5", "stage3", reasoning=True) == 3000
+    assert settings.max_tokens_for("chairman", "stage3", reasoning=True) == 4096 + 2000
+
+
+def test_roster_is_built_once_and_shared(base_env):
+    config_module = _load_config(base_env)
+
+    settings = config_module.settings
+    assert settings.get_council_members() is settings.get_council_members()
+    assert settings.get_chairman_config() is settings.get_chairman_config()
+
+
+def test_roster_path_overrides_members(base_env, tmp_path):
+    roster_file = tmp_path / "roster.json"
+    roster_file.write_text(
+        '{"members": [{"name": "solo", "publisher": "openai", "model": "gpt-5.2"}],'
+        ' "chairmen": [{"prefix": "gpt", "publisher": "openai"}]}'
+    )
+    config_module = _load_config({**base_env, "ROSTER_PATH": str(roster_file)})
+
+    members = config_module.settings.get_council_members()
+
+    assert [(member.name, member.publisher_id) for member in members] == [("solo", "openai-id")]
+    assert config_module.settings.get_chairman_config("gpt-5").publisher_id == "openai-id"
+
+
+def test_fast_mode_selects_members_with_best_expected_latency(base_env):
+    from backend.stats import StatsRegistry
+
+    config_module = _load_config({**base_env, "FAST_MODE_MEMBERS": "2"})
+    stats = StatsRegistry(window=10)
+    stats.get("claude-id", "stage1").record_latency(30.0)
+    stats.get("openai-id", "stage1").record_latency(4.0)
+    stats.get("moonshot-id", "stage1").record_latency(5.0)
+    stats.get("gemini-id", "stage1").record_latency(1.0)
+    for _ in range(8):
+        stats.get("gemini-id", "stage1").record_failure()
+
+    fast = config_module.settings.select_council_members("fast", stats)
+
+    assert [member.name for member in fast] == ["gpt5", "kimi"]
+    assert config_module.settings.select_council_members("lite", stats) == (
+        config_module.settings.get_council_members()
+    )
+
+
+def test_fast_mode_replaces_a_member_that_keeps_failing(base_env):
+    from backend.resilience import BreakerRegistry
+    from backend.stats import StatsRegistry
+
+    config_module = _load_config({**base_env, "FAST_MODE_MEMBERS": "3"})
+    stats = StatsRegistry(window=10)
+    for publisher_id in ("claude-id", "openai-id", "moonshot-id"):
+        stats.get(publisher_id, "stage1").record_latency(2.0)
+    for _ in range(4):
+        stats.get("moonshot-id", "stage1").record_failure()
+
+    fast = config_module.settings.select_council_members("fast", stats)
+    assert [member.name for member in fast] == ["claude", "gpt5", "gemini"]
+
+    # An open breaker benches a member however good its history looks.
+    breakers = BreakerRegistry(failure_threshold=1, reset_timeout=30.0)
+    breakers.get("openai-id").record_failure()
+    fast = config_module.settings.select_council_members("fast", stats, breakers)
+    assert [member.name for member in fast] == ["claude", "gemini", "sonar"]
+
+
+def test_fast_mode_prefers_measured_members_then_roster_order(base_env):
+    from backend.stats import StatsRegistry
+
+    config_module = _load_config(base_env)
+    stats = StatsRegistry(window=10)
+    stats.get("perplexity-id", "stage1").record_latency(2.0)
+
+    fast = config_module.settings.select_council_members("fast", stats)
+
+    assert [member.name for member in fast] == ["claude", "gpt5", "sonar"]
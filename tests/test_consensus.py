@@ -0,0 +1,77 @@
+"""ABOUTME: Tests for stage-1 agreement scoring.
+ABOUTME: Covers TF-IDF cosine agreement, short-answer matching, and the medoid."""
+
+import pytest
+
+from backend.consensus import agreement
+
+
+def test_identical_answers_agree_fully():
+    text = "Retrieval quality, stale indexes, and prompt injection are the main risks."
+
+    result = agreement([text, text, text])
+
+    assert result.score == pytest.approx(1.0)
+
+
+def test_unrelated_answers_score_low():
+    result = agreement(
+        [
+            "Photosynthesis converts sunlight into chemical energy in plants.",
+            "The French revolution began in 1789 with the storming of the Bastille.",
+            "Rust guarantees memory safety through ownership and borrowing rules.",
+        ]
+    )
+
+    assert result.score < 0.2
+
+
+def test_short_answers_match_after_normalization():
+    result = agreement(["Paris.", "paris", "The Paris"])
+
+    assert result.score == pytest.approx(1.0)
+
+
+def test_non_latin_answers_are_compared_by_their_words():
+    assert agreement(["Столица — Париж.", "Нет, это Лион…", "東京です"]).score < 0.2
+    assert agreement(["Столица — Париж.", "столица: Париж"]).score == pytest.approx(1.0)
+
+
+def test_answers_without_words_never_match():
+    assert agreement(["…", "—", "?!"]).score == 0.0
+
+
+def test_contradictory_long_answers_do_not_agree():
+    reason = (
+        " the foreign key column, because joins on it otherwise scan the whole child"
+        " table and lock escalation gets worse under concurrent writes."
+    )
+
+    result = agreement(["You should index" + reason, "You should not index" + reason])
+
+    assert result.score < 0.8
+
+
+def test_shared_negations_still_agree():
+    result = agreement(
+        ["Don't use global locks; use row locks.", "Use row locks, no global locks."]
+    )
+
+    assert result.score >= 0.8
+
+
+def test_medoid_is_the_answer_closest_to_the_rest():
+    result = agreement(
+        [
+            "Use retries with exponential backoff and jitter.",
+            "Use retries with exponential backoff, jitter, and a retry budget.",
+            "Use retries with backoff and a retry budget.",
+            "Buy a faster server.",
+        ]
+    )
+
+    assert result.medoid == 1
+
+
+def test_single_answer_is_trivially_in_agreement():
+    assert agreement(["only one"]).score == 1.0
@@ -4,6 +4,7 @@ ABOUTME: Covers stage fan-out and degradation rules."""
 from importlib import reload
 from types import ModuleType
 from unittest.mock import patch
+import asyncio
 import json
 import os
 import pytest
@@ -20,6 +21,12 @@ def _load_council_modules(env: dict) -> tuple[ModuleType, ModuleType, ModuleType
         import backend.x402_client as client_module
         reload(client_module)
 
+        import backend.cache as cache_module
+        reload(cache_module)
+
+        import backend.similarity as similarity_module
+        reload(similarity_module)
+
         import backend.council as council_module
         reload(council_module)
 
@@ -30,8 +37,10 @@ class FakeClient:
     def __init__(self, llm_response_cls, failing_members: set[str] | None = None):
         self.llm_response_cls = llm_response_cls
         self.failing_members = failing_members or set()
+        self.wallets: list[str] = []
 
-    async def query_models_parallel(self, members, prompt, system_prompt=None):
+    async def query_models_parallel(self, members, prompt, system_prompt=None, *, caller_wallet, **_):
+        self.wallets.append(caller_wallet)
         responses = []
         for member in members:
             if member.name in self.failing_members:
@@ -53,7 +62,8 @@ class FakeClient:
                 )
         return responses
 
-    async def query_model(self, member, prompt, system_prompt=None):
+    async def query_model(self, member, prompt, system_prompt=None, *, caller_wallet, **_):
+        self.wallets.append(caller_wallet)
         if member.name in self.failing_members:
             return self.llm_response_cls(
                 model_name=member.name,
@@ -77,6 +87,11 @@ class FakeClient:
             success=True,
         )
 
+    async def stream_model(self, member, prompt, system_prompt=None, *, caller_wallet, **_):
+        self.wallets.append(caller_wallet)
+        for chunk in (member.name, " ", "finalizes"):
+            yield chunk
+
 
 @pytest.fixture()
 def env_values() -> dict:
@@ -139,3 +154,882 @@ async def test_run_council_fails_when_not_enough_responses(env_values):
 
     with pytest.raises(RuntimeError):
         await service.run_council("Need advice")
+
+
+@pytest.mark.asyncio()
+async def test_run_council_passes_caller_wallet_per_call(env_values):
+    _, _, client_module, council_module = _load_council_modules(env_values)
+    fake = FakeClient(client_module.LLMResponse)
+    service = council_module.CouncilService(caller_wallet="0xabc", client=fake)
+
+    await service.run_council("Who pays?")
+
+    # 1 stage-1 fan-out + 5 critiques + 1 chairman call
+    assert fake.wallets == ["0xabc"] * 7
+
+
+@pytest.mark.asyncio()
+async def test_run_council_records_stage_latencies(env_values):
+    from backend.metrics import COUNCIL_LATENCY, STAGE_LATENCY
+
+    _, _, client_module, council_module = _load_council_modules(env_values)
+    service = council_module.CouncilService(
+        caller_wallet="0xtest",
+        client=FakeClient(client_module.LLMResponse),
+    )
+    before = {stage: STAGE_LATENCY.labels(stage).count for stage in ("stage1", "stage2", "stage3")}
+    councils_before = COUNCIL_LATENCY.labels().count
+
+    await service.run_council("Time each stage")
+
+    for stage, count in before.items():
+        assert STAGE_LATENCY.labels(stage).count == count + 1
+    assert COUNCIL_LATENCY.labels().count == councils_before + 1
+
+
+@pytest.mark.asyncio()
+async def test_run_council_returns_timings_only_when_requested(env_values):
+    _, _, client_module, council_module = _load_council_modules(env_values)
+    service = council_module.CouncilService(
+        caller_wallet="0xtest",
+        client=FakeClient(client_module.LLMResponse),
+    )
+
+    plain = await service.run_council("Where does time go?")
+    timed = await service.run_council("Where does the time go?", include_timings=True)
+
+    assert plain.metadata.timings is None
+    assert set(timed.metadata.timings.stages) == {"stage1", "stage2", "stage3"}
+    assert timed.metadata.timings.trace_id
+
+
+@pytest.mark.asyncio()
+async def test_stream_council_emits_progressive_events(env_values):
+    _, models_module, client_module, council_module = _load_council_modules(env_values)
+    service = council_module.CouncilService(
+        caller_wallet="0xtest",
+        client=FakeClient(client_module.LLMResponse, failing_members={"sonar"}),
+    )
+
+    events = [item async for item in service.stream_council("Explain AI", chairman="gpt-5")]
+    names = [event for event, _ in events]
+
+    assert names.count("stage1") == 5
+    assert names.count("stage2") == 5
+    assert names.count("stage3") == 3
+    assert names[-1] == "complete"
+    assert names.index("stage2") > max(i for i, n in enumerate(names) if n == "stage1")
+    assert "".join(data["delta"] for event, data in events if event == "stage3") == (
+        "chairman finalizes"
+    )
+    final = models_module.CouncilResponse.model_validate(events[-1][1])
+    assert final.final_answer == "chairman finalizes"
+    assert final.metadata.models_failed == ["sonar"]
+    assert list(final.stage1_responses) == ["claude", "gpt5", "kimi", "gemini", "sonar"]
+
+
+@pytest.mark.asyncio()
+async def test_stream_council_stops_before_stage2_without_quorum(env_values):
+    _, _, client_module, council_module = _load_council_modules(env_values)
+    service = council_module.CouncilService(
+        caller_wallet="0xtest",
+        client=FakeClient(client_module.LLMResponse, failing_members={"claude", "gpt5", "kimi"}),
+    )
+
+    events = []
+    with pytest.raises(RuntimeError):
+        async for event, _ in service.stream_council("Need advice"):
+            events.append(event)
+
+    assert events == ["stage1"] * 5
+
+
+class SlowFakeClient(FakeClient):
+    def __init__(self, llm_response_cls, slow_members: set[str]):
+        super().__init__(llm_response_cls)
+        self.slow_members = slow_members
+        self.cancelled: list[str] = []
+
+    async def query_model(self, member, prompt, system_prompt=None, *, caller_wallet, **_):
+        if member.name in self.slow_members:
+            try:
+                await asyncio.sleep(30)
+            except asyncio.CancelledError:
+                self.cancelled.append(member.name)
+                raise
+        return await super().query_model(
+            member, prompt, system_prompt, caller_wallet=caller_wallet
+        )
+
+
+@pytest.mark.asyncio()
+async def test_run_council_quorum_cuts_off_stragglers(env_values):
+    env = {**env_values, "QUORUM_ENABLED": "true", "QUORUM_GRACE_SECONDS": "0.05"}
+    _, _, client_module, council_module = _load_council_modules(env)
+    fake = SlowFakeClient(client_module.LLMResponse, slow_members={"sonar"})
+    service = council_module.CouncilService(caller_wallet="0xtest", client=fake)
+
+    response = await asyncio.wait_for(service.run_council("Quick?"), timeout=5)
+
+    assert response.metadata.stage1_cut_off == ["sonar"]
+    assert response.metadata.stage2_cut_off == ["sonar"]
+    assert "sonar" not in response.stage1_responses
+    assert "sonar" not in response.metadata.models_failed
+    assert fake.cancelled == ["sonar", "sonar"]
+
+
+@pytest.mark.asyncio()
+async def test_run_council_without_quorum_waits_for_everyone(env_values):
+    _, _, client_module, council_module = _load_council_modules(env_values)
+    service = council_module.CouncilService(
+        caller_wallet="0xtest",
+        client=FakeClient(client_module.LLMResponse),
+    )
+
+    response = await service.run_council("Patient?")
+
+    assert response.metadata.stage1_cut_off == []
+    assert response.metadata.stage2_cut_off == []
+
+
+class DeadlineRecordingClient(FakeClient):
+    def __init__(self, llm_response_cls):
+        super().__init__(llm_response_cls)
+        self.deadlines: list = []
+
+    async def query_models_parallel(self, members, prompt, system_prompt=None, **kwargs):
+        self.deadlines.append(("stage1", kwargs["deadline"]))
+        return await super().query_models_parallel(members, prompt, system_prompt, **kwargs)
+
+    async def query_model(self, member, prompt, system_prompt=None, **kwargs):
+        stage = "stage3" if member.name == "chairman" else "stage2"
+        self.deadlines.append((stage, kwargs["deadline"]))
+        return await super().query_model(member, prompt, system_prompt, **kwargs)
+
+
+@pytest.mark.asyncio()
+async def test_run_council_splits_deadline_across_stages(env_values):
+    _, _, client_module, council_module = _load_council_modules(env_values)
+    fake = DeadlineRecordingClient(client_module.LLMResponse)
+    service = council_module.CouncilService(caller_wallet="0xtest", client=fake)
+
+    await service.run_council("Budget?", deadline_seconds=100)
+
+    by_stage = {stage: deadline for stage, deadline in fake.deadlines}
+    stage1, stage2, stage3 = by_stage["stage1"], by_stage["stage2"], by_stage["stage3"]
+    assert stage1.remaining() < stage2.remaining() < stage3.remaining() <= 100
+    # The default 0.45 weight applies to the full budget for stage 1.
+    assert stage1.remaining() == pytest.approx(45, abs=1)
+
+
+class GatedFakeClient(FakeClient):
+    """Blocks stage 1 until released so concurrent councils overlap."""
+
+    def __init__(self, llm_response_cls):
+        super().__init__(llm_response_cls)
+        self.release = asyncio.Event()
+        self.stage1_calls = 0
+        self.cancelled = False
+
+    async def query_models_parallel(self, members, prompt, system_prompt=None, **kwargs):
+        self.stage1_calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return await super().query_models_parallel(members, prompt, system_prompt, **kwargs)
+
+
+@pytest.mark.asyncio()
+async def test_run_council_coalesces_identical_inflight_queries(env_values):
+    _, _, client_module, council_module = _load_council_modules(env_values)
+    fake = GatedFakeClient(client_module.LLMResponse)
+    services = [
+        council_module.CouncilService(caller_wallet="0xtest", client=fake) for _ in range(3)
+    ]
+
+    tasks = [
+        asyncio.ensure_future(services[0].run_council("What is AGI?")),
+        asyncio.ensure_future(services[1].run_council("  what is   AGI? ")),
+        asyncio.ensure_future(services[2].run_council("What is ASI?")),
+    ]
+    await asyncio.sleep(0)
+    fake.release.set()
+    first, second, other = await asyncio.gather(*tasks)
+
+    assert fake.stage1_calls == 2
+    assert first.final_answer == second.final_answer
+    assert first.metadata.coalesced is False
+    assert second.metadata.coalesced is True
+    assert other.metadata.coalesced is False
+    assert council_module._inflight == {}
+
+
+@pytest.mark.asyncio()
+async def test_run_council_reports_progress_to_every_coalesced_waiter(env_values):
+    _, _, client_module, council_module = _load_council_modules(env_values)
+    fake = GatedFakeClient(client_module.LLMResponse)
+    services = [
+        council_module.CouncilService(caller_wallet="0xtest", client=fake) for _ in range(2)
+    ]
+    events: list[list[tuple[str, str]]] = [[], []]
+
+    def listener(seen):
+        async def record(event, data):
+            seen.append((event, data["model"]))
+
+        return record
+
+    tasks = [
+        asyncio.ensure_future(
+            service.run_council("What is AGI?", on_progress=listener(seen))
+        )
+        for service, seen in zip(services, events)
+    ]
+    await asyncio.sleep(0)
+    fake.release.set()
+    await asyncio.gather(*tasks)
+
+    names = ["claude", "gpt5", "kimi", "gemini", "sonar"]
+    expected = [("stage1", name) for name in names] + [("stage2", name) for name in names]
+    assert fake.stage1_calls == 1
+    assert events == [expected, expected]
+
+@pytest.mark.asyncio()
+async def test_run_council_coalesces_only_same_wallet_by_default(env_values):
+    env = {**env_values, "OPINION_CACHE_ENABLED": "false"}
+    _, _, client_module, council_module = _load_council_modules(env)
+    fake = GatedFakeClient(client_module.LLMResponse)
+
+    tasks = [
+        asyncio.ensure_future(
+            council_module.CouncilService(caller_wallet=wallet, client=fake).run_council("Q")
+        )
+        for wallet in ("0xa", "0xb")
+    ]
+    await asyncio.sleep(0)
+    fake.release.set()
+    await asyncio.gather(*tasks)
+
+    assert fake.stage1_calls == 2
+
+
+@pytest.mark.asyncio()
+async def test_coalesced_council_survives_one_waiter_cancelling(env_values):
+    _, _, client_module, council_module = _load_council_modules(env_values)
+    fake = GatedFakeClient(client_module.LLMResponse)
+    service = council_module.CouncilService(caller_wallet="0xtest", client=fake)
+
+    leaver = asyncio.ensure_future(service.run_council("Q"))
+    stayer = asyncio.ensure_future(service.run_council("Q"))
+    await asyncio.sleep(0)
+    leaver.cancel()
+    await asyncio.sleep(0)
+    fake.release.set()
+
+    response = await stayer
+    assert response.final_answer
+    assert fake.cancelled is False
+    assert leaver.cancelled()
+
+
+@pytest.mark.asyncio()
+async def test_coalesced_council_cancelled_when_last_waiter_leaves(env_values):
+    _, _, client_module, council_module = _load_council_modules(env_values)
+    fake = GatedFakeClient(client_module.LLMResponse)
+    service = council_module.CouncilService(caller_wallet="0xtest", client=fake)
+
+    waiters = [asyncio.ensure_future(service.run_council("Q")) for _ in range(2)]
+    await asyncio.sleep(0)
+    for waiter in waiters:
+        waiter.cancel()
+    await asyncio.gather(*waiters, return_exceptions=True)
+    await asyncio.sleep(0)
+
+    assert fake.cancelled is True
+    assert council_module._inflight == {}
+
+
+class CountingFakeClient(FakeClient):
+    def __init__(self, llm_response_cls, failing_members=None):
+        super().__init__(llm_response_cls, failing_members)
+        self.stage1_members: list[list[str]] = []
+
+    async def query_models_parallel(self, members, prompt, system_prompt=None, **kwargs):
+        self.stage1_members.append([member.name for member in members])
+        return await super().query_models_parallel(members, prompt, system_prompt, **kwargs)
+
+
+@pytest.mark.asyncio()
+async def test_stage1_served_from_opinion_cache(env_values):
+    _, _, client_module, council_module = _load_council_modules(env_values)
+    fake = CountingFakeClient(client_module.LLMResponse, failing_members={"sonar"})
+    service = council_module.CouncilService(caller_wallet="0xtest", client=fake)
+
+    first = await service.run_council("Cache me")
+    fake.failing_members = set()
+    second = await service.run_council("  cache ME ")
+
+    assert fake.stage1_members == [
+        ["claude", "gpt5", "kimi", "gemini", "sonar"],
+        ["sonar"],
+    ]
+    assert first.metadata.stage1_cache_hits == []
+    assert second.metadata.stage1_cache_hits == ["claude", "gpt5", "kimi", "gemini"]
+    assert list(second.stage1_responses) == ["claude", "gpt5", "kimi", "gemini", "sonar"]
+    assert second.stage1_responses["claude"].content == "Opinion from claude"
+
+
+@pytest.mark.asyncio()
+async def test_opinion_cache_can_be_disabled(env_values):
+    env = {**env_values, "OPINION_CACHE_ENABLED": "false"}
+    _, _, client_module, council_module = _load_council_modules(env)
+    fake = CountingFakeClient(client_module.LLMResponse)
+    service = council_module.CouncilService(caller_wallet="0xtest", client=fake)
+
+    await service.run_council("Again")
+    await service.run_council("Again")
+
+    assert len(fake.stage1_members) == 2
+    assert service.opinion_cache is None
+
+
+@pytest.mark.asyncio()
+async def test_near_duplicate_query_reuses_final_response(env_values):
+    env = {
+        **env_values,
+        "NEAR_DUPLICATE_ENABLED": "true",
+        "NEAR_DUPLICATE_THRESHOLD": "0.6",
+        "OPINION_CACHE_ENABLED": "false",
+    }
+    _, _, client_module, council_module = _load_council_modules(env)
+    fake = CountingFakeClient(client_module.LLMResponse)
+    service = council_module.CouncilService(caller_wallet="0xtest", client=fake)
+
+    original = await service.run_council("What are the failure modes of RAG systems?")
+    reused = await service.run_council("what are the failure modes of RAG systems")
+    other_chair = await service.run_council(
+        "what are the failure modes of RAG systems", chairman="gpt-5"
+    )
+
+    assert len(fake.stage1_members) == 2
+    assert original.metadata.cache_reuse is None
+    assert reused.metadata.cache_reuse == "near_duplicate_response"
+    assert reused.metadata.reuse_similarity >= 0.6
+    assert reused.final_answer == original.final_answer
+    assert other_chair.metadata.cache_reuse is None
+
+
+@pytest.mark.asyncio()
+async def test_near_duplicate_entries_are_kept_per_mode(env_values):
+    env = {
+        **env_values,
+        "NEAR_DUPLICATE_ENABLED": "true",
+        "NEAR_DUPLICATE_THRESHOLD": "0.6",
+        "OPINION_CACHE_ENABLED": "false",
+    }
+    _, _, client_module, council_module = _load_council_modules(env)
+    fake = CountingFakeClient(client_module.LLMResponse)
+    service = council_module.CouncilService(caller_wallet="0xtest", client=fake)
+
+    await service.run_council("What are the failure modes of RAG systems?")
+    lite = await service.run_council("What are the failure modes of RAG systems?", mode="lite")
+    full = await service.run_council("what are the failure modes of RAG systems")
+
+    assert lite.metadata.cache_reuse is None
+    assert full.metadata.cache_reuse == "near_duplicate_response"
+    assert full.metadata.mode == "full"
+    assert len(fake.stage1_members) == 2
+
+
+@pytest.mark.asyncio()
+async def test_near_duplicate_query_can_reuse_only_opinions(env_values):
+    env = {
+        **env_values,
+        "NEAR_DUPLICATE_ENABLED": "true",
+        "NEAR_DUPLICATE_THRESHOLD": "0.6",
+        "NEAR_DUPLICATE_REUSE": "opinions",
+        "OPINION_CACHE_ENABLED": "false",
+    }
+    _, _, client_module, council_module = _load_council_modules(env)
+    fake = CountingFakeClient(client_module.LLMResponse)
+    service = council_module.CouncilService(caller_wallet="0xtest", client=fake)
+
+    await service.run_council("What are the failure modes of RAG systems?")
+    reused = await service.run_council("what are the failure modes of RAG systems")
+
+    assert len(fake.stage1_members) == 1
+    assert reused.metadata.cache_reuse == "near_duplicate_opinions"
+    assert len(reused.stage2_critiques) == 5
+    assert len(reused.metadata.stage1_cache_hits) == 5
+
+
+@pytest.mark.asyncio()
+async def test_lite_mode_skips_stage2(env_values):
+    _, _, client_module, council_module = _load_council_modules(env_values)
+    fake = CountingFakeClient(client_module.LLMResponse)
+    service = council_module.CouncilService(caller_wallet="0xtest", client=fake)
+
+    response = await service.run_council("Explain AI", mode="lite")
+
+    assert response.stage2_critiques == {}
+    assert response.metadata.mode == "lite"
+    assert response.metadata.stage2_cut_off == []
+    assert len(response.metadata.council_members) == 5
+
+
+@pytest.mark.asyncio()
+async def test_fast_mode_uses_quickest_members(env_values):
+    from backend.resilience import BreakerRegistry
+    from backend.stats import StatsRegistry
+
+    env = {**env_values, "FAST_MODE_MEMBERS": "3", "OPINION_CACHE_ENABLED": "false"}
+    _, _, client_module, council_module = _load_council_modules(env)
+    fake = FakeClient(client_module.LLMResponse)
+    fake.stats = StatsRegistry(window=10)
+    fake.breakers = BreakerRegistry(failure_threshold=5, reset_timeout=30.0)
+    for publisher_id, seconds in (
+        ("claude-id", 20.0),
+        ("openai-id", 3.0),
+        ("moonshot-id", 2.0),
+        ("gemini-id", 9.0),
+        ("perplexity-id", 1.0),
+    ):
+        fake.stats.get(publisher_id, "stage1").record_latency(seconds)
+    service = council_module.CouncilService(caller_wallet="0xtest", client=fake)
+
+    response = await service.run_council("Explain AI", mode="fast")
+
+    assert response.metadata.mode == "fast"
+    assert response.metadata.council_members == ["gpt5", "kimi", "sonar"]
+    assert set(response.stage1_responses) == {"gpt5", "kimi", "sonar"}
+    assert set(response.stage2_critiques) == {"gpt5", "kimi", "sonar"}
+    assert response.metadata.stage1_cut_off == []
+
+
+class AgreeingFakeClient(CountingFakeClient):
+    def __init__(self, llm_response_cls):
+        super().__init__(llm_response_cls)
+        self.stage2_members: list[str] = []
+        self.stage3_calls = 0
+
+    async def query_model(self, member, prompt, system_prompt=None, **kwargs):
+        if "Return ONLY valid JSON" in prompt:
+            self.stage2_members.append(member.name)
+        elif member.name == "chairman":
+            self.stage3_calls += 1
+        return await super().query_model(member, prompt, system_prompt, **kwargs)
+
+    async def query_models_parallel(self, members, prompt, system_prompt=None, **kwargs):
+        responses = await super().query_models_parallel(
+            members, prompt, system_prompt, **kwargs
+        )
+        for response in responses:
+            response.content = "The answer is 42."
+        return responses
+
+
+@pytest.mark.asyncio()
+async def test_consensus_returns_medoid_without_stages_2_and_3(env_values):
+    env = {**env_values, "CONSENSUS_ENABLED": "true", "OPINION_CACHE_ENABLED": "false"}
+    _, _, client_module, council_module = _load_council_modules(env)
+    fake = AgreeingFakeClient(client_module.LLMResponse)
+    service = council_module.CouncilService(caller_wallet="0xtest", client=fake)
+
+    response = await service.run_council("What is six times seven?")
+
+    assert response.final_answer == "The answer is 42."
+    assert response.stage2_critiques == {}
+    assert response.metadata.consensus_decision == "medoid"
+    assert response.metadata.consensus_score == pytest.approx(1.0)
+    assert response.metadata.consensus_medoid == "claude"
+    assert response.metadata.stage2_cut_off == []
+    assert fake.stage2_members == []
+    assert fake.stage3_calls == 0
+
+
+@pytest.mark.asyncio()
+async def test_consensus_can_still_ask_the_chairman(env_values):
+    env = {
+        **env_values,
+        "CONSENSUS_ENABLED": "true",
+        "CONSENSUS_SYNTHESIS": "chairman",
+        "OPINION_CACHE_ENABLED": "false",
+    }
+    _, _, client_module, council_module = _load_council_modules(env)
+    fake = AgreeingFakeClient(client_module.LLMResponse)
+    service = council_module.CouncilService(caller_wallet="0xtest", client=fake)
+
+    response = await service.run_council("What is six times seven?")
+
+    assert response.final_answer == "chairman finalizes"
+    assert response.metadata.consensus_decision == "chairman"
+    assert fake.stage2_members == []
+    assert fake.stage3_calls == 1
+
+
+@pytest.mark.asyncio()
+async def test_disagreeing_opinions_deliberate_in_full(env_values):
+    env = {**env_values, "CONSENSUS_ENABLED": "true", "OPINION_CACHE_ENABLED": "false"}
+    _, _, client_module, council_module = _load_council_modules(env)
+    fake = CountingFakeClient(client_module.LLMResponse)
+    service = council_module.CouncilService(caller_wallet="0xtest", client=fake)
+
+    response = await service.run_council("Explain AI")
+
+    assert response.metadata.consensus_decision == "deliberate"
+    assert response.metadata.consensus_score < 0.8
+    assert len(response.stage2_critiques) == 5
+
+
+class ContradictingFakeClient(AgreeingFakeClient):
+    async def query_models_parallel(self, members, prompt, system_prompt=None, **kwargs):
+        responses = await super().query_models_parallel(
+            members, prompt, system_prompt, **kwargs
+        )
+        reason = (
+            " the foreign key column, because joins on it otherwise scan the whole"
+            " child table and lock escalation gets worse under concurrent writes."
+        )
+        for index, response in enumerate(responses):
+            verdict = "You should not index" if index % 2 else "You should index"
+            response.content = verdict + reason
+        return responses
+
+
+@pytest.mark.asyncio()
+async def test_contradictory_long_opinions_do_not_short_circuit(env_values):
+    env = {**env_values, "CONSENSUS_ENABLED": "true", "OPINION_CACHE_ENABLED": "false"}
+    _, _, client_module, council_module = _load_council_modules(env)
+    fake = ContradictingFakeClient(client_module.LLMResponse)
+    service = council_module.CouncilService(caller_wallet="0xtest", client=fake)
+
+    response = await service.run_council("Should I index this foreign key?")
+
+    assert response.metadata.consensus_decision == "deliberate"
+    assert len(fake.stage2_members) == 5
+    assert fake.stage3_calls == 1
+
+class ChairPromptFakeClient(FakeClient):
+    def __init__(self, llm_response_cls):
+        super().__init__(llm_response_cls)
+        self.chairman_prompts: list[str] = []
+
+    async def query_model(self, member, prompt, system_prompt=None, **kwargs):
+        if member.name == "chairman":
+            self.chairman_prompts.append(prompt)
+        return await super().query_model(member, prompt, system_prompt, **kwargs)
+
+
+@pytest.mark.asyncio()
+async def test_rankings_are_aggregated_into_metadata(env_values):
+    _, _, client_module, council_module = _load_council_modules(env_values)
+    fake = ChairPromptFakeClient(client_module.LLMResponse)
+    service = council_module.CouncilService(caller_wallet="0xtest", client=fake)
+
+    response = await service.run_council("Rank these")
+
+    ranking = response.metadata.ranking
+    assert ranking.method == "borda"
+    assert ranking.ballots == 5
+    assert ranking.order[:3] == ["claude", "gpt5", "kimi"]
+    assert ranking.borda["claude"] == 4.0
+    assert ranking.kemeny[:3] == ["claude", "gpt5", "kimi"]
+    assert ranking.chairman_opinions == []
+    assert "(sonar)" in fake.chairman_prompts[0]
+
+
+@pytest.mark.asyncio()
+async def test_chairman_prompt_pruned_to_top_k(env_values):
+    env = {**env_values, "CHAIRMAN_TOP_K": "2", "RANKING_METHOD": "copeland"}
+    _, _, client_module, council_module = _load_council_modules(env)
+    fake = ChairPromptFakeClient(client_module.LLMResponse)
+    service = council_module.CouncilService(caller_wallet="0xtest", client=fake)
+
+    response = await service.run_council("Rank these")
+
+    assert response.metadata.ranking.chairman_opinions == ["claude", "gpt5"]
+    prompt = fake.chairman_prompts[0]
+    assert "Opinion from claude" in prompt and "Opinion from gpt5" in prompt
+    assert "Opinion from kimi" not in prompt
+    assert "(kimi)" not in prompt
+    assert "(gpt5): gpt5 critique" in prompt
+    assert len(response.stage1_responses) == 5
+
+
+class CritiquePromptFakeClient(FakeClient):
+    def __init__(self, llm_response_cls):
+        super().__init__(llm_response_cls)
+        self.critique_prompts: dict[str, str] = {}
+
+    async def query_model(self, member, prompt, system_prompt=None, **kwargs):
+        if "Return ONLY valid JSON" in prompt:
+            self.critique_prompts[member.name] = prompt
+        return await super().query_model(member, prompt, system_prompt, **kwargs)
+
+
+@pytest.mark.asyncio()
+async def test_round_robin_topology_sends_each_critic_its_peers(env_values):
+    env = {
+        **env_values,
+        "CRITIQUE_TOPOLOGY": "round_robin",
+        "CRITIQUE_PEERS": "2",
+        "CRITIQUE_MIN_REVIEWS": "2",
+        "OPINION_CACHE_ENABLED": "false",
+    }
+    _, _, client_module, council_module = _load_council_modules(env)
+    fake = CritiquePromptFakeClient(client_module.LLMResponse)
+    service = council_module.CouncilService(caller_wallet="0xtest", client=fake)
+
+    response = await service.run_council("Sparse please")
+
+    assert response.metadata.critique_topology == "round_robin"
+    assert response.metadata.critique_assignments["claude"] == ["gpt5", "kimi"]
+    assert response.metadata.critique_assignments["sonar"] == ["claude", "gpt5"]
+    claude_prompt = fake.critique_prompts["claude"]
+    assert "R2: Opinion from gpt5" in claude_prompt
+    assert "R3: Opinion from kimi" in claude_prompt
+    assert "R1:" not in claude_prompt and "R4:" not in claude_prompt
+    ranking = response.metadata.ranking
+    # kimi reviews R4 and R5 but the fake critic only ever ranks R1-R3.
+    assert ranking.ballots == 4
+    assert set(ranking.order) == {"claude", "gpt5", "kimi", "gemini", "sonar"}
+
+
+@pytest.mark.asyncio()
+async def test_all_to_all_topology_is_reported(env_values):
+    _, _, client_module, council_module = _load_council_modules(env_values)
+    service = council_module.CouncilService(
+        caller_wallet="0xtest", client=FakeClient(client_module.LLMResponse)
+    )
+
+    response = await service.run_council("Dense please")
+
+    assert response.metadata.critique_topology == "all"
+    assert response.metadata.critique_assignments == {}
+
+
+class PrefixCachingFakeClient(FakeClient):
+    """Reports word-count usage, with split-prompt prefixes served from cache."""
+
+    def __init__(self, llm_response_cls):
+        super().__init__(llm_response_cls)
+        self.split_prompts: list = []
+
+    async def query_model(self, member, prompt, system_prompt=None, **kwargs):
+        from backend.usage import Usage
+
+        result = await super().query_model(member, prompt, system_prompt, **kwargs)
+        prefix = getattr(prompt, "prefix", None)
+        if prefix is not None:
+            self.split_prompts.append((member.name, prompt))
+        result.usage = Usage(
+            input_tokens=len(prompt.split()),
+            output_tokens=len(result.content.split()),
+            cached_input_tokens=len(prefix.split()) if prefix is not None else 0,
+            cost_usd=0.01,
+        )
+        return result
+
+
+@pytest.mark.asyncio()
+async def test_stage2_and_chairman_prompts_share_a_cacheable_prefix(env_values):
+    env = {**env_values, "OPINION_CACHE_ENABLED": "false"}
+    _, _, client_module, council_module = _load_council_modules(env)
+    fake = PrefixCachingFakeClient(client_module.LLMResponse)
+    service = council_module.CouncilService(caller_wallet="0xtest", client=fake)
+
+    response = await service.run_council("Share the prefix")
+
+    prompts = dict(fake.split_prompts)
+    assert len(prompts) == 6
+    chair = prompts["chairman"]
+    assert all(prompt.prefix == chair.prefix for prompt in prompts.values())
+    assert chair.prefix.startswith("Question: Share the prefix")
+    assert "R1: Opinion from claude" in chair.prefix
+    assert "R1 = claude" in chair.suffix and "R1 = claude" not in chair.prefix
+    assert "Return ONLY valid JSON" in prompts["gpt5"].suffix
+    prefix_words = len(chair.prefix.split())
+    assert response.metadata.cached_input_tokens == {
+        "stage2": 5 * prefix_words,
+        "stage3": prefix_words,
+    }
+
+
+@pytest.mark.asyncio()
+@pytest.mark.parametrize(
+    ("chairman", "top_k", "cacheable"),
+    [
+        (None, "0", set()),
+        ("claude-sonnet-4-5", "0", {"claude", "chairman"}),
+        ("claude-sonnet-4-5", "2", set()),
+    ],
+)
+async def test_prefix_is_cacheable_only_when_its_model_sends_it_again(
+    env_values, chairman, top_k, cacheable
+):
+    env = {**env_values, "OPINION_CACHE_ENABLED": "false", "CHAIRMAN_TOP_K": top_k}
+    _, _, client_module, council_module = _load_council_modules(env)
+    fake = PrefixCachingFakeClient(client_module.LLMResponse)
+    service = council_module.CouncilService(caller_wallet="0xtest", client=fake)
+
+    await service.run_council("Cache wisely", chairman=chairman)
+
+    assert {name for name, prompt in fake.split_prompts if prompt.cacheable} == cacheable
+
+@pytest.mark.asyncio()
+async def test_usage_is_aggregated_per_stage_and_member(env_values):
+    # With quorum on, stage 1 goes through query_model too.
+    env = {**env_values, "OPINION_CACHE_ENABLED": "false", "QUORUM_ENABLED": "true"}
+    _, _, client_module, council_module = _load_council_modules(env)
+    fake = PrefixCachingFakeClient(client_module.LLMResponse)
+    service = council_module.CouncilService(caller_wallet="0xtest", client=fake)
+
+    response = await service.run_council("Count the tokens")
+
+    usage = response.metadata.usage
+    assert usage.total.calls == 11
+    assert usage.total.cost_usd == pytest.approx(0.11)
+    assert {stage: value.calls for stage, value in usage.stages.items()} == {
+        "stage1": 5,
+        "stage2": 5,
+        "stage3": 1,
+    }
+    assert usage.members["claude"].calls == 2
+    assert usage.members["chairman"].output_tokens == 2
+    assert usage.total.input_tokens == sum(
+        value.input_tokens for value in usage.members.values()
+    )
+    assert response.metadata.cost_usd == 0.75
+
+
+@pytest.mark.asyncio()
+async def test_streamed_chairman_usage_is_reported(env_values):
+    from backend.usage import Usage
+
+    class UsageStreamingClient(FakeClient):
+        async def stream_model(self, member, prompt, system_prompt=None, *, on_usage=None, **kw):
+            async for chunk in super().stream_model(member, prompt, system_prompt, **kw):
+                yield chunk
+            on_usage(Usage(input_tokens=40, output_tokens=2))
+
+    _, _, client_module, council_module = _load_council_modules(env_values)
+    fake = UsageStreamingClient(client_module.LLMResponse)
+    service = council_module.CouncilService(caller_wallet="0xtest", client=fake)
+
+    events = [event async for event in service.stream_council("Stream usage")]
+
+    metadata = events[-1][1]["metadata"]
+    assert metadata["usage"]["stages"] == {
+        "stage3": {
+            "calls": 1,
+            "input_tokens": 40,
+            "output_tokens": 2,
+            "cached_input_tokens": 0,
+            "cost_usd": None,
+        }
+    }
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        '{"analysis": "Solid", "rankings": ["R2", "R1"]}',
+        'Here is my critique:\n```json\n{"analysis": "Solid", "rankings": ["R2", "R1"]}\n```',
+        'Sure! {"analysis": "Solid", "rankings": ["R2", "R1"]} Hope that helps.',
+    ],
+)
+def test_stage2_output_parser_tolerates_fences_and_prose(env_values, content):
+    _, _, _, council_module = _load_council_modules(env_values)
+
+    assert council_module._parse_stage2_output(content) == ("Solid", ["R2", "R1"])
+
+
+def test_stage2_output_parser_falls_back_to_raw_text(env_values):
+    _, _, _, council_module = _load_council_modules(env_values)
+
+    assert council_module._parse_stage2_output("R1 is best.") == ("R1 is best.", [])
+    assert council_module._parse_stage2_output('{"rankings": "R1"}') == ('{"rankings": "R1"}', [])
+
+
+class OptionRecordingFakeClient(FakeClient):
+    def __init__(self, llm_response_cls):
+        super().__init__(llm_response_cls)
+        self.options: dict[str, dict] = {}
+
+    async def query_model(self, member, prompt, system_prompt=None, **kwargs):
+        if "Return ONLY valid JSON" in prompt:
+            self.options[member.name] = kwargs
+        return await super().query_model(member, prompt, system_prompt, **kwargs)
+
+
+@pytest.mark.asyncio()
+@pytest.mark.parametrize("structured", ["true", "false"])
+async def test_stage2_requests_structured_output_when_enabled(env_values, structured):
+    env = {**env_values, "STAGE2_STRUCTURED_OUTPUT": structured}
+    _, _, client_module, council_module = _load_council_modules(env)
+    fake = OptionRecordingFakeClient(client_module.LLMResponse)
+    service = council_module.CouncilService(caller_wallet="0xtest", client=fake)
+
+    await service.stage2_critiques("Q", await service.stage1_opinions("Q"))
+
+    schema = fake.options["claude"].get("response_schema")
+    if structured == "true":
+        assert schema is council_module.STAGE2_RESPONSE_SCHEMA
+        assert schema["schema"]["required"] == ["analysis", "rankings"]
+    else:
+        assert schema is None
+
+
+class EmptyCritiqueFakeClient(FakeClient):
+    async def query_model(self, member, prompt, system_prompt=None, **kwargs):
+        if member.name == "gpt5" and "Return ONLY valid JSON" in prompt:
+            # A reasoning model that spent its whole budget thinking.
+            return self.llm_response_cls(model_name=member.name, content="", success=True)
+        return await super().query_model(member, prompt, system_prompt, **kwargs)
+
+
+@pytest.mark.asyncio()
+async def test_empty_critique_counts_as_failed(env_values):
+    _, _, client_module, council_module = _load_council_modules(env_values)
+    fake = EmptyCritiqueFakeClient(client_module.LLMResponse)
+    service = council_module.CouncilService(caller_wallet="0xtest", client=fake)
+
+    critiques = await service.stage2_critiques("Q", await service.stage1_opinions("Q"))
+    empty = next(critique for critique in critiques if critique.model_name == "gpt5")
+    assert (empty.success, empty.error) == (False, "Empty critique")
+
+    response = await service.run_council("Q")
+    critique = response.stage2_critiques["gpt5"]
+    assert (critique.success, critique.error) == (False, "Empty critique")
+    assert response.final_answer == "chairman finalizes"
+
+
+class BackupHedgingFakeClient(FakeClient):
+    def __init__(self, llm_response_cls):
+        super().__init__(llm_response_cls)
+        self.hedge_excludes: list = []
+
+    async def query_model_hedged(self, member, prompt, system_prompt=None, **kwargs):
+        self.hedge_excludes.append(kwargs.pop("hedge_exclude"))
+        result = await self.query_model(member, prompt, system_prompt, **kwargs)
+        if member.name == "kimi":
+            result.hedged, result.answered_by = True, "backup"
+        return result
+
+
+@pytest.mark.asyncio()
+async def test_hedges_exclude_council_members_and_report_backups(env_values):
+    env = {**env_values, "QUORUM_ENABLED": "true", "OPINION_CACHE_ENABLED": "false"}
+    _, _, client_module, council_module = _load_council_modules(env)
+    fake = BackupHedgingFakeClient(client_module.LLMResponse)
+    service = council_module.CouncilService(caller_wallet="0xtest", client=fake)
+
+    with patch.object(service.settings, "hedging_enabled", True):
+        response = await service.run_council("Hedge me")
+
+    names = {"claude", "gpt5", "kimi", "gemini", "sonar"}
+    assert fake.hedge_excludes == [names] * 5
+    assert response.metadata.hedged_members == ["kimi"]
+    assert response.metadata.hedge_answered_by == {"kimi": "backup"}
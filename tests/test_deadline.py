@@ -0,0 +1,39 @@
+"""ABOUTME: Tests for deadline budget helpers.
+ABOUTME: Covers remaining time, expiry, and stage shares."""
+
+from unittest.mock import patch
+
+import pytest
+
+from backend import deadline as deadline_module
+from backend.deadline import Deadline
+
+
+def test_remaining_counts_down_and_never_goes_negative():
+    with patch.object(deadline_module, "monotonic", return_value=100.0):
+        budget = Deadline.after(10)
+    with patch.object(deadline_module, "monotonic", return_value=104.0):
+        assert budget.remaining() == pytest.approx(6.0)
+        assert not budget.expired
+    with patch.object(deadline_module, "monotonic", return_value=111.0):
+        assert budget.remaining() == 0.0
+        assert budget.expired
+
+
+def test_share_takes_fraction_of_remaining_budget():
+    with patch.object(deadline_module, "monotonic", return_value=0.0):
+        budget = Deadline.after(100)
+        stage1 = budget.share(0.5)
+    assert stage1.expires_at == pytest.approx(50.0)
+
+    # Stage 1 finished early: the next stage's share is taken from what is left.
+    with patch.object(deadline_module, "monotonic", return_value=20.0):
+        stage2 = budget.share(0.5)
+    assert stage2.expires_at == pytest.approx(60.0)
+
+
+def test_share_clamps_fraction():
+    with patch.object(deadline_module, "monotonic", return_value=0.0):
+        budget = Deadline.after(10)
+        assert budget.share(2.0).expires_at == pytest.approx(10.0)
+        assert budget.share(-1.0).expires_at == pytest.approx(0.0)
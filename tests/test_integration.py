@@ -20,18 +20,17 @@ from backend.x402_client import LLMResponse
 
 
 class FakeX402Client:
-    def __init__(self, caller_wallet: str):
-        self.caller_wallet = caller_wallet
+    def __init__(self):
         self.stage1_counter = 0
 
-    async def query_models_parallel(self, members, prompt, system_prompt=None):
+    async def query_models_parallel(self, members, prompt, system_prompt=None, *, caller_wallet, **_):
         self.stage1_counter += 1
         return [
             LLMResponse(model_name=member.name, content=f"Opinion {member.name}", success=True)
             for member in members
         ]
 
-    async def query_model(self, member, prompt, system_prompt=None):
+    async def query_model(self, member, prompt, system_prompt=None, *, caller_wallet, **_):
         if member.name == "chairman":
             content = f"{member.name} finalizes"
         elif "Return ONLY valid JSON" in prompt:
@@ -44,7 +43,7 @@ class FakeX402Client:
 def test_full_stack_query_flow():
     client = TestClient(app)
 
-    with patch("backend.council.X402Client", FakeX402Client):
+    with patch("backend.council.get_shared_client", FakeX402Client):
         response = client.post(
             "/v1/council/query",
             json={"query": "Explain AI"},
@@ -0,0 +1,262 @@
+"""ABOUTME: Tests for asynchronous council jobs.
+ABOUTME: Covers job stores, partial results, failures, webhooks, and concurrency."""
+
+import asyncio
+import json
+import os
+import socket
+
+import pytest
+from httpx import Response
+
+os.environ.setdefault("X402_GATEWAY_URL", "https://x402.serendb.com")
+os.environ.setdefault("CLAUDE_PUBLISHER_ID", "claude-id")
+os.environ.setdefault("OPENAI_PUBLISHER_ID", "openai-id")
+os.environ.setdefault("MOONSHOT_PUBLISHER_ID", "moonshot-id")
+os.environ.setdefault("GEMINI_PUBLISHER_ID", "gemini-id")
+os.environ.setdefault("PERPLEXITY_PUBLISHER_ID", "perplexity-id")
+
+from backend import models
+from backend.jobs import InMemoryJobStore, JobRunner, SQLiteJobStore
+from backend.x402_client import PaymentRequiredError
+
+
+def _complete_payload() -> dict:
+    return models.CouncilResponse(
+        final_answer="Final",
+        stage1_responses={
+            "claude": models.Stage1ResponseModel(model="claude", content="Opinion")
+        },
+        stage2_critiques={},
+        metadata=models.CouncilMetadata(
+            models_succeeded=["claude"],
+            models_failed=[],
+            chairman="claude-opus-4.5",
+            cost_usd=0.75,
+            duration_ms=1,
+        ),
+    ).model_dump()
+
+
+class FakeService:
+    running = 0
+    max_running = 0
+
+    def __init__(self, caller_wallet: str, gate: asyncio.Event | None = None, error=None):
+        self.caller_wallet = caller_wallet
+        self.gate = gate
+        self.error = error
+
+    async def run_council(self, query, chairman=None, deadline_seconds=None, **kwargs):
+        FakeService.running += 1
+        FakeService.max_running = max(FakeService.max_running, FakeService.running)
+        try:
+            opinion = {"model": "claude", "content": "Opinion", "success": True, "error": None}
+            await kwargs["on_progress"]("stage1", opinion)
+            if self.gate is not None:
+                await self.gate.wait()
+            if self.error is not None:
+                raise self.error
+            return models.CouncilResponse.model_validate(_complete_payload())
+        finally:
+            FakeService.running -= 1
+
+
+async def _wait_for_status(runner, job_id, wallet, status):
+    for _ in range(200):
+        job = await runner.get(job_id, wallet)
+        if job.status == status:
+            return job
+        await asyncio.sleep(0.005)
+    raise AssertionError(f"job never reached {status}")
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return InMemoryJobStore()
+    return SQLiteJobStore(str(tmp_path / "jobs.db"))
+
+
+@pytest.mark.asyncio()
+@pytest.mark.parametrize("kind", ["memory", "sqlite"])
+async def test_stores_evict_finished_jobs_by_age_and_count(kind, tmp_path):
+    now = [1000.0]
+    options = {"retention_seconds": 60.0, "max_finished": 2, "clock": lambda: now[0]}
+    if kind == "memory":
+        store = InMemoryJobStore(**options)
+    else:
+        store = SQLiteJobStore(str(tmp_path / "jobs.db"), **options)
+
+    def job(job_id, status, updated_at):
+        return models.CouncilJob(
+            id=job_id, status=status, created_at=updated_at, updated_at=updated_at
+        )
+
+    await store.save(job("running", "running", 900.0), "0xa")
+    for index, job_id in enumerate(("old", "mid", "new")):
+        await store.save(job(job_id, "succeeded", 990.0 + index), "0xa")
+
+    # Only max_finished finished jobs are kept; unfinished jobs are never evicted.
+    assert await store.get("old", "0xa") is None
+    assert (await store.get("mid", "0xa")).status == "succeeded"
+    assert (await store.get("running", "0xa")).status == "running"
+
+    now[0] = 1051.5
+    assert await store.get("mid", "0xa") is None
+    assert (await store.get("new", "0xa")).status == "succeeded"
+    await store.save(job("later", "failed", now[0]), "0xa")
+    now[0] = 1052.5
+    assert await store.get("new", "0xa") is None
+    assert (await store.get("later", "0xa")).status == "failed"
+    assert (await store.get("running", "0xa")).status == "running"
+
+
+@pytest.mark.asyncio()
+async def test_job_exposes_partial_then_final_results(store):
+    gate = asyncio.Event()
+    runner = JobRunner(
+        store,
+        max_concurrency=2,
+        service_factory=lambda caller_wallet: FakeService(caller_wallet, gate),
+    )
+
+    job = await runner.submit(models.CouncilJobRequest(query="Help"), caller_wallet="0xa")
+    assert job.status == "queued"
+
+    running = await _wait_for_status(runner, job.id, "0xa", "running")
+    for _ in range(100):
+        running = await runner.get(job.id, "0xa")
+        if running.stage1_responses:
+            break
+        await asyncio.sleep(0.005)
+    assert running.stage1_responses["claude"].content == "Opinion"
+    assert running.result is None
+
+    gate.set()
+    done = await _wait_for_status(runner, job.id, "0xa", "succeeded")
+    assert done.result.final_answer == "Final"
+    assert await runner.get(job.id, "0xother") is None
+
+
+@pytest.mark.asyncio()
+async def test_job_records_payment_failure():
+    runner = JobRunner(
+        InMemoryJobStore(),
+        max_concurrency=1,
+        service_factory=lambda caller_wallet: FakeService(
+            caller_wallet, error=PaymentRequiredError("Insufficient balance")
+        ),
+    )
+
+    job = await runner.submit(models.CouncilJobRequest(query="Help"), caller_wallet="0xa")
+    failed = await _wait_for_status(runner, job.id, "0xa", "failed")
+
+    assert failed.error == "Insufficient balance"
+    assert failed.error_status == 402
+
+
+@pytest.mark.asyncio()
+async def test_job_runner_caps_concurrency():
+    gate = asyncio.Event()
+    FakeService.max_running = 0
+    runner = JobRunner(
+        InMemoryJobStore(),
+        max_concurrency=2,
+        service_factory=lambda caller_wallet: FakeService(caller_wallet, gate),
+    )
+
+    jobs = [
+        await runner.submit(models.CouncilJobRequest(query=f"Q{i}"), caller_wallet="0xa")
+        for i in range(4)
+    ]
+    await asyncio.sleep(0.05)
+    statuses = [(await runner.get(job.id, "0xa")).status for job in jobs]
+    assert statuses.count("running") == 2
+    assert statuses.count("queued") == 2
+
+    gate.set()
+    for job in jobs:
+        await _wait_for_status(runner, job.id, "0xa", "succeeded")
+    assert FakeService.max_running == 2
+
+
+def _resolving_to(monkeypatch, address: str) -> None:
+    async def _getaddrinfo(host, port, **_):
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", (address, port))]
+
+    monkeypatch.setattr(asyncio.get_running_loop(), "getaddrinfo", _getaddrinfo)
+
+
+@pytest.mark.asyncio()
+async def test_job_delivers_webhook_on_completion(respx_mock, monkeypatch):
+    _resolving_to(monkeypatch, "93.184.216.34")
+    hook = respx_mock.post("https://93.184.216.34/hook").mock(return_value=Response(204))
+    runner = JobRunner(
+        InMemoryJobStore(),
+        max_concurrency=1,
+        service_factory=lambda caller_wallet: FakeService(caller_wallet),
+    )
+
+    job = await runner.submit(
+        models.CouncilJobRequest(query="Help", webhook_url="https://agent.example.com/hook"),
+        caller_wallet="0xa",
+    )
+    await _wait_for_status(runner, job.id, "0xa", "succeeded")
+    for _ in range(100):
+        if hook.called:
+            break
+        await asyncio.sleep(0.005)
+
+    request = hook.calls[0].request
+    assert request.headers["host"] == "agent.example.com"
+    assert request.extensions["sni_hostname"] == "agent.example.com"
+    body = json.loads(request.content)
+    assert body["id"] == job.id
+    assert body["status"] == "succeeded"
+    assert body["result"]["final_answer"] == "Final"
+
+
+@pytest.mark.asyncio()
+async def test_webhook_is_not_sent_to_a_name_resolving_to_an_internal_host(
+    respx_mock, monkeypatch
+):
+    _resolving_to(monkeypatch, "169.254.169.254")
+    anywhere = respx_mock.route().mock(return_value=Response(204))
+    runner = JobRunner(
+        InMemoryJobStore(),
+        max_concurrency=1,
+        service_factory=lambda caller_wallet: FakeService(caller_wallet),
+    )
+
+    job = await runner.submit(
+        models.CouncilJobRequest(query="Help", webhook_url="http://metadata.google.internal/"),
+        caller_wallet="0xa",
+    )
+    await _wait_for_status(runner, job.id, "0xa", "succeeded")
+    await asyncio.gather(*runner._tasks)
+
+    assert not anywhere.called
+
+
+@pytest.mark.asyncio()
+async def test_aclose_cancels_running_jobs():
+    runner = JobRunner(
+        InMemoryJobStore(),
+        max_concurrency=1,
+        service_factory=lambda caller_wallet: FakeService(caller_wallet, asyncio.Event()),
+    )
+    job = await runner.submit(models.CouncilJobRequest(query="Help"), caller_wallet="0xa")
+    await _wait_for_status(runner, job.id, "0xa", "running")
+
+    queued = await runner.submit(models.CouncilJobRequest(query="Later"), caller_wallet="0xa")
+    await asyncio.sleep(0)  # let it start waiting for a worker slot
+
+    await runner.aclose()
+
+    assert not runner._tasks
+    for job_id in (job.id, queued.id):
+        stored = await runner.get(job_id, "0xa")
+        assert stored.status == "failed"
+        assert stored.error == "Job worker shut down"
+        assert stored.error_status == 503
@@ -0,0 +1,120 @@
+"""ABOUTME: Tests for in-process metrics and their exposition format.
+ABOUTME: Covers histogram buckets, series reuse, and gateway instrumentation."""
+
+from importlib import reload
+from unittest.mock import patch
+import os
+
+import pytest
+from httpx import Response
+
+from backend.metrics import (
+    Counter,
+    Histogram,
+    MetricsRegistry,
+    gateway_series,
+)
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    histogram = registry.register(
+        Histogram("test_seconds", "Test latency.", ("stage",), buckets=(0.1, 1.0))
+    )
+    child = histogram.labels("stage1")
+    for value in (0.05, 0.1, 0.5, 3.0):
+        child.observe(value)
+
+    text = registry.render()
+
+    assert "# TYPE test_seconds histogram" in text
+    assert 'test_seconds_bucket{stage="stage1",le="0.1"} 2' in text
+    assert 'test_seconds_bucket{stage="stage1",le="1"} 3' in text
+    assert 'test_seconds_bucket{stage="stage1",le="+Inf"} 4' in text
+    assert 'test_seconds_sum{stage="stage1"} 3.65' in text
+    assert 'test_seconds_count{stage="stage1"} 4' in text
+
+
+def test_counter_escapes_label_values_and_checks_arity():
+    registry = MetricsRegistry()
+    counter = registry.register(Counter("test_total", "Test counter.", ("publisher",)))
+    counter.labels('odd"id').inc(2)
+
+    assert 'test_total{publisher="odd\\"id"} 2' in registry.render()
+    with pytest.raises(ValueError):
+        counter.labels("a", "b")
+
+
+def test_gateway_series_is_resolved_once():
+    first = gateway_series("series-pub", "stage1")
+
+    assert gateway_series("series-pub", "stage1") is first
+    assert gateway_series("series-pub", "stage2") is not first
+    assert gateway_series("series-pub", "stage2").in_flight is first.in_flight
+
+
+@pytest.fixture()
+def client_module():
+    env = {
+        "X402_GATEWAY_URL": "https://x402.serendb.com",
+        "CLAUDE_PUBLISHER_ID": "claude-id",
+        "OPENAI_PUBLISHER_ID": "openai-id",
+        "MOONSHOT_PUBLISHER_ID": "moonshot-id",
+        "GEMINI_PUBLISHER_ID": "gemini-id",
+        "PERPLEXITY_PUBLISHER_ID": "perplexity-id",
+        "RETRY_ATTEMPTS": "1",
+        "RETRY_BACKOFF_BASE_SECONDS": "0",
+    }
+    with patch.dict(os.environ, env, clear=True):
+        import backend.config as config_module
+        reload(config_module)
+
+        import backend.x402_client as module
+        reload(module)
+
+        return module
+
+
+@pytest.mark.asyncio()
+async def test_query_model_records_gateway_metrics(client_module, respx_mock):
+    client = client_module.X402Client()
+    member = client_module.CouncilMember(
+        "test", "metrics-pub", "test-model", "/chat/completions", "openai"
+    )
+    respx_mock.post("https://x402.serendb.com/api/proxy").mock(
+        side_effect=[
+            Response(503),
+            Response(200, json={"choices": [{"message": {"content": "ok"}}]}),
+            Response(402),
+        ]
+    )
+    series = gateway_series("metrics-pub", "stage2")
+
+    await client.query_model(member, "Hi", caller_wallet="0xtest", stage="stage2")
+    with pytest.raises(client_module.PaymentRequiredError):
+        await client.query_model(member, "Hi", caller_wallet="0xtest", stage="stage2")
+
+    assert series.requests.value == 3
+    assert series.retries.value == 1
+    assert series.payment_required.value == 1
+    assert series.failures.value == 0
+    assert series.latency.count == 3
+    assert series.request_bytes.value > 0
+    assert series.response_bytes.value > 0
+    assert series.in_flight.value == 0
+
+
+@pytest.mark.asyncio()
+async def test_exhausted_retries_count_as_failure(client_module, respx_mock):
+    client = client_module.X402Client()
+    member = client_module.CouncilMember(
+        "test", "failing-pub", "test-model", "/chat/completions", "openai"
+    )
+    respx_mock.post("https://x402.serendb.com/api/proxy").mock(return_value=Response(503))
+
+    result = await client.query_model(member, "Hi", caller_wallet="0xtest")
+
+    series = gateway_series("failing-pub")
+    assert result.success is False
+    assert series.requests.value == 2
+    assert series.failures.value == 1
@@ -0,0 +1,150 @@
+"""ABOUTME: Tests for the local mock x402 gateway.
+ABOUTME: Drives the real X402Client and council against it in-process."""
+
+from unittest.mock import patch
+import os
+
+import httpx
+import pytest
+
+os.environ.setdefault("X402_GATEWAY_URL", "https://x402.serendb.com")
+os.environ.setdefault("CLAUDE_PUBLISHER_ID", "claude-id")
+os.environ.setdefault("OPENAI_PUBLISHER_ID", "openai-id")
+os.environ.setdefault("MOONSHOT_PUBLISHER_ID", "moonshot-id")
+os.environ.setdefault("GEMINI_PUBLISHER_ID", "gemini-id")
+os.environ.setdefault("PERPLEXITY_PUBLISHER_ID", "perplexity-id")
+
+from backend.config import CouncilMember
+from backend.mock_gateway import MockGatewayConfig, PublisherProfile, create_mock_gateway
+
+OPENAI_MEMBER = CouncilMember("gpt", "openai-pub", "gpt-test", "/chat/completions", "openai")
+ANTHROPIC_MEMBER = CouncilMember("claude", "claude-pub", "claude-test", "/messages", "anthropic")
+
+
+def _client(config: MockGatewayConfig):
+    # Other test modules reload the client module; use whichever is current.
+    import backend.x402_client as client_module
+
+    app = create_mock_gateway(config)
+    http_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app))
+    client = client_module.X402Client(http_client=http_client)
+    client.retry_attempts = 0
+    return client, app
+
+
+def _fast(**overrides) -> PublisherProfile:
+    return PublisherProfile(latency_median_seconds=0.0, latency_sigma=0.0, **overrides)
+
+
+@pytest.mark.asyncio()
+@pytest.mark.parametrize("member", [OPENAI_MEMBER, ANTHROPIC_MEMBER])
+async def test_mock_gateway_speaks_both_response_shapes(member):
+    client, app = _client(MockGatewayConfig(default=_fast(response_words=10)))
+
+    result = await client.query_model(member, "Hello?", caller_wallet="0xtest")
+
+    assert result.success is True
+    assert result.content.startswith(f"{member.model} mock answer:")
+    assert len(result.content.split()) == 10
+    assert app.state.gateway.requests == {member.publisher_id: 1}
+
+
+@pytest.mark.asyncio()
+async def test_mock_gateway_reads_repeated_anthropic_prefix_from_cache():
+    import backend.x402_client as client_module
+
+    client, _ = _client(MockGatewayConfig(default=_fast(response_words=10)))
+    first = client_module.SplitPrompt("Question: why\n\nR1: because\n\n", "Critique R1.", True)
+    second = client_module.SplitPrompt(first.prefix, "Synthesize R1.", True)
+
+    written = await client.query_model(ANTHROPIC_MEMBER, first, caller_wallet="0xtest")
+    read = await client.query_model(ANTHROPIC_MEMBER, second, caller_wallet="0xtest")
+
+    assert written.usage.cached_input_tokens == 0
+    assert read.usage.cached_input_tokens == 4
+    assert read.usage.input_tokens == written.usage.input_tokens
+    assert written.content.startswith("claude-test mock answer:")
+
+
+@pytest.mark.asyncio()
+@pytest.mark.parametrize("member", [OPENAI_MEMBER, ANTHROPIC_MEMBER])
+async def test_mock_gateway_streams_deltas(member):
+    client, _ = _client(
+        MockGatewayConfig(
+            default=_fast(response_words=20, stream_chunk_words=3, stream_chunk_delay_seconds=0)
+        )
+    )
+
+    reported = []
+    chunks = [
+        chunk
+        async for chunk in client.stream_model(
+            member, "Hi", caller_wallet="0xtest", on_usage=reported.append
+        )
+    ]
+
+    assert len(chunks) > 1
+    assert "".join(chunks).startswith(f"{member.model} mock answer:")
+    assert [(usage.input_tokens, usage.output_tokens) for usage in reported] == [(1, 20)]
+
+
+@pytest.mark.asyncio()
+async def test_mock_gateway_injects_payment_and_upstream_faults():
+    import backend.x402_client as client_module
+
+    config = MockGatewayConfig(
+        default=_fast(),
+        publishers={
+            "broke-pub": _fast(payment_required_rate=1.0),
+            "flaky-pub": _fast(error_rate=1.0, error_status=502),
+        },
+    )
+    client, _ = _client(config)
+    broke = CouncilMember("broke", "broke-pub", "m", "/chat/completions", "openai")
+    flaky = CouncilMember("flaky", "flaky-pub", "m", "/chat/completions", "openai")
+
+    with pytest.raises(client_module.PaymentRequiredError):
+        await client.query_model(broke, "Hi", caller_wallet="0xtest")
+    result = await client.query_model(flaky, "Hi", caller_wallet="0xtest")
+
+    assert result.success is False
+    assert "502" in result.error
+
+
+def test_latency_distribution_is_seeded_and_scaled():
+    profile = PublisherProfile(latency_median_seconds=1.0, latency_sigma=0.5)
+    first = create_mock_gateway(MockGatewayConfig(seed=7)).state.gateway
+    second = create_mock_gateway(MockGatewayConfig(seed=7)).state.gateway
+
+    samples = [first.latency(profile) for _ in range(2000)]
+
+    assert samples[:5] == [second.latency(profile) for _ in range(5)]
+    assert 0.9 < sorted(samples)[1000] < 1.1
+
+
+@pytest.mark.asyncio()
+async def test_council_runs_end_to_end_against_mock_gateway():
+    import backend.council as council_module
+
+    client, app = _client(MockGatewayConfig(default=_fast(response_words=30)))
+    service = council_module.CouncilService(caller_wallet="0xtest", client=client)
+
+    response = await service.run_council("End to end through the mock gateway?")
+
+    assert len(response.metadata.models_succeeded) == 5
+    assert all(critique.rankings for critique in response.stage2_critiques.values())
+    assert response.final_answer
+    assert sum(app.state.gateway.requests.values()) == 11
+
+
+@pytest.mark.asyncio()
+async def test_mock_gateway_answers_within_generation_budget():
+    client, _ = _client(MockGatewayConfig(default=_fast(response_words=500)))
+    import backend.x402_client as client_module
+
+    with patch.object(client_module.settings, "stage1_max_tokens", 12):
+        result = await client.query_model(
+            OPENAI_MEMBER, "Hello?", caller_wallet="0xtest", stage="stage1"
+        )
+
+    assert len(result.content.split()) == 12
@@ -17,6 +17,13 @@ def test_council_query_requires_text():
         models.CouncilQuery(query="   ")
 
 
+def test_council_query_deadline_must_be_positive():
+    assert models.CouncilQuery(query="hi").deadline_seconds is None
+    assert models.CouncilQuery(query="hi", deadline_seconds=30).deadline_seconds == 30
+    with pytest.raises(ValidationError):
+        models.CouncilQuery(query="hi", deadline_seconds=0)
+
+
 def test_council_response_accepts_nested_models():
     response = models.CouncilResponse(
         final_answer="Result",
@@ -0,0 +1,65 @@
+"""ABOUTME: Tests for stage-2 rank aggregation.
+ABOUTME: Covers Borda, Copeland, Kemeny-Young, label parsing, and partial ballots."""
+
+from backend.ranking import (
+    aggregate,
+    ballot_from_labels,
+    copeland_scores,
+    kemeny_order,
+    pairwise_matrix,
+)
+
+
+def test_labels_map_to_candidates_and_drop_noise():
+    candidates = {"R1": 0, "R2": 1, "R4": 2}
+
+    assert ballot_from_labels(["r2", "R9", "R1", "R2"], candidates) == [1, 0]
+    assert ballot_from_labels(["R3"], candidates) == []
+    assert ballot_from_labels(["R4 "], candidates) == [2]
+
+
+def test_borda_counts_unranked_shown_candidates_as_last():
+    result = aggregate([[2, 0], [2, 1, 0]], 3)
+
+    assert result.borda == [0.5, 0.5, 2.0]
+    assert result.order("borda") == [2, 0, 1]
+
+
+def test_copeland_follows_pairwise_majorities():
+    # Borda prefers 1, but 0 beats every rival head to head.
+    ballots = [[0, 1, 2, 3], [0, 1, 2, 3], [1, 2, 3, 0], [1, 2, 3, 0], [0, 1, 3, 2]]
+    matrix = pairwise_matrix(ballots, 4)
+
+    assert copeland_scores(matrix)[0] == 3.0
+    assert aggregate(ballots, 4).order("copeland")[0] == 0
+
+
+def test_kemeny_finds_order_with_most_pairwise_agreement():
+    ballots = [[0, 1, 2]] * 3 + [[1, 2, 0]] * 2 + [[2, 0, 1]] * 2
+
+    assert kemeny_order(pairwise_matrix(ballots, 3)) == [0, 1, 2]
+    assert kemeny_order(pairwise_matrix(ballots, 3), max_candidates=2) is None
+
+
+def test_kemeny_falls_back_to_borda_when_too_large():
+    result = aggregate([[1, 0, 2]], 3, kemeny_max_candidates=2)
+
+    assert result.kemeny is None
+    assert result.order("kemeny") == result.order("borda") == [1, 0, 2]
+
+
+def test_partial_ballots_only_compare_candidates_they_saw():
+    matrix = pairwise_matrix([[1], [2, 0]], 3, shown=[{0, 1}, {0, 2}])
+
+    assert matrix[1][0] == 1
+    assert matrix[2][0] == 1
+    assert matrix[1][2] == matrix[2][1] == 0
+
+
+def test_borda_is_not_biased_by_review_count():
+    # Candidate 0 wins its one comparison; 1 wins two of three.
+    shown = [{0, 1}, {1, 2}, {1, 2}, {1, 2}]
+    result = aggregate([[0, 1], [1, 2], [1, 2], [2, 1]], 3, shown=shown)
+
+    assert result.borda[0] == 2.0
+    assert result.order("borda")[0] == 0
@@ -0,0 +1,124 @@
+"""ABOUTME: Tests for circuit breakers, retry budget, backoff, and publisher limits.
+ABOUTME: Uses a fake clock to drive breaker state transitions."""
+
+import asyncio
+
+import pytest
+
+from backend.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    BreakerRegistry,
+    CircuitBreaker,
+    PublisherLimiter,
+    RetryBudget,
+    backoff_delay,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_breaker_opens_after_consecutive_failures():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=clock)
+
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.allow_request() is False
+
+
+def test_breaker_half_open_allows_single_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+
+    clock.now = 10
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request() is True
+    assert breaker.allow_request() is False
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow_request() is True
+
+
+def test_breaker_failed_probe_reopens():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=10, clock=clock)
+    for _ in range(5):
+        breaker.record_failure()
+
+    clock.now = 11
+    assert breaker.allow_request() is True
+    breaker.record_failure()
+
+    assert breaker.state == OPEN
+    assert breaker.allow_request() is False
+
+
+def test_breaker_replaces_silent_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+
+    clock.now = 10
+    assert breaker.allow_request() is True
+    clock.now = 15
+    assert breaker.allow_request() is False
+    clock.now = 20
+    assert breaker.allow_request() is True
+
+
+def test_registry_shares_breaker_per_publisher():
+    registry = BreakerRegistry(failure_threshold=1, reset_timeout=10)
+
+    assert registry.get("kimi") is registry.get("kimi")
+    assert registry.get("kimi") is not registry.get("sonar")
+    registry.get("kimi").record_failure()
+    assert registry.states() == {"kimi": OPEN, "sonar": CLOSED}
+
+
+def test_retry_budget_limits_retries_to_ratio_of_traffic():
+    budget = RetryBudget(ratio=0.5, min_tokens=1, max_tokens=10)
+
+    assert budget.try_spend() is True
+    assert budget.try_spend() is False
+
+    budget.deposit()
+    assert budget.try_spend() is False
+    budget.deposit()
+    assert budget.try_spend() is True
+
+
+def test_backoff_delay_is_exponential_with_full_jitter():
+    assert backoff_delay(0, base=0.5, cap=8, rand=lambda: 1.0) == pytest.approx(0.5)
+    assert backoff_delay(3, base=0.5, cap=8, rand=lambda: 1.0) == pytest.approx(4.0)
+    assert backoff_delay(10, base=0.5, cap=8, rand=lambda: 1.0) == pytest.approx(8.0)
+    assert backoff_delay(3, base=0.5, cap=8, rand=lambda: 0.25) == pytest.approx(1.0)
+
+
+@pytest.mark.asyncio()
+async def test_publisher_limiter_caps_each_publisher_independently():
+    limiter = PublisherLimiter(2)
+
+    async def call(publisher_id: str) -> None:
+        async with limiter.slot(publisher_id):
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(call("a") for _ in range(5)), call("b"))
+
+    assert limiter.peak_in_flight == {"a": 2, "b": 1}
@@ -0,0 +1,138 @@
+"""ABOUTME: Tests for the immutable roster and chairman routing table.
+ABOUTME: Covers frozen records, file-based rosters, and mtime hot reload."""
+
+from dataclasses import FrozenInstanceError
+from types import SimpleNamespace
+import json
+import os
+
+import pytest
+
+from backend.roster import DEFAULT_ROSTER, CouncilMember, RosterSource, build_roster
+
+SETTINGS = SimpleNamespace(
+    claude_publisher_id="claude-id",
+    openai_publisher_id="openai-id",
+    moonshot_publisher_id="moonshot-id",
+    gemini_publisher_id="gemini-id",
+    perplexity_publisher_id="perplexity-id",
+)
+
+TOML_ROSTER = """
+[[members]]
+name = "claude"
+publisher = "claude"
+model = "claude-sonnet-4-5"
+endpoint_path = "/messages"
+api_format = "anthropic"
+
+[[members]]
+name = "mistral"
+publisher_id = "mistral-id"
+model = "mistral-large"
+
+[[chairmen]]
+prefix = "mistral"
+publisher_id = "mistral-id"
+
+[fallback_chairman]
+publisher = "openai"
+"""
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_members_are_frozen_slotted_records():
+    member = build_roster(DEFAULT_ROSTER, SETTINGS).members[0]
+
+    with pytest.raises(FrozenInstanceError):
+        member.model = "other"
+    assert not hasattr(member, "__dict__")
+    assert member == CouncilMember(
+        "claude", "claude-id", "claude-sonnet-4-5", "/messages", "anthropic"
+    )
+
+
+def test_chairman_routes_by_prefix_and_memoizes():
+    roster = build_roster(DEFAULT_ROSTER, SETTINGS)
+
+    gpt = roster.chairman("gpt-5")
+    assert (gpt.publisher_id, gpt.api_format) == ("openai-id", "openai")
+    assert gpt.max_tokens_param == "max_completion_tokens"
+    assert gpt.reasoning is True
+    assert roster.chairman("gpt-5") is gpt
+    unknown = roster.chairman("mystery-model")
+    assert (unknown.publisher_id, unknown.endpoint_path) == ("claude-id", "/messages")
+
+
+def test_build_roster_rejects_bad_specs():
+    with pytest.raises(ValueError):
+        build_roster({"members": []}, SETTINGS)
+    with pytest.raises(ValueError):
+        build_roster({"members": [{"name": "x", "publisher": "nobody", "model": "m"}]}, SETTINGS)
+    with pytest.raises(ValueError):
+        build_roster(
+            {"members": [{"name": "x", "publisher": "openai", "model": "m", "api_format": "soap"}]},
+            SETTINGS,
+        )
+    bad_param = {"name": "x", "publisher": "openai", "model": "m", "max_tokens_param": "n"}
+    with pytest.raises(ValueError):
+        build_roster({"members": [bad_param]}, SETTINGS)
+
+
+def test_default_roster_declares_generation_capabilities():
+    members = {member.name: member for member in build_roster(DEFAULT_ROSTER, SETTINGS).members}
+
+    assert members["gpt5"].max_tokens_param == "max_completion_tokens"
+    assert members["sonar"].max_tokens_param == "max_tokens"
+    assert members["kimi"].structured_output is False
+    assert members["gemini"].structured_output is True
+    assert members["gpt5"].reasoning is True
+    assert members["claude"].reasoning is False
+
+
+def test_roster_file_in_toml_or_json(tmp_path):
+    toml_path = tmp_path / "roster.toml"
+    toml_path.write_text(TOML_ROSTER)
+    json_path = tmp_path / "roster.json"
+    json_path.write_text(json.dumps(DEFAULT_ROSTER))
+
+    build = lambda spec: build_roster(spec, SETTINGS)  # noqa: E731
+    from_toml = RosterSource(build, str(toml_path)).current()
+    from_json = RosterSource(build, str(json_path)).current()
+
+    assert [member.name for member in from_toml.members] == ["claude", "mistral"]
+    assert from_toml.chairman("mistral-large").publisher_id == "mistral-id"
+    assert from_toml.chairman("other").publisher_id == "openai-id"
+    assert len(from_json.members) == 5
+
+
+def test_roster_source_hot_reloads_on_mtime_change(tmp_path):
+    path = tmp_path / "roster.json"
+    path.write_text(json.dumps(DEFAULT_ROSTER))
+    clock = FakeClock()
+    source = RosterSource(
+        lambda spec: build_roster(spec, SETTINGS), str(path), check_interval=2.0, clock=clock
+    )
+    original = source.current()
+
+    smaller = {**DEFAULT_ROSTER, "members": DEFAULT_ROSTER["members"][:3]}
+    path.write_text(json.dumps(smaller))
+    os.utime(path, ns=(1, 10**18))
+    clock.now = 1.0
+    assert source.current() is original
+
+    clock.now = 2.5
+    reloaded = source.current()
+    assert [member.name for member in reloaded.members] == ["claude", "gpt5", "kimi"]
+
+    path.write_text("{not json")
+    os.utime(path, ns=(1, 2 * 10**18))
+    clock.now = 5.0
+    assert source.current() is reloaded
@@ -0,0 +1,63 @@
+"""ABOUTME: Tests for the MinHash LSH near-duplicate index.
+ABOUTME: Covers matching, thresholds, filtering, and bounded eviction."""
+
+import pytest
+
+from backend.similarity import MinHashLSH
+
+
+def test_near_duplicate_queries_match_and_unrelated_do_not():
+    index = MinHashLSH(num_perm=128, bands=32)
+    index.insert("q1", "What are the failure modes of RAG systems in production?", "answer-1")
+    index.insert("q2", "How do I bake sourdough bread at home?", "answer-2")
+
+    match = index.query("what are the failure modes of RAG systems in production", 0.7)
+    assert match is not None
+    similarity, value = match
+    assert value == "answer-1"
+    assert similarity >= 0.7
+
+    assert index.query("Explain quantum entanglement to a child", 0.5) is None
+
+
+def test_identical_text_has_similarity_one():
+    index = MinHashLSH()
+    index.insert("k", "Is Rust memory safe?", 1)
+
+    assert index.query("  is rust MEMORY safe? ", 0.99) == (1.0, 1)
+
+
+def test_accept_filters_candidates():
+    index = MinHashLSH()
+    index.insert("k", "Is Rust memory safe?", ("claude-opus", "A"))
+
+    assert index.query("Is Rust memory safe?", 0.9, accept=lambda v: v[0] == "gpt-5") is None
+    assert index.query("Is Rust memory safe?", 0.9, accept=lambda v: v[0] == "claude-opus")
+
+
+def test_index_is_bounded_and_eviction_clears_buckets():
+    index = MinHashLSH(max_entries=2)
+    index.insert("a", "first question about databases", "A")
+    index.insert("b", "second question about compilers", "B")
+    index.insert("c", "third question about networking", "C")
+
+    assert len(index) == 2
+    assert index.query("first question about databases", 0.9) is None
+    assert all(
+        "a" not in keys for band in index._buckets for keys in band.values()
+    )
+
+
+def test_reinserting_key_replaces_entry():
+    index = MinHashLSH()
+    index.insert("k", "old text here", "old")
+    index.insert("k", "brand new wording", "new")
+
+    assert len(index) == 1
+    assert index.query("old text here", 0.9) is None
+    assert index.query("brand new wording", 0.9) == (1.0, "new")
+
+
+def test_bands_must_divide_permutations():
+    with pytest.raises(ValueError):
+        MinHashLSH(num_perm=10, bands=3)
@@ -0,0 +1,61 @@
+"""ABOUTME: Tests for rolling publisher statistics.
+ABOUTME: Covers latency percentiles and the sliding window."""
+
+import pytest
+
+from backend.stats import PublisherStats, StatsRegistry
+
+
+def test_latency_percentile_uses_nearest_rank():
+    stats = PublisherStats(window=100)
+    for value in range(1, 11):
+        stats.record_latency(float(value))
+
+    assert stats.latency_percentile(0.9) == pytest.approx(9.0)
+    assert stats.latency_percentile(0.5) == pytest.approx(5.0)
+    assert stats.latency_percentile(1.0) == pytest.approx(10.0)
+
+
+def test_latency_percentile_requires_min_samples():
+    stats = PublisherStats(window=10)
+    assert stats.latency_percentile(0.9) is None
+
+    stats.record_latency(1.0)
+    assert stats.latency_percentile(0.9, min_samples=2) is None
+    assert stats.latency_percentile(0.9, min_samples=1) == pytest.approx(1.0)
+
+
+def test_window_discards_oldest_samples():
+    stats = PublisherStats(window=3)
+    for value in (100.0, 1.0, 2.0, 3.0):
+        stats.record_latency(value)
+
+    assert stats.sample_count == 3
+    assert stats.latency_percentile(1.0) == pytest.approx(3.0)
+
+
+def test_registry_returns_same_stats_per_publisher_and_stage():
+    registry = StatsRegistry(window=5)
+    assert registry.get("a", "stage1") is registry.get("a", "stage1")
+    assert registry.get("a", "stage1") is not registry.get("b", "stage1")
+    assert registry.get("a", "stage1") is not registry.get("a", "stage2")
+
+
+def test_ewma_tracks_latency_and_success_rate():
+    stats = PublisherStats(window=10, alpha=0.5)
+    assert stats.expected_seconds() is None
+
+    stats.record_latency(2.0)
+    stats.record_latency(4.0)
+    stats.record_failure()
+
+    assert stats.ewma_latency == pytest.approx(3.0)
+    assert stats.ewma_success == pytest.approx(0.5)
+    assert stats.expected_seconds() == pytest.approx(6.0)
+
+
+def test_publisher_that_only_fails_is_infinitely_slow():
+    stats = PublisherStats(window=10)
+    stats.record_failure()
+
+    assert stats.expected_seconds() == float("inf")
@@ -0,0 +1,56 @@
+"""ABOUTME: Tests for stage-2 critique topologies.
+ABOUTME: Covers all-to-all, round-robin k-peer, balanced blocks, and minimum coverage."""
+
+from collections import Counter
+from itertools import combinations
+
+import pytest
+
+from backend.topology import assign_critiques
+
+
+def _reviews(blocks):
+    return Counter(response for block in blocks for response in block)
+
+
+def test_all_to_all_shows_every_response():
+    assert assign_critiques([0, 1, 2], 3, "all") == [[0, 1, 2]] * 3
+
+
+def test_round_robin_reviews_next_k_peers_never_own():
+    blocks = assign_critiques(list(range(7)), 7, "round_robin", peers=2, min_reviews=2)
+
+    assert blocks[0] == [1, 2]
+    assert blocks[6] == [0, 1]
+    assert all(critic not in block for critic, block in enumerate(blocks))
+    assert set(_reviews(blocks).values()) == {2}
+
+
+def test_balanced_blocks_spread_reviews_and_pairs():
+    blocks = assign_critiques(list(range(9)), 9, "bibd", peers=3, min_reviews=3)
+
+    assert set(_reviews(blocks).values()) == {3}
+    assert all(critic not in block for critic, block in enumerate(blocks))
+    pairs = Counter(pair for block in blocks for pair in combinations(block, 2))
+    ring = assign_critiques(list(range(9)), 9, "round_robin", peers=3, min_reviews=3)
+    ring_pairs = Counter(pair for block in ring for pair in combinations(block, 2))
+    assert max(pairs.values()) <= 2
+    assert len(pairs) > len(ring_pairs)
+
+
+def test_min_reviews_is_topped_up_when_critics_outnumber_responses():
+    # Critics 3 and 4 wrote nothing that survived stage 1.
+    blocks = assign_critiques([0, 1, 2, None, None], 3, "round_robin", peers=1, min_reviews=3)
+
+    reviews = _reviews(blocks)
+    assert all(reviews[response] >= 3 for response in range(3))
+    assert all(critic not in block for critic, block in enumerate(blocks[:3]))
+
+
+def test_large_peer_count_collapses_to_all_to_all():
+    assert assign_critiques([0, 1, 2], 3, "bibd", peers=5) == [[0, 1, 2]] * 3
+
+
+def test_unknown_topology_is_rejected():
+    with pytest.raises(ValueError):
+        assign_critiques([0], 1, "star")
@@ -0,0 +1,117 @@
+"""ABOUTME: Tests for council tracing spans and exporters.
+ABOUTME: Covers span nesting across tasks, statuses, and trace export."""
+
+import asyncio
+import json
+import os
+
+import pytest
+from httpx import Response
+
+os.environ.setdefault("X402_GATEWAY_URL", "https://x402.serendb.com")
+os.environ.setdefault("CLAUDE_PUBLISHER_ID", "claude-id")
+os.environ.setdefault("OPENAI_PUBLISHER_ID", "openai-id")
+os.environ.setdefault("MOONSHOT_PUBLISHER_ID", "moonshot-id")
+os.environ.setdefault("GEMINI_PUBLISHER_ID", "gemini-id")
+os.environ.setdefault("PERPLEXITY_PUBLISHER_ID", "perplexity-id")
+
+from backend.tracing import (
+    CANCELLED,
+    ERROR,
+    OK,
+    HttpCollectorExporter,
+    JsonLinesExporter,
+    SpanExporter,
+    Tracer,
+    current_span,
+)
+
+
+class RecordingExporter(SpanExporter):
+    def __init__(self):
+        self.traces = []
+
+    def export(self, spans):
+        self.traces.append(list(spans))
+
+
+@pytest.mark.asyncio()
+async def test_child_spans_nest_across_tasks_and_export_with_root():
+    exporter = RecordingExporter()
+    tracer = Tracer(exporter)
+
+    async def leaf(index):
+        with tracer.span("leaf", index=index):
+            await asyncio.sleep(0)
+
+    with tracer.span("root") as root:
+        with tracer.span("stage") as stage:
+            await asyncio.gather(leaf(0), leaf(1))
+        assert current_span() is root
+    assert current_span() is None
+
+    (spans,) = exporter.traces
+    by_name = {}
+    for span in spans:
+        by_name.setdefault(span.name, []).append(span)
+    assert spans[-1] is root
+    assert {leaf.parent_id for leaf in by_name["leaf"]} == {stage.span_id}
+    assert stage.parent_id == root.span_id
+    assert {span.trace_id for span in spans} == {root.trace_id}
+
+
+@pytest.mark.asyncio()
+async def test_span_status_reflects_errors_and_cancellation():
+    tracer = Tracer()
+
+    with pytest.raises(ValueError):
+        with tracer.span("boom") as failed:
+            raise ValueError("bad")
+
+    async def slow():
+        with tracer.span("slow") as span:
+            holder.append(span)
+            await asyncio.sleep(10)
+
+    holder = []
+    task = asyncio.ensure_future(slow())
+    await asyncio.sleep(0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    with tracer.span("fine") as fine:
+        pass
+
+    assert failed.status == ERROR and failed.attributes["error"] == "bad"
+    assert holder[0].status == CANCELLED
+    assert fine.status == OK and fine.duration is not None
+
+
+def test_jsonl_exporter_appends_one_line_per_span(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    tracer = Tracer(JsonLinesExporter(str(path)))
+
+    with tracer.span("root", chairman="gpt"):
+        with tracer.span("child"):
+            pass
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [record["name"] for record in records] == ["child", "root"]
+    assert records[0]["parent_id"] == records[1]["span_id"]
+    assert records[1]["attributes"] == {"chairman": "gpt"}
+
+
+@pytest.mark.asyncio()
+async def test_http_exporter_posts_trace_in_background(respx_mock):
+    route = respx_mock.post("https://collector.test/v1/traces").mock(return_value=Response(200))
+    exporter = HttpCollectorExporter("https://collector.test/v1/traces")
+    tracer = Tracer(exporter)
+
+    with tracer.span("root"):
+        pass
+    await tracer.aclose()
+
+    assert route.called
+    payload = json.loads(route.calls.last.request.content)
+    assert [span["name"] for span in payload["spans"]] == ["root"]
@@ -0,0 +1,80 @@
+"""ABOUTME: Tests for token usage parsing, pricing, and aggregation.
+ABOUTME: Covers both upstream usage shapes and the rolling publisher ledger."""
+
+import pytest
+
+from backend.usage import Usage, UsageLedger, parse_usage, priced, summarize
+
+
+def test_parse_anthropic_usage_folds_cache_tokens_into_input():
+    usage = parse_usage(
+        "anthropic",
+        {
+            "input_tokens": 10,
+            "cache_read_input_tokens": 900,
+            "cache_creation_input_tokens": 90,
+            "output_tokens": 40,
+        },
+    )
+
+    assert usage == Usage(input_tokens=1000, output_tokens=40, cached_input_tokens=900)
+
+
+def test_parse_openai_usage_reads_cached_prompt_tokens():
+    usage = parse_usage(
+        "openai",
+        {
+            "prompt_tokens": 1500,
+            "completion_tokens": 60,
+            "prompt_tokens_details": {"cached_tokens": 1024},
+        },
+    )
+
+    assert usage == Usage(input_tokens=1500, output_tokens=60, cached_input_tokens=1024)
+    assert parse_usage("openai", {"prompt_tokens": 5}).cached_input_tokens == 0
+
+
+def test_missing_usage_is_none():
+    assert parse_usage("openai", None) is None
+    assert parse_usage("anthropic", {}) is None
+
+
+def test_priced_charges_cached_tokens_at_their_own_rate():
+    usage = Usage(input_tokens=1_000_000, output_tokens=100_000, cached_input_tokens=400_000)
+
+    cost = priced(usage, {"input": 3.0, "output": 15.0, "cached_input": 0.3}).cost_usd
+    assert cost == pytest.approx(0.6 * 3.0 + 0.4 * 0.3 + 0.1 * 15.0)
+    assert priced(usage, {"input": 1.0}).cost_usd == pytest.approx(1.0)
+    assert priced(usage, None).cost_usd is None
+
+
+def test_summarize_totals_by_stage_and_member():
+    records = [
+        ("stage1", "claude", Usage(input_tokens=10, output_tokens=5, cost_usd=0.5)),
+        ("stage1", "gpt5", Usage(input_tokens=20, output_tokens=5)),
+        ("stage2", "claude", Usage(input_tokens=30, output_tokens=10, cost_usd=0.25)),
+    ]
+
+    total, stages, members = summarize(records)
+
+    assert (total.calls, total.usage.input_tokens) == (3, 60)
+    assert total.usage.cost_usd == pytest.approx(0.75)
+    assert stages["stage1"].usage.output_tokens == 10
+    assert members["claude"].calls == 2
+    assert members["gpt5"].usage.cost_usd is None
+
+
+def test_ledger_keeps_only_the_rolling_window():
+    ledger = UsageLedger(window_seconds=10)
+    ledger.record("claude-id", Usage(input_tokens=100, output_tokens=50), now=0.0)
+    ledger.record("claude-id", Usage(input_tokens=10, output_tokens=10), now=8.0)
+    ledger.record("openai-id", Usage(input_tokens=5, output_tokens=5), now=3.0)
+
+    snapshot = ledger.snapshot(now=12.0)
+
+    assert set(snapshot) == {"claude-id", "openai-id"}
+    claude = snapshot["claude-id"]
+    assert claude.total.calls == 1
+    assert claude.tokens_per_second == pytest.approx(2.0)
+    assert claude.output_tokens_per_second == pytest.approx(1.0)
+    assert "openai-id" not in ledger.snapshot(now=13.5)
@@ -4,10 +4,16 @@ ABOUTME: Covers success, payment errors, and parallel queries."""
 from importlib import reload
 from types import ModuleType
 from unittest.mock import patch
+import asyncio
+import json
 import os
+
+import httpx
 import pytest
 from httpx import Response
 
+from backend.deadline import Deadline
+
 
 def _load_modules(env: dict) -> tuple[ModuleType, ModuleType]:
     with patch.dict(os.environ, env, clear=True):
@@ -36,14 +42,14 @@ def env_values() -> dict:
 @pytest.mark.asyncio()
 async def test_query_model_success(env_values, respx_mock):
     config_module, client_module = _load_modules(env_values)
-    client = client_module.X402Client(caller_wallet="0xtest")
+    client = client_module.X402Client()
     member = config_module.settings.get_council_members()[0]  # Claude with /messages
 
     route = respx_mock.post("https://x402.serendb.com/api/proxy").mock(
         return_value=Response(200, json={"content": [{"text": "Hello from Claude"}]})
     )
 
-    result = await client.query_model(member, "Hello?")
+    result = await client.query_model(member, "Hello?", caller_wallet="0xtest")
 
     assert route.called
     assert result.success is True
@@ -53,7 +59,7 @@ async def test_query_model_success(env_values, respx_mock):
 @pytest.mark.asyncio()
 async def test_query_model_payment_error(env_values, respx_mock):
     _, client_module = _load_modules(env_values)
-    client = client_module.X402Client(caller_wallet="0xtest")
+    client = client_module.X402Client()
     member = client_module.CouncilMember(
         "test", "test-id", "test-model", "/chat/completions", "openai"
     )
@@ -63,13 +69,13 @@ async def test_query_model_payment_error(env_values, respx_mock):
     )
 
     with pytest.raises(client_module.PaymentRequiredError):
-        await client.query_model(member, "Hello?")
+        await client.query_model(member, "Hello?", caller_wallet="0xtest")
 
 
 @pytest.mark.asyncio()
 async def test_query_models_parallel_collects_results(env_values, respx_mock):
     config_module, client_module = _load_modules(env_values)
-    client = client_module.X402Client(caller_wallet="0xtest")
+    client = client_module.X402Client()
     members = config_module.settings.get_council_members()[:2]  # Claude and GPT5
 
     responses = [
@@ -78,8 +84,685 @@ async def test_query_models_parallel_collects_results(env_values, respx_mock):
     ]
     respx_mock.post("https://x402.serendb.com/api/proxy").mock(side_effect=responses)
 
-    results = await client.query_models_parallel(members, "Discuss")
+    results = await client.query_models_parallel(members, "Discuss", caller_wallet="0xtest")
 
     assert len(results) == 2
     assert all(r.success for r in results)
     assert {r.model_name for r in results} == {m.name for m in members}
+
+
+@pytest.mark.asyncio()
+async def test_query_model_sends_wallet_per_call(env_values, respx_mock):
+    config_module, client_module = _load_modules(env_values)
+    client = client_module.X402Client()
+    member = config_module.settings.get_council_members()[1]
+
+    route = respx_mock.post("https://x402.serendb.com/api/proxy").mock(
+        return_value=Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+    )
+
+    await client.query_model(member, "Hi", caller_wallet="0xfirst")
+    await client.query_model(member, "Hi", caller_wallet="0xsecond")
+
+    wallets = [json.loads(call.request.content)["agentWallet"] for call in route.calls]
+    assert wallets == ["0xfirst", "0xsecond"]
+
+
+@pytest.mark.asyncio()
+async def test_shared_client_is_pooled_and_reused(env_values):
+    env = {**env_values, "POOL_MAX_CONNECTIONS": "7", "POOL_MAX_KEEPALIVE_CONNECTIONS": "3"}
+    _, client_module = _load_modules(env)
+
+    shared = client_module.get_shared_client()
+    assert client_module.get_shared_client() is shared
+
+    http_client = await shared._get_client()
+    assert await shared._get_client() is http_client
+    pool = http_client._transport._pool
+    assert pool._max_connections == 7
+    assert pool._max_keepalive_connections == 3
+    assert pool._http2 is True
+
+    await client_module.close_shared_client()
+    assert http_client.is_closed
+    assert client_module.get_shared_client() is not shared
+    await client_module.close_shared_client()
+
+
+@pytest.mark.asyncio()
+async def test_injected_http_client_is_used(env_values, respx_mock):
+    _, client_module = _load_modules(env_values)
+    http_client = httpx.AsyncClient()
+    client = client_module.X402Client(http_client=http_client)
+
+    assert await client._get_client() is http_client
+    await client.aclose()
+    assert http_client.is_closed
+
+
+@pytest.mark.asyncio()
+async def test_stream_model_yields_openai_deltas(env_values, respx_mock):
+    config_module, client_module = _load_modules(env_values)
+    client = client_module.X402Client()
+    member = config_module.settings.get_council_members()[1]
+    body = (
+        'data: {"choices": [{"delta": {"role": "assistant"}}]}\n\n'
+        'data: {"choices": [{"delta": {"content": "Hel"}}]}\n\n'
+        'data: {"choices": [{"delta": {"content": "lo"}}]}\n\n'
+        "data: [DONE]\n\n"
+    )
+    route = respx_mock.post("https://x402.serendb.com/api/proxy").mock(
+        return_value=Response(200, text=body, headers={"content-type": "text/event-stream"})
+    )
+
+    chunks = [chunk async for chunk in client.stream_model(member, "Hi", caller_wallet="0xtest")]
+
+    assert chunks == ["Hel", "lo"]
+    assert json.loads(route.calls[0].request.content)["request"]["body"]["stream"] is True
+
+
+@pytest.mark.asyncio()
+async def test_stream_model_yields_anthropic_deltas(env_values, respx_mock):
+    config_module, client_module = _load_modules(env_values)
+    client = client_module.X402Client()
+    member = config_module.settings.get_council_members()[0]
+    body = (
+        "event: message_start\n"
+        'data: {"type": "message_start"}\n\n'
+        "event: content_block_delta\n"
+        'data: {"type": "content_block_delta", "delta": {"type": "text_delta", "text": "Hi"}}\n\n'
+        "event: message_stop\n"
+        'data: {"type": "message_stop"}\n\n'
+    )
+    respx_mock.post("https://x402.serendb.com/api/proxy").mock(
+        return_value=Response(200, text=body)
+    )
+
+    chunks = [chunk async for chunk in client.stream_model(member, "Hi", caller_wallet="0xtest")]
+
+    assert chunks == ["Hi"]
+
+
+@pytest.mark.asyncio()
+async def test_stream_model_payment_error(env_values, respx_mock):
+    config_module, client_module = _load_modules(env_values)
+    client = client_module.X402Client()
+    member = config_module.settings.get_council_members()[1]
+    respx_mock.post("https://x402.serendb.com/api/proxy").mock(return_value=Response(402))
+
+    with pytest.raises(client_module.PaymentRequiredError):
+        async for _ in client.stream_model(member, "Hi", caller_wallet="0xtest"):
+            pass
+
+
+@pytest.mark.asyncio()
+async def test_query_model_uses_remaining_budget_as_timeout(env_values, respx_mock):
+    config_module, client_module = _load_modules(env_values)
+    client = client_module.X402Client()
+    member = config_module.settings.get_council_members()[1]
+    route = respx_mock.post("https://x402.serendb.com/api/proxy").mock(
+        return_value=Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+    )
+
+    result = await client.query_model(
+        member, "Hi", caller_wallet="0xtest", deadline=Deadline.after(5)
+    )
+
+    assert result.success
+    timeouts = route.calls[0].request.extensions["timeout"]
+    assert 0 < timeouts["read"] <= 5
+
+
+@pytest.mark.asyncio()
+async def test_query_model_skips_retry_that_cannot_fit_budget(env_values, respx_mock):
+    config_module, client_module = _load_modules(env_values)
+    client = client_module.X402Client()
+    member = config_module.settings.get_council_members()[1]
+    route = respx_mock.post("https://x402.serendb.com/api/proxy").mock(
+        return_value=Response(500)
+    )
+
+    result = await client.query_model(
+        member, "Hi", caller_wallet="0xtest", deadline=Deadline.after(1)
+    )
+
+    assert result.success is False
+    assert route.call_count == 1
+
+
+@pytest.mark.asyncio()
+async def test_query_model_with_spent_budget_makes_no_request(env_values, respx_mock):
+    config_module, client_module = _load_modules(env_values)
+    client = client_module.X402Client()
+    member = config_module.settings.get_council_members()[1]
+    route = respx_mock.post("https://x402.serendb.com/api/proxy")
+
+    result = await client.query_model(
+        member, "Hi", caller_wallet="0xtest", deadline=Deadline.after(0)
+    )
+
+    assert result.success is False
+    assert "Deadline" in result.error
+    assert not route.called
+
+
+@pytest.mark.asyncio()
+async def test_query_model_does_not_retry_client_errors(env_values, respx_mock):
+    config_module, client_module = _load_modules(env_values)
+    client = client_module.X402Client()
+    member = config_module.settings.get_council_members()[1]
+    route = respx_mock.post("https://x402.serendb.com/api/proxy").mock(
+        return_value=Response(400)
+    )
+
+    result = await client.query_model(member, "Hi", caller_wallet="0xtest")
+
+    assert result.success is False
+    assert "400" in result.error
+    assert route.call_count == 1
+
+
+@pytest.mark.asyncio()
+async def test_query_model_retries_server_errors(env_values, respx_mock):
+    env = {**env_values, "RETRY_BACKOFF_BASE_SECONDS": "0"}
+    config_module, client_module = _load_modules(env)
+    client = client_module.X402Client()
+    member = config_module.settings.get_council_members()[1]
+    route = respx_mock.post("https://x402.serendb.com/api/proxy").mock(
+        side_effect=[
+            Response(503),
+            Response(200, json={"choices": [{"message": {"content": "ok"}}]}),
+        ]
+    )
+
+    result = await client.query_model(member, "Hi", caller_wallet="0xtest")
+
+    assert result.success is True
+    assert route.call_count == 2
+
+
+@pytest.mark.asyncio()
+async def test_open_breaker_fails_member_immediately(env_values, respx_mock):
+    env = {
+        **env_values,
+        "RETRY_ATTEMPTS": "0",
+        "BREAKER_FAILURE_THRESHOLD": "2",
+        "BREAKER_RESET_SECONDS": "60",
+    }
+    config_module, client_module = _load_modules(env)
+    client = client_module.X402Client()
+    kimi, sonar = config_module.settings.get_council_members()[2::2]
+    route = respx_mock.post("https://x402.serendb.com/api/proxy").mock(
+        return_value=Response(500)
+    )
+
+    for _ in range(2):
+        await client.query_model(kimi, "Hi", caller_wallet="0xtest")
+    assert route.call_count == 2
+
+    result = await client.query_model(kimi, "Hi", caller_wallet="0xtest")
+    assert result.success is False
+    assert result.error == "Circuit open for kimi"
+    assert route.call_count == 2
+
+    # Other publishers keep their own breaker.
+    await client.query_model(sonar, "Hi", caller_wallet="0xtest")
+    assert route.call_count == 3
+
+
+def _hedging_client(client_module, delays: dict[str, float]):
+    class DelayedClient(client_module.X402Client):
+        def __init__(self):
+            super().__init__()
+            self.calls: list[str] = []
+            self.cancelled: list[str] = []
+
+        async def query_model(self, member, prompt, system_prompt=None, **kwargs):
+            self.calls.append(member.name)
+            try:
+                await asyncio.sleep(delays[member.name] if len(self.calls) == 1 else 0)
+            except asyncio.CancelledError:
+                self.cancelled.append(member.name)
+                raise
+            return client_module.LLMResponse(
+                model_name=member.name, content=f"from {member.name}", success=True
+            )
+
+    return DelayedClient()
+
+
+@pytest.mark.asyncio()
+async def test_hedged_query_sends_duplicate_after_p90(env_values):
+    env = {**env_values, "HEDGE_MIN_SAMPLES": "1"}
+    config_module, client_module = _load_modules(env)
+    kimi = config_module.settings.get_council_members()[2]
+    client = _hedging_client(client_module, {"kimi": 30})
+    client.stats.get(kimi.publisher_id, "direct").record_latency(0.01)
+
+    result = await asyncio.wait_for(
+        client.query_model_hedged(kimi, "Hi", caller_wallet="0xtest"), timeout=5
+    )
+
+    assert result.success and result.hedged
+    assert client.calls == ["kimi", "kimi"]
+    assert client.cancelled == ["kimi"]
+
+
+@pytest.mark.asyncio()
+async def test_hedged_query_routes_to_backup_member(env_values):
+    env = {
+        **env_values,
+        "HEDGE_MIN_SAMPLES": "1",
+        "HEDGE_BACKUP_MEMBERS": '{"kimi": "gpt5"}',
+    }
+    config_module, client_module = _load_modules(env)
+    kimi = config_module.settings.get_council_members()[2]
+    client = _hedging_client(client_module, {"kimi": 30})
+    client.stats.get(kimi.publisher_id, "direct").record_latency(0.01)
+
+    result = await client.query_model_hedged(kimi, "Hi", caller_wallet="0xtest")
+
+    assert client.calls == ["kimi", "gpt5"]
+    assert result.model_name == "kimi"
+    assert result.content == "from gpt5"
+    assert result.answered_by == "gpt5"
+
+
+@pytest.mark.asyncio()
+async def test_hedge_skips_backup_already_on_the_council(env_values):
+    env = {
+        **env_values,
+        "HEDGE_MIN_SAMPLES": "1",
+        "HEDGE_BACKUP_MEMBERS": '{"kimi": "gpt5"}',
+    }
+    config_module, client_module = _load_modules(env)
+    kimi = config_module.settings.get_council_members()[2]
+    client = _hedging_client(client_module, {"kimi": 30})
+    client.stats.get(kimi.publisher_id, "direct").record_latency(0.01)
+
+    result = await client.query_model_hedged(
+        kimi, "Hi", caller_wallet="0xtest", hedge_exclude={"kimi", "gpt5"}
+    )
+
+    assert client.calls == ["kimi", "kimi"]
+    assert result.answered_by is None
+
+
+@pytest.mark.asyncio()
+async def test_full_council_hedges_to_a_backup_model_outside_the_roster(env_values):
+    env = {
+        **env_values,
+        "HEDGE_MIN_SAMPLES": "1",
+        "HEDGE_BACKUP_MEMBERS": '{"kimi": "gpt-5-mini", "gemini": "kimi-k2-0711-preview"}',
+    }
+    config_module, client_module = _load_modules(env)
+    roster = config_module.settings.get_council_members()
+    kimi, gemini = roster[2], roster[3]
+    seated = {member.name for member in roster}
+    client = _hedging_client(client_module, {"kimi": 30, "gemini": 30})
+    client.stats.get(kimi.publisher_id, "direct").record_latency(0.01)
+
+    result = await client.query_model_hedged(
+        kimi, "Hi", caller_wallet="0xtest", hedge_exclude=seated
+    )
+
+    assert client.calls == ["kimi", "gpt-5-mini"]
+    assert result.answered_by == "gpt-5-mini"
+    target = client._hedge_target(kimi, seated)
+    assert (target.model, target.publisher_id) == ("gpt-5-mini", "openai-id")
+    # A backup model that is already seated falls back to the member itself.
+    assert client._hedge_target(gemini, seated) is gemini
+
+@pytest.mark.asyncio()
+@pytest.mark.parametrize("history", [False, True])
+async def test_cancelling_hedged_query_cancels_upstream_calls(env_values, history):
+    env = {**env_values, "HEDGE_MIN_SAMPLES": "1"}
+    config_module, client_module = _load_modules(env)
+    kimi = config_module.settings.get_council_members()[2]
+    client = _hedging_client(client_module, {"kimi": 30})
+    if history:
+        # The primary is still inside the hedge wait when it is cancelled.
+        client.stats.get(kimi.publisher_id, "direct").record_latency(10.0)
+
+    task = asyncio.ensure_future(client.query_model_hedged(kimi, "Hi", caller_wallet="0xtest"))
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    await asyncio.sleep(0)
+
+    assert client.cancelled == ["kimi"]
+
+
+@pytest.mark.asyncio()
+async def test_hedging_respects_rate_cap_and_history(env_values):
+    env = {**env_values, "HEDGE_MIN_SAMPLES": "1", "HEDGE_BUDGET_MIN_TOKENS": "0"}
+    config_module, client_module = _load_modules(env)
+    kimi = config_module.settings.get_council_members()[2]
+
+    # No latency history yet: never hedge.
+    client = _hedging_client(client_module, {"kimi": 0.05})
+    result = await client.query_model_hedged(kimi, "Hi", caller_wallet="0xtest")
+    assert client.calls == ["kimi"] and not result.hedged
+
+    # History present but the hedge budget is empty.
+    client = _hedging_client(client_module, {"kimi": 0.05})
+    client.stats.get(kimi.publisher_id, "direct").record_latency(0.001)
+    result = await client.query_model_hedged(kimi, "Hi", caller_wallet="0xtest")
+    assert client.calls == ["kimi"] and not result.hedged
+
+
+@pytest.mark.asyncio()
+async def test_query_model_records_latency_samples(env_values, respx_mock):
+    config_module, client_module = _load_modules(env_values)
+    client = client_module.X402Client()
+    member = config_module.settings.get_council_members()[1]
+    respx_mock.post("https://x402.serendb.com/api/proxy").mock(
+        return_value=Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+    )
+
+    await client.query_model(member, "Hi", caller_wallet="0xtest", stage="stage2")
+
+    assert client.stats.get(member.publisher_id, "stage2").sample_count == 1
+    assert client.stats.get(member.publisher_id, "stage1").sample_count == 0
+
+
+@pytest.mark.asyncio()
+async def test_query_model_holds_publisher_slot_from_limiter(env_values, respx_mock):
+    from backend.resilience import PublisherLimiter
+
+    config_module, client_module = _load_modules(env_values)
+    client = client_module.X402Client()
+    member = config_module.settings.get_council_members()[1]
+    limiter = PublisherLimiter(1)
+
+    async def _slow_reply(request):
+        await asyncio.sleep(0.01)
+        return Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+
+    respx_mock.post("https://x402.serendb.com/api/proxy").mock(side_effect=_slow_reply)
+
+    results = await asyncio.gather(
+        *(client.query_model(member, "Hi", caller_wallet="0xtest", limiter=limiter) for _ in range(3))
+    )
+
+    assert all(result.success for result in results)
+    assert limiter.peak_in_flight == {member.publisher_id: 1}
+
+
+@pytest.mark.asyncio()
+async def test_queueing_for_a_slot_does_not_count_against_attempt_timeout(
+    env_values, respx_mock
+):
+    from backend.resilience import PublisherLimiter
+
+    config_module, client_module = _load_modules(env_values)
+    client = client_module.X402Client()
+    client.timeout = 0.1
+    member = config_module.settings.get_council_members()[1]
+    limiter = PublisherLimiter(1)
+
+    async def _slow_reply(request):
+        await asyncio.sleep(0.04)
+        return Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+
+    respx_mock.post("https://x402.serendb.com/api/proxy").mock(side_effect=_slow_reply)
+
+    results = await asyncio.gather(
+        *(
+            client.query_model(member, "Hi", caller_wallet="0xtest", limiter=limiter)
+            for _ in range(4)
+        )
+    )
+
+    assert all(result.success for result in results)
+    assert respx_mock.calls.call_count == 4
+
+
+@pytest.mark.asyncio()
+async def test_deadline_spent_in_slot_queue_is_not_charged_to_publisher(env_values, respx_mock):
+    from backend.deadline import Deadline
+    from backend.resilience import PublisherLimiter
+
+    config_module, client_module = _load_modules(env_values)
+    client = client_module.X402Client()
+    member = config_module.settings.get_council_members()[1]
+    limiter = PublisherLimiter(1)
+
+    async def _slow_reply(request):
+        await asyncio.sleep(0.1)
+        return Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+
+    respx_mock.post("https://x402.serendb.com/api/proxy").mock(side_effect=_slow_reply)
+
+    holder = asyncio.ensure_future(
+        client.query_model(member, "Hi", caller_wallet="0xtest", limiter=limiter)
+    )
+    await asyncio.sleep(0.01)
+    queued = await client.query_model(
+        member, "Hi", caller_wallet="0xtest", limiter=limiter, deadline=Deadline.after(0.03)
+    )
+    await holder
+
+    assert not queued.success and "slot" in queued.error
+    assert respx_mock.calls.call_count == 1
+    assert client.breakers.get(member.publisher_id)._failures == 0
+    assert client.stats.get(member.publisher_id, "direct").outcome_count == 1
+
+@pytest.mark.asyncio()
+async def test_caller_deadline_timeouts_are_not_charged_to_publisher(env_values, respx_mock):
+    from backend.deadline import Deadline
+
+    env = {**env_values, "RETRY_ATTEMPTS": "0"}
+    config_module, client_module = _load_modules(env)
+    client = client_module.X402Client()
+    member = config_module.settings.get_council_members()[3]
+
+    async def _slow_reply(request):
+        await asyncio.sleep(0.2)
+        return Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+
+    respx_mock.post("https://x402.serendb.com/api/proxy").mock(side_effect=_slow_reply)
+    breaker = client.breakers.get(member.publisher_id)
+    stats = client.stats.get(member.publisher_id, "direct")
+
+    clipped = await client.query_model(
+        member, "Hi", caller_wallet="0xtest", deadline=Deadline.after(0.05)
+    )
+    assert not clipped.success and "Deadline exceeded" in clipped.error
+    assert breaker._failures == 0 and stats.outcome_count == 0
+
+    # The publisher's own timeout still counts against it.
+    client.timeout = 0.05
+    timed_out = await client.query_model(member, "Hi", caller_wallet="0xtest")
+    assert not timed_out.success
+    assert breaker._failures == 1 and stats.outcome_count == 1
+
+@pytest.mark.asyncio()
+async def test_query_model_records_attempt_spans(env_values, respx_mock):
+    from backend.tracing import ERROR, OK, Tracer
+
+    env = {**env_values, "RETRY_BACKOFF_BASE_SECONDS": "0"}
+    config_module, client_module = _load_modules(env)
+    client = client_module.X402Client()
+    client.tracer = tracer = Tracer()
+    member = config_module.settings.get_council_members()[1]
+    respx_mock.post("https://x402.serendb.com/api/proxy").mock(
+        side_effect=[
+            Response(503),
+            Response(200, json={"choices": [{"message": {"content": "ok"}}]}),
+        ]
+    )
+
+    with tracer.span("council.stage", stage="stage1") as stage:
+        await client.query_model(member, "Hi", caller_wallet="0xtest", stage="stage1")
+
+    attempts = [span for span in stage.trace_spans if span.name == "gateway.attempt"]
+    assert [span.attributes["attempt"] for span in attempts] == [0, 1]
+    assert [span.attributes["status_code"] for span in attempts] == [503, 200]
+    assert [span.status for span in attempts] == [ERROR, OK]
+    assert all(span.parent_id == stage.span_id for span in attempts)
+    assert attempts[1].attributes["response_bytes"] > 0
+
+
+def test_anthropic_payload_marks_split_prompt_prefix_cacheable(env_values):
+    config_module, client_module = _load_modules(env_values)
+    client = client_module.X402Client()
+    claude, gpt5 = config_module.settings.get_council_members()[:2]
+    prompt = client_module.SplitPrompt("Shared context\n\n", "Critique it.", cacheable=True)
+
+    content = client._build_payload(claude, prompt)["messages"][0]["content"]
+    assert content == [
+        {"type": "text", "text": "Shared context\n\n", "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": "Critique it."},
+    ]
+    openai_content = client._build_payload(gpt5, prompt)["messages"][0]["content"]
+    assert openai_content == "Shared context\n\nCritique it."
+    assert type(openai_content) is str
+    assert client._build_payload(claude, "Plain")["messages"][0]["content"] == "Plain"
+    one_off = client_module.SplitPrompt("Shared context\n\n", "Critique it.")
+    assert client._build_payload(claude, one_off)["messages"][0]["content"] == str(prompt)
+
+
+def test_payload_carries_stage_budget_and_stage2_schema(env_values):
+    env = {**env_values, "STAGE2_MAX_TOKENS": "800"}
+    config_module, client_module = _load_modules(env)
+    client = client_module.X402Client()
+    claude, gpt5, kimi = config_module.settings.get_council_members()[:3]
+    schema = {"name": "critique", "schema": {"type": "object"}}
+
+    anthropic = client._build_payload(claude, "Hi", stage="stage2", response_schema=schema)
+    assert anthropic["max_tokens"] == 800
+    assert "response_format" not in anthropic
+
+    # gpt5 is a reasoning model, so its budget also covers reasoning tokens.
+    openai = client._build_payload(gpt5, "Hi", stage="stage2", response_schema=schema)
+    assert openai["max_completion_tokens"] == 800 + 8192 and "max_tokens" not in openai
+    assert openai["response_format"] == {"type": "json_schema", "json_schema": schema}
+
+    moonshot = client._build_payload(kimi, "Hi", stage="stage2", response_schema=schema)
+    assert moonshot["max_tokens"] == 800
+    assert "response_format" not in moonshot
+
+    assert client._build_payload(kimi, "Hi", stage="stage1")["max_tokens"] == 4096
+
+
+def test_prompt_caching_can_be_disabled(env_values):
+    env = {**env_values, "PROMPT_CACHING_ENABLED": "false"}
+    config_module, client_module = _load_modules(env)
+    client = client_module.X402Client()
+    claude = config_module.settings.get_council_members()[0]
+    prompt = client_module.SplitPrompt("Shared context\n\n", "Critique it.", cacheable=True)
+
+    content = client._build_payload(claude, prompt)["messages"][0]["content"]
+    assert content == "Shared context\n\nCritique it."
+
+
+@pytest.mark.asyncio()
+async def test_query_model_records_usage_from_both_formats(env_values, respx_mock):
+    from backend.metrics import gateway_series
+    from backend.tracing import Tracer
+
+    prices = {"claude-sonnet-4-5": {"input": 3.0, "output": 15.0, "cached_input": 0.3}}
+    env = {**env_values, "TOKEN_PRICES_USD": json.dumps(prices)}
+    config_module, client_module = _load_modules(env)
+    client = client_module.X402Client()
+    client.tracer = tracer = Tracer()
+    claude, gpt5 = config_module.settings.get_council_members()[:2]
+    respx_mock.post("https://x402.serendb.com/api/proxy").mock(
+        side_effect=[
+            Response(
+                200,
+                json={
+                    "content": [{"text": "ok"}],
+                    "usage": {
+                        "input_tokens": 100,
+                        "cache_read_input_tokens": 900,
+                        "output_tokens": 50,
+                    },
+                },
+            ),
+            Response(
+                200,
+                json={
+                    "choices": [{"message": {"content": "ok"}}],
+                    "usage": {
+                        "prompt_tokens": 1200,
+                        "completion_tokens": 30,
+                        "prompt_tokens_details": {"cached_tokens": 1024},
+                    },
+                },
+            ),
+            Response(200, json={"choices": [{"message": {"content": "ok"}}]}),
+        ]
+    )
+    series = gateway_series(claude.publisher_id, "stage2")
+    before = (series.cached_input_tokens.value, series.cost_usd.value)
+
+    with tracer.span("council") as root:
+        anthropic = await client.query_model(
+            claude, "Hi", caller_wallet="0xtest", stage="stage2"
+        )
+    openai = await client.query_model(gpt5, "Hi", caller_wallet="0xtest")
+    unreported = await client.query_model(gpt5, "Hi", caller_wallet="0xtest")
+
+    assert anthropic.usage.input_tokens == 1000
+    assert anthropic.usage.cached_input_tokens == 900
+    assert anthropic.usage.output_tokens == 50
+    assert anthropic.usage.cost_usd == pytest.approx((100 * 3.0 + 900 * 0.3 + 50 * 15.0) / 1e6)
+    assert (openai.usage.input_tokens, openai.usage.cached_input_tokens) == (1200, 1024)
+    assert openai.usage.cost_usd is None
+    assert unreported.usage is None
+    assert not hasattr(anthropic, "raw_response")
+    assert series.cached_input_tokens.value - before[0] == 900
+    assert series.cost_usd.value - before[1] == pytest.approx(anthropic.usage.cost_usd)
+    attempt = next(span for span in root.trace_spans if span.name == "gateway.attempt")
+    assert attempt.attributes["cached_input_tokens"] == 900
+    assert attempt.attributes["output_tokens"] == 50
+    ledger = client.ledger.snapshot()
+    assert ledger[claude.publisher_id].total.calls == 1
+    assert ledger[gpt5.publisher_id].total.usage.output_tokens == 30
+
+
+@pytest.mark.asyncio()
+@pytest.mark.parametrize(
+    ("member_index", "events"),
+    [
+        (
+            0,
+            [
+                {"type": "message_start", "message": {"usage": {"input_tokens": 12}}},
+                {"type": "content_block_delta", "delta": {"text": "Hi"}},
+                {"type": "message_delta", "usage": {"output_tokens": 7}},
+            ],
+        ),
+        (
+            1,
+            [
+                {"choices": [{"delta": {"content": "Hi"}}]},
+                {"choices": [], "usage": {"prompt_tokens": 12, "completion_tokens": 7}},
+            ],
+        ),
+    ],
+)
+async def test_stream_model_reports_usage(env_values, respx_mock, member_index, events):
+    config_module, client_module = _load_modules(env_values)
+    client = client_module.X402Client()
+    member = config_module.settings.get_council_members()[member_index]
+    body = "".join(f"data: {json.dumps(event)}\n\n" for event in events)
+    route = respx_mock.post("https://x402.serendb.com/api/proxy").mock(
+        return_value=Response(200, text=body, headers={"content-type": "text/event-stream"})
+    )
+    reported = []
+
+    chunks = [
+        chunk
+        async for chunk in client.stream_model(
+            member, "Hi", caller_wallet="0xtest", on_usage=reported.append
+        )
+    ]
+
+    assert chunks == ["Hi"]
+    assert [(usage.input_tokens, usage.output_tokens) for usage in reported] == [(12, 7)]
+    payload = json.loads(route.calls[0].request.content)["request"]["body"]
+    assert ("stream_options" in payload) == (member.api_format == "openai")